@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""End-to-end cycle benchmark against a local fake NOMADS server.
+
+Publishes synthetic GFS Wave GRIB2 hours (plus ``.idx``) in the NOMADS path
+layout, points ``src/plot.py`` at them through ``NUSAWAVE_NOMADS_BASE`` and
+runs the whole pipeline as a production run would, in subprocesses:
+
+    src/plot.py --dataset gfswave ...     download, decode, render
+    scripts/generate_config.py ...        frontend config.json
+
+Each run starts from an empty GRIB cache and output directory. Reported per
+run: wall time of both steps, bytes and requests served, peak RSS of the
+largest process (pool workers included) and images written per second.
+``--latency`` and ``--bandwidth`` slow the server down to cycle-time NOMADS.
+
+Usage:
+    python benchmarks/bench_cycle.py --hours 6 --runs 2
+    python benchmarks/bench_cycle.py --hours 24 --latency 0.3 --bandwidth 2M -- --workers 4
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from plotter.core.grib_cache import format_size, parse_size
+from plotter.testing.fake_nomads import DEFAULT_GRID, FakeNomadsServer
+
+CYCLE = "2026010100"
+GRIDS = {
+    "region": DEFAULT_GRID,
+    "global": {"lon": (0.0, 359.75), "lat": (90.0, -90.0), "step": 0.25},
+}
+IMAGE_SUFFIXES = {".webp", ".png", ".jpg", ".jpeg"}
+
+
+def _run(cmd, env, log) -> dict:
+    """Run ``cmd``; returns its wall seconds and peak RSS (its descendants included)."""
+    start = time.perf_counter()
+    with open(log, "ab") as out:
+        proc = subprocess.Popen(cmd, env=env, stdout=out, stderr=subprocess.STDOUT, cwd=ROOT)
+        # wait4's rusage folds in every descendant the child reaped (pool workers).
+        _, status, usage = os.wait4(proc.pid, 0)
+    seconds = time.perf_counter() - start
+    code = os.waitstatus_to_exitcode(status)
+    if code != 0:
+        raise RuntimeError(f"[ERROR] {' '.join(map(str, cmd))} exited with {code}, see {log}")
+    # ru_maxrss is in KiB on Linux, bytes on macOS.
+    rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+    return {"seconds": seconds, "peak_rss": rss}
+
+
+def _count_images(maps_root: Path) -> int:
+    return sum(1 for p in maps_root.rglob("*") if p.suffix in IMAGE_SUFFIXES)
+
+
+def run_cycle(server, workdir: Path, hours: int, region: str, plot_args, run: int) -> dict:
+    """One cold run of the pipeline against ``server``."""
+    assets = workdir / f"assets-{run}"
+    tmp = workdir / "tmp"
+    # Cold GRIB cache every run; geometry/layer caches stay warm, as on a runner.
+    shutil.rmtree(tmp / "nusawave_grib_cache", ignore_errors=True)
+    shutil.rmtree(assets, ignore_errors=True)
+    tmp.mkdir(parents=True, exist_ok=True)
+    env = {
+        **os.environ,
+        "NUSAWAVE_NOMADS_BASE": server.base_url,
+        "TMPDIR": str(tmp),
+        "MPLBACKEND": "Agg",
+    }
+    log = workdir / f"run-{run}.log"
+    served_bytes, served_requests = server.bytes_sent, len(server.requests)
+
+    plot = _run(
+        [
+            sys.executable, "src/plot.py", "--dataset", "gfswave", "--cycle", CYCLE,
+            "--max-hours", str(hours), "--region", region, "--assets-dir", str(assets), *plot_args,
+        ],
+        env,
+        log,
+    )
+    config = _run(
+        [
+            sys.executable, "scripts/generate_config.py", "--dataset", "gfswave", "--cycle", CYCLE,
+            "--max-hours", str(hours), "--output", str(assets / "config" / "config.json"),
+            "--maps-root", str(assets / "maps"),
+        ],
+        env,
+        log,
+    )
+    images = _count_images(assets / "maps")
+    return {
+        "wall_seconds": plot["seconds"] + config["seconds"],
+        "plot_seconds": plot["seconds"],
+        "config_seconds": config["seconds"],
+        "bytes": server.bytes_sent - served_bytes,
+        "requests": len(server.requests) - served_requests,
+        "peak_rss": max(plot["peak_rss"], config["peak_rss"]),
+        "images": images,
+        "images_per_second": images / plot["seconds"] if plot["seconds"] > 0 else 0.0,
+    }
+
+
+def benchmark(hours, runs=1, region="all", grid="region", latency=0.0, bandwidth=None, plot_args=(), workdir=None):
+    """Publish ``hours`` hours, run the pipeline ``runs`` times; returns metadata and runs."""
+    workdir = Path(workdir or tempfile.mkdtemp(prefix="nusawave_bench_"))
+    results = []
+    with FakeNomadsServer(workdir / "www", latency=latency, bandwidth=bandwidth) as server:
+        for hour in range(hours):
+            server.publish(CYCLE, hour, grid=GRIDS[grid])
+        for run in range(runs):
+            result = run_cycle(server, workdir, hours, region, list(plot_args), run)
+            results.append(result)
+            print(
+                f"[INFO] Run {run + 1}/{runs}: {result['wall_seconds']:.1f}s, {result['images']} images "
+                f"({result['images_per_second']:.2f}/s), {format_size(result['bytes'])} in "
+                f"{result['requests']} requests, peak RSS {format_size(result['peak_rss'])}"
+            )
+    meta = {
+        "hours": hours,
+        "region": region,
+        "grid": grid,
+        "latency": latency,
+        "bandwidth": bandwidth,
+        "plot_args": list(plot_args),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "workdir": str(workdir),
+    }
+    return {"meta": meta, "runs": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark plot.py + generate_config.py against a local fake NOMADS",
+        epilog="Arguments after -- are passed to src/plot.py (e.g. -- --workers 4 --output both).",
+    )
+    parser.add_argument("--hours", type=int, default=6, help="Forecast hours to publish and render")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--region", default="all", help="Region name or 'all'")
+    parser.add_argument("--grid", choices=sorted(GRIDS), default="region", help="Fixture grid (global: 0.25 deg)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response")
+    parser.add_argument("--bandwidth", default=None, help="Per-transfer bandwidth, e.g. 2M (bytes/s)")
+    parser.add_argument("--workdir", default=None, help="Keep fixtures, outputs and logs here")
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    argv = sys.argv[1:]
+    plot_args = []
+    if "--" in argv:
+        plot_args = argv[argv.index("--") + 1:]
+        argv = argv[:argv.index("--")]
+    args = parser.parse_args(argv)
+
+    result = benchmark(
+        args.hours,
+        runs=args.runs,
+        region=args.region,
+        grid=args.grid,
+        latency=args.latency,
+        bandwidth=parse_size(args.bandwidth) if args.bandwidth else None,
+        plot_args=plot_args,
+        workdir=args.workdir,
+    )
+    runs = result["runs"]
+    print(
+        f"[INFO] Median of {len(runs)} run(s): {statistics.median(r['wall_seconds'] for r in runs):.1f}s wall, "
+        f"{statistics.median(r['images_per_second'] for r in runs):.2f} images/s, "
+        f"peak RSS {format_size(max(r['peak_rss'] for r in runs))}"
+    )
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2) + "\n")
+        print(f"[INFO] Results saved at {args.output}")
+    if not args.workdir:
+        shutil.rmtree(result["meta"]["workdir"], ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Stage-level micro-benchmarks of the map render path, on synthetic GFS Wave data.
+
+Each (region, param) map of config.yaml is rendered ``--repeat`` times with
+the classic (non-layered) ``Plotter.plot_map`` sequence, timing every stage
+on its own:
+
+    load           handler.load (time and bbox selection)
+    select_bbox    select_bbox of one field
+    quiver_params  compute_quiver_params
+    contourf       ax.contourf inside handler.plot
+    quiver         ax.quiver inside handler.plot
+    plot           the whole handler.plot (mesh projection included)
+    colorbar       _add_colorbar (draws the canvas once to place itself)
+    features       coastlines, borders and land
+    gridlines      gridlines, labels and annotations
+    draw           fig.canvas.draw
+    savefig        RGBA buffer encoded as plot_map's encoder does (webp), to memory
+
+plus ``plot_map``, one end-to-end ``Plotter.plot_map`` call as configured
+(layer cache included). Results are written as JSON; ``--baseline`` compares
+against an earlier result and exits 1 when a stage got slower than
+``--threshold``.
+
+Usage:
+    python benchmarks/bench_stages.py --output bench.json
+    python benchmarks/bench_stages.py --regions malacca_strait --baseline bench.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import cartopy
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import PIL
+import xarray as xr
+
+from plotter.core.config_loader import load_param_config
+from plotter.core.encoder import encode_image, encode_options
+from plotter.core.plotter import Plotter
+from plotter.core.render_config import compile_render_configs, plot_config_for
+from plotter.core.utils import compute_quiver_params, load_model_params, regions_bbox, select_bbox, select_time
+from plotter.testing.synthetic import synthetic_dataset
+
+DATASET = "gfswave"
+PARAMS = ("wind", "swh", "swell")
+STAGES = (
+    "load", "select_bbox", "quiver_params", "contourf", "quiver", "plot",
+    "colorbar", "features", "gridlines", "draw", "savefig", "plot_map",
+)
+BASERUN = "2026-01-01T00"
+# Stages faster than this are too noisy to flag as regressions.
+NOISE_FLOOR = 0.002
+
+
+class StageTimer:
+    """Accumulates wall time per stage name."""
+
+    def __init__(self):
+        self.times = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0.0) + time.perf_counter() - start
+
+    def wrap(self, name, fn):
+        def timed(*args, **kwargs):
+            with self.stage(name):
+                return fn(*args, **kwargs)
+        return timed
+
+
+def _config(render, outfile=None):
+    return plot_config_for(
+        render,
+        dataset=DATASET,
+        time_index=0,
+        time_value=None,
+        forecast_hour=0,
+        outfile=outfile,
+        baserun=BASERUN,
+        datasource=load_model_params(DATASET).get("source", DATASET),
+    )
+
+
+def run_stages(render, ds: xr.Dataset, param: str, outdir: Path) -> dict:
+    """Render one map stage by stage; returns {stage: seconds}."""
+    timer = StageTimer()
+    config = _config(render)
+    plotter = Plotter(config)
+    handler = plotter._load_handler(param)
+
+    with timer.stage("load"):
+        data = handler.load(ds)
+    field = select_time(ds[next(iter(load_model_params(DATASET)[param].values()))], config)
+    with timer.stage("select_bbox"):
+        select_bbox(field, config)
+    with timer.stage("quiver_params"):
+        compute_quiver_params(data[0].lat, data[0].lon, config)
+
+    figsize, portrait = plotter._resolve_figsize()
+    fig, ax = plotter._new_figure(figsize, portrait)
+    try:
+        ax.contourf = timer.wrap("contourf", ax.contourf)
+        ax.quiver = timer.wrap("quiver", ax.quiver)
+        with timer.stage("plot"):
+            im, iq = handler.plot(ax, data)
+        with timer.stage("colorbar"):
+            plotter._add_colorbar(fig, ax, im, iq, portrait)
+        with timer.stage("features"):
+            plotter._add_features(ax)
+            plotter._apply_bbox(ax, config.bbox)
+        with timer.stage("gridlines"):
+            plotter._add_gridlines(ax, portrait)
+            plotter._add_map_annotations(ax, fig, portrait)
+        with timer.stage("draw"):
+            fig.canvas.draw()
+        with timer.stage("savefig"):
+            options = encode_options(config.fileformat, getattr(config, "webp", None))
+            encode_image(np.array(fig.canvas.buffer_rgba()), config.fileformat, config.dpi, options)
+    finally:
+        plt.close(fig)
+
+    end_to_end = Plotter(_config(render, str(outdir / f"{render.region}_{param}")))
+    with timer.stage("plot_map"), redirect_stdout(io.StringIO()):
+        end_to_end.plot_map(ds, param)
+    return timer.times
+
+
+def benchmark(regions, params, repeat: int = 5, warmup: int = 1, step: float = 0.25, log=print) -> dict:
+    """Median/min seconds per stage of every (region, param), with run metadata."""
+    yaml_cfg = load_param_config()
+    renders = compile_render_configs(yaml_cfg, regions)
+    domain = regions_bbox(regions, yaml_cfg, margin=2.0)
+    ds = synthetic_dataset(domain, step=step, dataset=DATASET, baserun=BASERUN)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for region in regions:
+            for param in params:
+                runs = []
+                for i in range(warmup + repeat):
+                    times = run_stages(renders[(region, param)], ds, param, Path(tmp))
+                    if i >= warmup:
+                        runs.append(times)
+                stages = {
+                    stage: {
+                        "median": statistics.median(r.get(stage, 0.0) for r in runs),
+                        "min": min(r.get(stage, 0.0) for r in runs),
+                    }
+                    for stage in STAGES
+                }
+                results[f"{region}/{param}"] = stages
+                log(f"[INFO] {region}/{param}: plot_map {stages['plot_map']['median'] * 1000:.0f} ms")
+
+    meta = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "xarray": xr.__version__,
+        "matplotlib": matplotlib.__version__,
+        "cartopy": cartopy.__version__,
+        "pillow": PIL.__version__,
+        "grid": {"bbox": domain, "step": step, "shape": [ds.sizes["lat"], ds.sizes["lon"]]},
+        "repeat": repeat,
+        "warmup": warmup,
+    }
+    return {"meta": meta, "results": results}
+
+
+def compare(current: dict, baseline: dict, threshold: float = 0.25, floor: float = NOISE_FLOOR) -> list:
+    """(case, stage, baseline s, current s) of stages slower than ``1 + threshold`` times baseline."""
+    regressions = []
+    for case, stages in current["results"].items():
+        base = baseline["results"].get(case)
+        if base is None:
+            continue
+        for stage, timing in stages.items():
+            if stage not in base:
+                continue
+            old, new = base[stage]["median"], timing["median"]
+            if new > floor and new > old * (1 + threshold):
+                regressions.append((case, stage, old, new))
+    return regressions
+
+
+def stage_totals(result: dict, cases=None) -> dict:
+    """Sum of stage medians over ``cases`` (default: every case)."""
+    totals = dict.fromkeys(STAGES, 0.0)
+    for case, stages in result["results"].items():
+        if cases is not None and case not in cases:
+            continue
+        for stage in STAGES:
+            totals[stage] += stages.get(stage, {}).get("median", 0.0)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each stage of the map render path")
+    parser.add_argument("--regions", nargs="+", default=None, help="config.yaml regions (default: all)")
+    parser.add_argument("--params", nargs="+", default=list(PARAMS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--step", type=float, default=0.25, help="Synthetic grid spacing in degrees")
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    parser.add_argument("--baseline", default=None, help="Compare against an earlier --output")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown per stage (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    regions = args.regions or list(load_param_config().get("regions", {}))
+    result = benchmark(regions, args.params, args.repeat, args.warmup, args.step)
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2) + "\n")
+        print(f"[INFO] Results saved at {args.output}")
+
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+    # Totals over the cases both runs have, so they compare like for like.
+    cases = set(result["results"]) & set(baseline["results"]) if baseline else None
+    totals = stage_totals(result, cases)
+    base_totals = stage_totals(baseline, cases) if baseline else {}
+    print(f"{'stage':<14}{'total ms':>10}" + (f"{'baseline':>10}{'change':>9}" if baseline else ""))
+    for stage in STAGES:
+        line = f"{stage:<14}{totals[stage] * 1000:>10.1f}"
+        if baseline and base_totals.get(stage):
+            line += f"{base_totals[stage] * 1000:>10.1f}{totals[stage] / base_totals[stage] - 1:>+9.0%}"
+        print(line)
+
+    if baseline:
+        regressions = compare(result, baseline, args.threshold)
+        for case, stage, old, new in regressions:
+            print(f"[WARN] {case} {stage}: {old * 1000:.1f} ms -> {new * 1000:.1f} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
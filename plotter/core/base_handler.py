@@ -5,6 +5,8 @@ class BaseHandler(ABC):
 
     def __init__(self, config):
         self.config = config
+        self._domain = None
+        self.domain_key = None
 
     @abstractmethod
     def load(self, ds):
@@ -15,3 +17,31 @@ class BaseHandler(ABC):
     def plot(self, ax, data):
         """Plot extracted data."""
         pass
+
+    @property
+    def domain(self):
+        """Whole-grid scalar field (shared contours, tiles), computed on first use."""
+        if callable(self._domain):
+            self._domain = self._domain()
+        return self._domain
+
+    def set_domain(self, field, name):
+        """Register the whole-grid field ``name``; a callable is only evaluated if ``domain`` is read.
+
+        ``domain_key`` identifies the field by source and hour so contours of
+        it can be shared without hashing the data; it stays None when the
+        config does not say which cycle the data comes from.
+        """
+        self._domain = field
+        cfg = self.config
+        if getattr(cfg, "baserun", None) is None:
+            self.domain_key = None
+        else:
+            self.domain_key = (
+                name,
+                cfg.dataset,
+                str(cfg.baserun),
+                cfg.forecast_hour,
+                cfg.time_index,
+                str(cfg.time_value),
+            )
@@ -0,0 +1,131 @@
+"""Per-(region, param) frame bundles: every hour of a map animation in one file.
+
+File layout (little endian)::
+
+    b"NWANIM1\\0"       8-byte magic
+    uint32              length of the JSON header
+    header              UTF-8 JSON, space-padded to a multiple of 4 bytes
+    frames              the encoded image of each hour, back to back
+
+The header lists ``frames`` as ``{"hour", "offset", "length"}``, offsets
+counting from the end of the header. The frontend fetches a bundle once per
+layer and shows any hour as a Blob slice of it, instead of one request per
+frame. Frames are the very files written next to the bundle
+(``<param>_<hour>.<format>``), collected in memory as they are encoded.
+"""
+
+import json
+import re
+import struct
+from pathlib import Path
+
+from .grib_cache import atomic_file
+
+MAGIC = b"NWANIM1\0"
+BUNDLE_VERSION = 1
+BUNDLE_SUFFIX = ".bundle"
+
+
+def bundle_path(maps_root, region: str, param: str) -> Path:
+    return Path(maps_root) / region / f"{param}{BUNDLE_SUFFIX}"
+
+
+def write_bundle(path, frames: dict, fileformat: str = "webp", meta=None) -> int:
+    """Write ``{hour: encoded image}`` as a bundle at ``path``; returns its size in bytes."""
+    index, offset = [], 0
+    for hour in sorted(frames):
+        index.append({"hour": hour, "offset": offset, "length": len(frames[hour])})
+        offset += len(frames[hour])
+    header = {"version": BUNDLE_VERSION, "format": fileformat, **(meta or {}), "frames": index}
+    raw = json.dumps(header, default=str).encode()
+    raw += b" " * (-len(raw) % 4)
+    with atomic_file(Path(path)) as part:
+        with open(part, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(raw)))
+            f.write(raw)
+            for hour in sorted(frames):
+                f.write(frames[hour])
+    return Path(path).stat().st_size
+
+
+def read_bundle(path):
+    """(header, {hour: encoded image}) of a bundle file."""
+    data = Path(path).read_bytes()
+    if data[:8] != MAGIC:
+        raise ValueError(f"[ERROR] {path} is not a NusaWave frame bundle")
+    (length,) = struct.unpack("<I", data[8:12])
+    header = json.loads(data[12:12 + length])
+    body = 12 + length
+    frames = {f["hour"]: data[body + f["offset"]:body + f["offset"] + f["length"]] for f in header["frames"]}
+    return header, frames
+
+
+class BundleCollector:
+    """Encoded maps of this run, grouped per (region, param) until bundled.
+
+    Frames are held in memory up to ``budget`` bytes (default: no limit);
+    beyond it, and after each :meth:`write`, they are read back from their
+    image files when bundled.
+    """
+
+    def __init__(self, maps_root, budget=None):
+        self.maps_root = Path(maps_root)
+        self.budget = budget
+        self._held = 0
+        self._frames = {}
+        self._formats = {}
+        self._dirty = set()
+
+    def add(self, region: str, param: str, hour: int, data: bytes, fileformat: str = "webp"):
+        frames = self._frames.setdefault((region, param), {})
+        self._held -= len(frames.get(hour) or b"")
+        if self.budget is not None and self._held + len(data) > self.budget:
+            data = None
+        frames[hour] = data
+        self._held += len(data or b"")
+        self._formats[(region, param)] = fileformat
+        self._dirty.add((region, param))
+
+    def unchanged(self, region: str, param: str, fileformat: str = "webp"):
+        """Note a map skipped as current; its bundle is still written if missing."""
+        self._frames.setdefault((region, param), {})
+        self._formats.setdefault((region, param), fileformat)
+        if not bundle_path(self.maps_root, region, param).exists():
+            self._dirty.add((region, param))
+
+    def _from_disk(self, region: str, param: str, fileformat: str, hours) -> dict:
+        """Frames of ``hours`` rendered by an earlier run (skipped as unchanged in this one)."""
+        pattern = re.compile(rf"^{re.escape(param)}_(\d{{3}})\.{re.escape(fileformat)}$")
+        frames = {}
+        for f in (self.maps_root / region).glob(f"{param}_*.{fileformat}"):
+            m = pattern.match(f.name)
+            if m and int(m.group(1)) in hours:
+                frames[int(m.group(1))] = f.read_bytes()
+        return frames
+
+    def write(self, hours, meta=None) -> int:
+        """Rewrite the bundle of every (region, param) with new frames; returns how many.
+
+        A bundle holds every hour of ``hours`` with a map: this run's frames
+        from memory, older ones from their image files.
+        """
+        hours = set(hours)
+        written = 0
+        for region, param in sorted(self._dirty):
+            fileformat = self._formats[(region, param)]
+            held = {h: d for h, d in self._frames[(region, param)].items() if h in hours and d is not None}
+            frames = self._from_disk(region, param, fileformat, hours - set(held))
+            frames.update(held)
+            if not frames:
+                continue
+            path = bundle_path(self.maps_root, region, param)
+            size = write_bundle(path, frames, fileformat, {"region": region, "param": param, **(meta or {})})
+            print(f"[INFO] Bundled {len(frames)} {param} frames for {region} ({size / 1024:.0f} KiB)")
+            written += 1
+        self._dirty.clear()
+        # Written frames are in their files now; a later write reads them from there.
+        for frames in self._frames.values():
+            frames.clear()
+        self._held = 0
+        return written
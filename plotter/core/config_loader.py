@@ -1,6 +1,9 @@
+import copy
 import yaml
 from pathlib import Path
 
+_parsed = {}
+
 def load_param_config():
     
     base_dir = Path(__file__).resolve().parent.parent
@@ -8,7 +11,12 @@ def load_param_config():
 
     if not config_path.exists():
         raise FileNotFoundError(f"[ERROR] config.yaml not found at: {config_path}")
-    
-    with open(config_path, "r") as f:
-        print(f"[INFO] Loading config file: {config_path}")
-        return yaml.safe_load(f)
+
+    # Parse once per process; callers get their own copy to modify.
+    mtime = config_path.stat().st_mtime
+    cached = _parsed.get(config_path)
+    if cached is None or cached[0] != mtime:
+        with open(config_path, "r") as f:
+            print(f"[INFO] Loading config file: {config_path}")
+            cached = _parsed[config_path] = (mtime, yaml.safe_load(f))
+    return copy.deepcopy(cached[1])
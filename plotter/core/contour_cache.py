@@ -0,0 +1,128 @@
+"""Filled contours computed once per field and shared by every region drawing it."""
+
+from collections import OrderedDict
+
+import contourpy
+import matplotlib as mpl
+import numpy as np
+from matplotlib.contour import ContourSet
+from matplotlib.path import Path
+
+from .mesh_cache import projected_mesh
+
+# Contoured fields kept per process: every param of the hour being rendered,
+# plus the next hour when tasks overlap.
+CONTOUR_CACHE_SIZE = 8
+
+_contours = OrderedDict()
+
+
+class _Contours:
+    """Band paths of one field, plus the extents ContourSet needs."""
+
+    def __init__(self, paths, zmin, zmax, mins, maxs):
+        self.paths = paths
+        self.zmin = zmin
+        self.zmax = zmax
+        self.mins = mins
+        self.maxs = maxs
+
+
+class CachedContourSet(ContourSet):
+    """ContourSet drawing precomputed band paths (see :func:`filled_contours`).
+
+    Overrides ContourSet's private ``_process_args`` hook, whose contract
+    (``_mins``/``_maxs``/``_paths``) is that of matplotlib 3.8-3.11: the
+    public ``ContourSet(ax, levels, allsegs)`` form cannot take the extended
+    bands contourf draws. requirements.txt caps matplotlib accordingly and
+    tests/test_contour_cache.py compares cached and uncached maps pixel for
+    pixel, so a release that changes the hook fails loudly.
+    """
+
+    def _process_args(self, contours, **kwargs):
+        self.zmin = contours.zmin
+        self.zmax = contours.zmax
+        self._mins = contours.mins
+        self._maxs = contours.maxs
+        self._paths = list(contours.paths)
+        return kwargs
+
+
+def _band_limits(levels, extend, zmin):
+    """Lower/upper bounds of each filled band, as matplotlib's contourf uses them."""
+    bounds = [float(v) for v in levels]
+    if extend in ("both", "min"):
+        bounds.insert(0, -1e250)
+    if extend in ("both", "max"):
+        bounds.append(1e250)
+    lowers = np.asarray(bounds[:-1])
+    if zmin == lowers[0]:
+        # Include minimum values in the lowest band.
+        lowers[0] -= 1
+    return lowers, np.asarray(bounds[1:])
+
+
+def _cache_key(key, levels, extend):
+    return (
+        key,
+        tuple(float(v) for v in levels),
+        extend,
+        mpl.rcParams["contour.algorithm"],
+        mpl.rcParams["contour.corner_mask"],
+    )
+
+
+def filled_contours(x, y, z, levels, extend, key=None) -> _Contours:
+    """Filled contour bands of ``z`` on the 2D mesh ``x``/``y``.
+
+    ``key`` identifies the mesh and field (the caller knows both); calls with
+    the same key, levels and extend reuse the bands. Without a key nothing
+    is cached.
+    """
+    extend = extend or "neither"
+    if key is not None:
+        key = _cache_key(key, levels, extend)
+        if key in _contours:
+            _contours.move_to_end(key)
+            return _contours[key]
+
+    z = np.ma.masked_invalid(np.asarray(z, dtype=np.float64), copy=False)
+
+    algorithm = mpl.rcParams["contour.algorithm"]
+    corner_mask = False if algorithm == "mpl2005" else mpl.rcParams["contour.corner_mask"]
+    generator = contourpy.contour_generator(
+        x, y, z,
+        name=algorithm,
+        corner_mask=corner_mask,
+        fill_type=contourpy.FillType.OuterCode,
+    )
+    zmin = float(z.min())
+    paths = []
+    for lower, upper in zip(*_band_limits(levels, extend, zmin)):
+        vertices, codes = generator.filled(lower, upper)
+        paths.append(Path(np.concatenate(vertices), np.concatenate(codes)) if len(vertices) else Path(np.empty((0, 2))))
+    contours = _Contours(paths, zmin, float(z.max()), [float(x.min()), float(y.min())], [float(x.max()), float(y.max())])
+
+    if key is None:
+        return contours
+    _contours[key] = contours
+    while len(_contours) > CONTOUR_CACHE_SIZE:
+        _contours.popitem(last=False)
+    return contours
+
+
+def shared_contourf(ax, field, cmap, norm, levels, extend, key=None):
+    """``contourf`` of a lon/lat DataArray in native map coordinates.
+
+    ``field`` should cover every region that draws it (the cropped grid) and
+    ``key`` identify it (source, hour, variable): the bands are computed once
+    and each region draws them, clipped by its axes. Output matches a
+    per-region ``contourf`` of the same field.
+    """
+    mesh = projected_mesh(field.lon.values, field.lat.values, ax.projection)
+    contours = filled_contours(
+        mesh.x, mesh.y, field.values, levels, extend, key=None if key is None else (mesh.key, key)
+    )
+    return CachedContourSet(
+        ax, contours, levels=levels, filled=True, cmap=cmap, norm=norm, extend=extend or "neither"
+    )
@@ -0,0 +1,270 @@
+"""Chunked NetCDF4 store of a decoded GFS Wave cycle, appended hour by hour.
+
+GRIB2 is decoded once per hour; re-renders, station extraction and
+backfills then read the store (lazily, through xarray) instead of decoding
+again. Values are cropped float32 fields on an unlimited ``time`` axis, in
+one of two chunk layouts:
+
+* ``map``: one whole field per chunk, for reading a map of one hour;
+* ``series``: long time runs of small tiles, for point time series.
+
+A full cycle (209 hours to t+384h) is never loaded at once unless asked:
+readers go through :func:`time_blocks`, which splits the time axis into
+runs of hours that fit the memory budget (``NUSAWAVE_MEMORY_BUDGET``,
+default 1G).
+
+Usage: ``python -m plotter.core.cycle_store --cycle 2026010100 --max-hours 24``
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+
+import netCDF4
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from . import grib_loader
+from .grib_cache import atomic_file, format_size, parse_size
+from .manifest import INPUT_DIGEST_ATTR
+
+LAYOUTS = ("map", "series")
+# Hours per chunk in the series layout (GFS Wave: hourly to t+120h).
+SERIES_TIME_CHUNK = 64
+# Grid cells per chunk edge in the series layout.
+SERIES_TILE = 16
+
+TIME_UNITS = "minutes since 1970-01-01 00:00:00"
+HOUR_DIGESTS_ATTR = "nusawave_hour_digests"
+HOUR_VARIABLES_ATTR = "nusawave_hour_variables"
+
+DEFAULT_MEMORY_BUDGET = 1024 ** 3
+MEMORY_BUDGET_ENV = "NUSAWAVE_MEMORY_BUDGET"
+
+
+def memory_budget() -> int:
+    """Bytes of decoded values read at once, from ``NUSAWAVE_MEMORY_BUDGET`` (default 1G)."""
+    value = os.environ.get(MEMORY_BUDGET_ENV)
+    return parse_size(value) if value else DEFAULT_MEMORY_BUDGET
+
+
+def hour_nbytes(ds: xr.Dataset) -> int:
+    """Bytes of one time step of the variables of ``ds`` once loaded."""
+    return sum(
+        ds[name].dtype.itemsize * ds[name].size // max(1, ds[name].sizes.get("time", 1))
+        for name in ds.data_vars
+    )
+
+
+def time_blocks(ds: xr.Dataset, budget: Optional[int] = None) -> list:
+    """Slices of the time axis of ``ds`` whose values fit ``budget`` bytes (at least one hour each)."""
+    budget = memory_budget() if budget is None else budget
+    n = ds.sizes.get("time", 1)
+    step = max(1, budget // max(1, hour_nbytes(ds)))
+    return [slice(i, min(n, i + step)) for i in range(0, n, step)]
+
+
+def chunk_sizes(layout: str, ny: int, nx: int):
+    """(time, lat, lon) chunk shape of a variable in ``layout``."""
+    if layout == "map":
+        return 1, ny, nx
+    if layout == "series":
+        return SERIES_TIME_CHUNK, min(ny, SERIES_TILE), min(nx, SERIES_TILE)
+    raise ValueError(f"[ERROR] Unknown store layout '{layout}', expected one of {LAYOUTS}")
+
+
+def _set_attrs(var, attrs):
+    for key, value in attrs.items():
+        if isinstance(value, (str, int, float)) and not key.startswith("_"):
+            var.setncattr(key, value)
+
+
+def _bbox_tag(bbox) -> str:
+    return "global" if bbox is None else "crop_" + "_".join(f"{v:g}" for v in bbox)
+
+
+class CycleStore:
+    """One cycle on disk: ``append`` decoded hours, ``open`` them lazily."""
+
+    def __init__(self, path, layout: str = "map"):
+        chunk_sizes(layout, 1, 1)
+        self.path = Path(path)
+        self.layout = layout
+
+    @classmethod
+    def for_cycle(cls, cycle: str, bbox=None, layout: str = "map", root=None) -> "CycleStore":
+        """Store of ``cycle`` next to its GRIB cache (``grib_loader.CACHE_DIR``)."""
+        root = Path(root) if root else grib_loader.CACHE_DIR
+        return cls(root / cycle / f"store.{_bbox_tag(bbox)}.{layout}.nc", layout)
+
+    def _read_index(self):
+        """({forecast hour: time index}, {forecast hour: variables stored}, hour digests)."""
+        if not self.path.exists():
+            return {}, {}, {}
+        with netCDF4.Dataset(self.path) as nc:
+            # Rows of an interrupted append have no forecast_hour yet.
+            hours = np.ma.filled(nc["forecast_hour"][:], -1).tolist()
+            names = {n for n, v in nc.variables.items() if v.dimensions == ("time", "lat", "lon")}
+            stored = json.loads(getattr(nc, HOUR_VARIABLES_ATTR, "{}"))
+            digests = json.loads(getattr(nc, HOUR_DIGESTS_ATTR, "{}"))
+        index = {int(t): i for i, t in enumerate(hours) if t >= 0}
+        # Stores written before per-hour variables were tracked hold every variable.
+        variables = {t: set(stored.get(str(t), names)) for t in index}
+        return index, variables, digests
+
+    def hours(self) -> list:
+        return sorted(self._read_index()[0])
+
+    def has(self, forecast_hour: int, variables: Optional[Iterable[str]] = None) -> bool:
+        """True when the hour is stored with all of ``variables`` (default: any)."""
+        _, stored, _ = self._read_index()
+        return forecast_hour in stored and set(variables or ()) <= stored[forecast_hour]
+
+    @staticmethod
+    def _add_variable(nc, name, chunks, attrs):
+        var = nc.createVariable(
+            name, "f4", ("time", "lat", "lon"),
+            zlib=True, complevel=1, chunksizes=chunks, fill_value=np.float32(np.nan),
+        )
+        _set_attrs(var, attrs)
+
+    def _create(self, ds: xr.Dataset):
+        """New store with every GFS Wave variable, so later runs with more params can fill them in."""
+        lat, lon = ds["lat"].values, ds["lon"].values
+        chunks = chunk_sizes(self.layout, len(lat), len(lon))
+        with atomic_file(self.path) as part:
+            with netCDF4.Dataset(part, "w", format="NETCDF4") as nc:
+                nc.createDimension("time", None)
+                nc.createDimension("lat", len(lat))
+                nc.createDimension("lon", len(lon))
+                nc.createVariable("lat", "f8", ("lat",))[:] = lat
+                nc.createVariable("lon", "f8", ("lon",))[:] = lon
+                time = nc.createVariable("time", "i8", ("time",))
+                time.units = TIME_UNITS
+                time.calendar = "proleptic_gregorian"
+                nc.createVariable("forecast_hour", "i4", ("time",))
+                for name in sorted(grib_loader.gfswave_variables() | set(ds.data_vars)):
+                    self._add_variable(nc, name, chunks, ds[name].attrs if name in ds else {})
+                nc.setncattr("nusawave_layout", self.layout)
+                nc.setncattr(HOUR_VARIABLES_ATTR, "{}")
+                nc.setncattr(HOUR_DIGESTS_ATTR, "{}")
+
+    def append(self, forecast_hour: int, ds: xr.Dataset):
+        """Add one decoded hour (a dataset with a length-1 ``time``).
+
+        An hour already stored only gets the variables of ``ds`` it lacks
+        (a run with more params than the one that stored it); if it has them
+        all this is a no-op.
+        """
+        if not self.path.exists():
+            self._create(ds)
+        index, stored, digests = self._read_index()
+        have = stored.get(forecast_hour, set())
+        if forecast_hour in index and set(ds.data_vars) <= have:
+            return
+        valid = pd.Timestamp(ds["time"].values.reshape(-1)[0])
+        with netCDF4.Dataset(self.path, "a") as nc:
+            if not (np.array_equal(nc["lat"][:], ds["lat"].values) and np.array_equal(nc["lon"][:], ds["lon"].values)):
+                raise ValueError(f"[ERROR] Grid of t+{forecast_hour:03d}h does not match {self.path}")
+            chunks = chunk_sizes(self.layout, len(nc.dimensions["lat"]), len(nc.dimensions["lon"]))
+            for name in ds.data_vars:
+                if name not in nc.variables:
+                    self._add_variable(nc, name, chunks, ds[name].attrs)
+                elif set(nc[name].ncattrs()) <= {"_FillValue"}:
+                    # Created without data by _create: take the attributes of the first hour.
+                    _set_attrs(nc[name], ds[name].attrs)
+            new = forecast_hour not in index
+            i = len(nc.dimensions["time"]) if new else index[forecast_hour]
+            for name in ds.data_vars:
+                if name in have:
+                    continue
+                values = ds[name].values
+                nc[name][i, :, :] = values.reshape(values.shape[-2:]).astype(np.float32)
+            if new:
+                nc["time"][i] = int((valid - pd.Timestamp("1970-01-01")) / pd.Timedelta(minutes=1))
+                # Written last: an hour counts as stored once its forecast_hour is set.
+                nc["forecast_hour"][i] = forecast_hour
+            variables = {str(t): sorted(names) for t, names in stored.items()}
+            variables[str(forecast_hour)] = sorted(have | set(ds.data_vars))
+            nc.setncattr(HOUR_VARIABLES_ATTR, json.dumps(variables))
+            digest = ds.attrs.get(INPUT_DIGEST_ATTR)
+            if digest:
+                previous = digests.get(str(forecast_hour))
+                if previous and not new:
+                    # Variables from two downloads: the hour's input is both.
+                    digest = hashlib.sha256(f"{previous}:{digest}".encode()).hexdigest()
+                digests[str(forecast_hour)] = digest
+                nc.setncattr(HOUR_DIGESTS_ATTR, json.dumps(digests))
+
+    def open(self, hours: Optional[Iterable[int]] = None, load: bool = False,
+             budget: Optional[int] = None) -> xr.Dataset:
+        """The stored ``hours`` (default: all) in hour order, lazily: values are read on access.
+
+        With ``load`` the values are read into memory, if they fit ``budget``
+        (default: :func:`memory_budget`).
+        """
+        index = self._read_index()[0]
+        hours = sorted(index) if hours is None else sorted(t for t in hours if t in index)
+        ds = xr.open_dataset(self.path).set_coords("forecast_hour")
+        ds = ds.isel(time=[index[t] for t in hours])
+        if load:
+            budget = memory_budget() if budget is None else budget
+            size = hour_nbytes(ds) * len(hours)
+            if size > budget:
+                ds.close()
+                raise RuntimeError(
+                    f"[ERROR] {len(hours)} hours of {self.path} need {format_size(size)}, over the "
+                    f"{format_size(budget)} memory budget; read them lazily or raise {MEMORY_BUDGET_ENV}"
+                )
+            ds = ds.load()
+        return ds
+
+    def hour(self, forecast_hour: int) -> xr.Dataset:
+        """One stored hour, loaded, shaped like a freshly decoded one."""
+        index, stored, digests = self._read_index()
+        if forecast_hour not in index:
+            raise KeyError(f"[ERROR] t+{forecast_hour:03d}h is not in {self.path}")
+        i = index[forecast_hour]
+        with xr.open_dataset(self.path) as ds:
+            out = ds.isel(time=slice(i, i + 1)).drop_vars("forecast_hour")
+            out = out.drop_vars([name for name in out.data_vars if name not in stored[forecast_hour]]).load()
+        out.attrs = {}
+        if str(forecast_hour) in digests:
+            out.attrs[INPUT_DIGEST_ATTR] = digests[str(forecast_hour)]
+        return out
+
+
+def convert_cycle(
+    cycle: str,
+    max_hours: int,
+    params: Optional[Iterable[str]] = None,
+    bbox=None,
+    layout: str = "map",
+    root=None,
+) -> CycleStore:
+    """Download/decode the hours of ``cycle`` not yet in its store and append them."""
+    store = CycleStore.for_cycle(cycle, bbox, layout, root)
+    for t, _ in grib_loader.iter_gfswave_cycle(cycle, max_hours, params=params, bbox=bbox, store=store):
+        print(f"[INFO] Stored t+{t:03d}h in {store.path}")
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a GFS Wave cycle into a chunked NetCDF4 store")
+    parser.add_argument("--cycle", required=True, help="YYYYMMDDHH model cycle")
+    parser.add_argument("--max-hours", type=int, default=4)
+    parser.add_argument("--params", nargs="+", default=None, help="Handler params to keep (default: all)")
+    parser.add_argument("--bbox", nargs=4, type=float, default=None, metavar=("MIN_LON", "MAX_LON", "MIN_LAT", "MAX_LAT"))
+    parser.add_argument("--layout", choices=LAYOUTS, default="map")
+    parser.add_argument("--root", default=None, help="Store directory (default: the GRIB cache)")
+    args = parser.parse_args()
+    store = convert_cycle(args.cycle, args.max_hours, args.params, args.bbox, args.layout, args.root)
+    print(f"[INFO] {store.path}: hours {store.hours()}")
+
+
+if __name__ == "__main__":
+    main()
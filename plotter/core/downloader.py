@@ -0,0 +1,108 @@
+"""Concurrent, bounded download of consecutive forecast hours."""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse
+
+DEFAULT_WORKERS = 4
+DEFAULT_HOST_LIMIT = 4
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 2.0
+
+# HTTP statuses worth retrying; anything else (404 in particular) means the
+# hour is not there and the cycle should stop.
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class HostLimiter:
+    """Cap the number of simultaneous transfers per host."""
+
+    def __init__(self, limit: int = DEFAULT_HOST_LIMIT):
+        self.limit = max(1, int(limit))
+        self._lock = threading.Lock()
+        self._slots = {}
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.limit)
+            return self._slots[host]
+
+    @contextmanager
+    def slot(self, url: str):
+        sem = self._semaphore(urlparse(url).netloc)
+        with sem:
+            yield
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for transient network failures, False for "not published yet"."""
+    if isinstance(exc, HTTPError):
+        return exc.code in RETRY_STATUS
+    return isinstance(exc, (URLError, TimeoutError, ConnectionError))
+
+
+def with_retries(fn: Callable, retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF):
+    """Call ``fn()``, retrying transient errors with exponential backoff."""
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as exc:
+            if attempt >= retries or not is_retryable(exc):
+                raise
+            delay = backoff * (2 ** attempt)
+            print(f"[WARN] {exc}; retrying in {delay:.1f}s ({attempt + 1}/{retries})")
+            time.sleep(delay)
+            attempt += 1
+
+
+def fetch_hours(
+    fetch: Callable[[int], object],
+    hours: Iterable[int],
+    url_for: Callable[[int], str],
+    workers: int = DEFAULT_WORKERS,
+    host_limit: int = DEFAULT_HOST_LIMIT,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+) -> Iterator[Tuple[int, object]]:
+    """Run ``fetch(hour)`` for many hours at once, yielding results in hour order.
+
+    At most ``workers`` hours are in flight, and at most ``host_limit`` of them
+    talk to the same host. Iteration stops at the first hour that still fails
+    after retries, like the serial loop it replaces; later hours are dropped.
+    """
+    limiter = HostLimiter(host_limit)
+
+    def task(hour):
+        with limiter.slot(url_for(hour)):
+            return with_retries(lambda: fetch(hour), retries=retries, backoff=backoff)
+
+    hours = iter(hours)
+    window = max(1, int(workers))
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=window) as pool:
+        try:
+            for hour in hours:
+                pending.append((hour, pool.submit(task, hour)))
+                if len(pending) >= window:
+                    break
+            while pending:
+                hour, future = pending.popleft()
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    print(f"[WARN] Stopping at t+{hour:03d}h: {exc}")
+                    return
+                for nxt in hours:
+                    pending.append((nxt, pool.submit(task, nxt)))
+                    break
+                yield hour, result
+        finally:
+            for _, future in pending:
+                future.cancel()
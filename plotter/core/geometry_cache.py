@@ -0,0 +1,97 @@
+"""Natural Earth features pre-clipped and pre-projected per region, cached as WKB."""
+
+import hashlib
+import json
+import tempfile
+from pathlib import Path
+
+import cartopy.crs as ccrs
+import cartopy.io.shapereader as shapereader
+import shapely
+from shapely.geometry import GeometryCollection
+
+from .grib_cache import atomic_file
+from .utils import get_projection
+
+GEOMETRY_CACHE_DIR = Path(tempfile.gettempdir()) / "nusawave_geometry_cache"
+
+# Bump when clipping/projection logic changes, to invalidate disk caches.
+GEOMETRY_VERSION = 1
+
+# feature name -> (Natural Earth category, Natural Earth name)
+FEATURES = {
+    "land": ("physical", "land"),
+    "coastline": ("physical", "coastline"),
+    "borders": ("cultural", "admin_0_boundary_lines_land"),
+}
+
+# Largest bbox span (degrees) drawn at each Natural Earth resolution.
+RESOLUTION_SPANS = (("10m", 15.0), ("50m", 70.0), ("110m", 360.0))
+
+_memory = {}
+
+
+def feature_resolution(bbox) -> str:
+    """Pick 10m/50m/110m Natural Earth data from the size of ``bbox``."""
+    if not bbox:
+        return "110m"
+    span = max(bbox[1] - bbox[0], bbox[3] - bbox[2])
+    for resolution, max_span in RESOLUTION_SPANS:
+        if span <= max_span:
+            return resolution
+    return "110m"
+
+
+def _cache_key(region, bbox, proj, resolution, margin) -> str:
+    payload = json.dumps(
+        {"version": GEOMETRY_VERSION, "bbox": bbox, "proj": proj, "res": resolution, "margin": margin},
+        sort_keys=True,
+    )
+    digest = hashlib.sha256(payload.encode()).hexdigest()[:12]
+    return f"{region}_{proj}_{resolution}_{digest}"
+
+
+def _clip_and_project(category, name, resolution, bbox, proj, margin):
+    path = shapereader.natural_earth(resolution=resolution, category=category, name=name)
+    minlon, maxlon, minlat, maxlat = bbox
+    clip = (minlon - margin, max(minlat - margin, -89.0), maxlon + margin, min(maxlat + margin, 89.0))
+    src = ccrs.PlateCarree()
+    out = []
+    for geom in shapereader.Reader(path).geometries():
+        clipped = shapely.clip_by_rect(geom, *clip)
+        if clipped.is_empty:
+            continue
+        projected = proj.project_geometry(clipped, src)
+        if not projected.is_empty:
+            out.append(projected)
+    return out
+
+
+def region_geometries(region, bbox, proj_name="mercator", margin=1.0, cache_dir=None) -> dict:
+    """Return ``{feature: [geometries]}`` clipped to ``bbox`` and in ``proj_name``.
+
+    Geometries are computed once per (region, bbox, projection, resolution),
+    written to ``cache_dir`` as WKB and read back lazily on later calls.
+    """
+    resolution = feature_resolution(bbox)
+    key = _cache_key(region, list(bbox), proj_name, resolution, margin)
+    if key in _memory:
+        return _memory[key]
+
+    root = Path(cache_dir) if cache_dir else GEOMETRY_CACHE_DIR
+    proj = None
+    features = {}
+    for feature, (category, name) in FEATURES.items():
+        path = root / f"{key}.{feature}.wkb"
+        if path.exists():
+            features[feature] = list(shapely.from_wkb(path.read_bytes()).geoms)
+            continue
+        if proj is None:
+            proj = get_projection(proj_name)
+        geoms = _clip_and_project(category, name, resolution, bbox, proj, margin)
+        with atomic_file(path) as part:
+            part.write_bytes(shapely.to_wkb(GeometryCollection(geoms)))
+        features[feature] = geoms
+
+    _memory[key] = features
+    return features
@@ -0,0 +1,279 @@
+"""On-disk GRIB cache: atomic writes, integrity checks and LRU eviction by cycle.
+
+The cache holds one directory per cycle (``YYYYMMDDHH``) with the downloaded
+GRIB2 files, their cropped NetCDF copies and the cycle store. Files are
+written under a ``.part`` name and renamed once complete, GRIB2 downloads
+are checked message by message against the ``.idx`` inventory, and whole
+cycles are evicted, least recently used first, once the cache grows past
+its disk budget.
+
+Usage: ``python -m plotter.core.grib_cache {list,verify,prune} [--budget 20G]``
+"""
+
+import argparse
+import os
+import re
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+DEFAULT_BUDGET = 10 * 1024 ** 3
+BUDGET_ENV = "NUSAWAVE_GRIB_CACHE_BUDGET"
+# Cycles used this recently are never evicted: another run may be reading them.
+EVICT_GRACE = 600
+LAST_USED = ".last_used"
+# mkstemp creates files 0600; finished files get the mode open() would give them.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+CYCLE_DIR = re.compile(r"^\d{10}$")
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+_lock = threading.Lock()
+
+
+class CorruptGribError(ConnectionError):
+    """A short or garbled GRIB2 transfer; retried like a dropped connection."""
+
+
+def parse_size(text) -> int:
+    """Bytes in ``text`` such as ``"500M"``, ``"20G"`` or ``"1048576"``."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*", str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"[ERROR] Invalid size '{text}', expected e.g. 500M or 20G")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def default_budget() -> int:
+    """Disk budget from ``NUSAWAVE_GRIB_CACHE_BUDGET`` (default 10G)."""
+    value = os.environ.get(BUDGET_ENV)
+    return parse_size(value) if value else DEFAULT_BUDGET
+
+
+def format_size(size: int) -> str:
+    for unit in ("B", "K", "M", "G"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}T"
+
+
+@contextmanager
+def atomic_file(dest: Path):
+    """Yield a temporary path next to ``dest``, renamed to ``dest`` on success.
+
+    A killed or failed download leaves only a ``.part`` file, never a
+    truncated ``dest``; :func:`prune` removes stale ones. The temporary name
+    is unique, so concurrent writers of the same ``dest`` never share it.
+    """
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(dir=dest.parent, prefix=dest.name + ".", suffix=".part")
+    os.close(fd)
+    part = Path(name)
+    os.chmod(part, 0o666 & ~_UMASK)
+    try:
+        yield part
+        part.replace(dest)
+    finally:
+        part.unlink(missing_ok=True)
+
+
+@contextmanager
+def atomic_dir(dest: Path):
+    """Yield an empty temporary directory next to ``dest``, swapped in for ``dest`` on success.
+
+    The old ``dest`` is served until the new tree is complete; it is only
+    renamed away right before the new one takes its place.
+    """
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    part = Path(tempfile.mkdtemp(dir=dest.parent, prefix=dest.name + ".", suffix=".part"))
+    os.chmod(part, 0o777 & ~_UMASK)
+    try:
+        yield part
+        old = None
+        if dest.exists():
+            old = Path(tempfile.mkdtemp(dir=dest.parent, prefix=dest.name + ".", suffix=".old"))
+            dest.replace(old / dest.name)
+        part.replace(dest)
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+    finally:
+        shutil.rmtree(part, ignore_errors=True)
+
+
+def scan_grib(path: Path) -> list:
+    """Offsets of the GRIB2 messages in ``path``; raises if any is incomplete."""
+    offsets = []
+    size = Path(path).stat().st_size
+    with open(path, "rb") as f:
+        offset = 0
+        while offset < size:
+            f.seek(offset)
+            head = f.read(16)
+            if len(head) < 16 or head[:4] != b"GRIB" or head[7] != 2:
+                raise CorruptGribError(f"[ERROR] {path}: no GRIB2 message at byte {offset}")
+            (length,) = struct.unpack(">Q", head[8:16])
+            if offset + length > size:
+                raise CorruptGribError(f"[ERROR] {path}: message at byte {offset} is truncated")
+            f.seek(offset + length - 4)
+            if f.read(4) != b"7777":
+                raise CorruptGribError(f"[ERROR] {path}: message at byte {offset} has no end marker")
+            offsets.append(offset)
+            offset += length
+    if not offsets:
+        raise CorruptGribError(f"[ERROR] {path} holds no GRIB2 messages")
+    return offsets
+
+
+def expected_offsets(entries: list, ranges: list) -> list:
+    """Offsets the ``.idx`` ``entries`` will have in a file built from byte ``ranges``."""
+    expected = []
+    position = 0
+    for start, end in ranges:
+        for e in entries:
+            if e["offset"] >= start and (end is None or e["offset"] <= end):
+                expected.append(position + e["offset"] - start)
+        if end is not None:
+            position += end - start + 1
+    return expected
+
+
+def verify_grib(path: Path, expected: Optional[list] = None) -> int:
+    """Check ``path`` is whole GRIB2 messages at the ``expected`` offsets; returns the count."""
+    offsets = scan_grib(path)
+    if expected is not None and offsets != list(expected):
+        raise CorruptGribError(
+            f"[ERROR] {path}: {len(offsets)} GRIB2 message(s), the .idx lists {len(expected)}"
+        )
+    return len(offsets)
+
+
+def is_cached(path: Path) -> bool:
+    """True if ``path`` is in the cache and intact; a corrupt GRIB2 file is deleted."""
+    path = Path(path)
+    if not path.exists():
+        return False
+    if path.suffix != ".grib2":
+        return True
+    try:
+        scan_grib(path)
+    except CorruptGribError as exc:
+        print(f"[WARN] Dropping corrupt cache file: {exc}")
+        path.unlink(missing_ok=True)
+        return False
+    return True
+
+
+def touch_cycle(cycle_dir: Path):
+    """Mark a cycle as just used, for LRU eviction."""
+    cycle_dir = Path(cycle_dir)
+    cycle_dir.mkdir(parents=True, exist_ok=True)
+    (cycle_dir / LAST_USED).touch()
+
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def cache_usage(root: Path) -> list:
+    """``(cycle, bytes, last used epoch)`` of every cached cycle, least recently used first."""
+    root = Path(root)
+    if not root.is_dir():
+        return []
+    cycles = []
+    for path in root.iterdir():
+        if not (path.is_dir() and CYCLE_DIR.match(path.name)):
+            continue
+        marker = path / LAST_USED
+        used = marker.stat().st_mtime if marker.exists() else path.stat().st_mtime
+        cycles.append((path.name, _dir_size(path), used))
+    return sorted(cycles, key=lambda c: c[2])
+
+
+def prune(root: Path, budget: int, keep: Iterable[str] = (), grace: float = EVICT_GRACE) -> list:
+    """Evict least recently used cycles until ``root`` fits in ``budget`` bytes.
+
+    Cycles in ``keep`` and those used within ``grace`` seconds stay, as do
+    ``.part`` files younger than ``grace``. Returns the evicted cycles.
+    """
+    root = Path(root)
+    keep = set(keep)
+    now = time.time()
+    evicted = []
+    with _lock:
+        for part in root.glob("*/*.part"):
+            try:
+                if now - part.stat().st_mtime > grace:
+                    if part.is_dir():
+                        # Left by atomic_dir.
+                        shutil.rmtree(part, ignore_errors=True)
+                    else:
+                        part.unlink()
+            except FileNotFoundError:
+                pass
+        cycles = cache_usage(root)
+        total = sum(size for _, size, _ in cycles)
+        for cycle, size, used in cycles:
+            if total <= budget:
+                break
+            if cycle in keep or now - used < grace:
+                continue
+            shutil.rmtree(root / cycle, ignore_errors=True)
+            total -= size
+            evicted.append(cycle)
+            print(f"[INFO] Evicted cycle {cycle} from the GRIB cache ({format_size(size)})")
+    if total > budget:
+        print(f"[WARN] GRIB cache {root} is {format_size(total)}, over its {format_size(budget)} budget")
+    return evicted
+
+
+def verify_cache(root: Path, delete: bool = False) -> list:
+    """Paths of corrupt GRIB2 files under ``root``, deleted with ``delete``."""
+    bad = []
+    for path in sorted(Path(root).glob("*/*.grib2")):
+        try:
+            scan_grib(path)
+        except CorruptGribError as exc:
+            print(f"[WARN] {exc}")
+            bad.append(path)
+            if delete:
+                path.unlink(missing_ok=True)
+    return bad
+
+
+def main():
+    from .grib_loader import CACHE_DIR
+
+    parser = argparse.ArgumentParser(description="Inspect and prune the GFS Wave GRIB cache")
+    parser.add_argument("command", choices=["list", "verify", "prune"])
+    parser.add_argument("--root", default=None, help=f"Cache directory (default: {CACHE_DIR})")
+    parser.add_argument("--budget", default=None, help=f"Disk budget for prune, e.g. 20G (default: ${BUDGET_ENV} or 10G)")
+    parser.add_argument("--keep", nargs="*", default=[], help="Cycles never to evict")
+    parser.add_argument("--delete", action="store_true", help="verify: delete corrupt files")
+    args = parser.parse_args()
+    root = Path(args.root) if args.root else CACHE_DIR
+
+    if args.command == "list":
+        cycles = cache_usage(root)
+        for cycle, size, used in reversed(cycles):
+            print(f"{cycle}  {format_size(size):>8}  last used {datetime.fromtimestamp(used):%Y-%m-%d %H:%M}")
+        print(f"[INFO] {len(cycles)} cycle(s), {format_size(sum(c[1] for c in cycles))} in {root}")
+    elif args.command == "verify":
+        bad = verify_cache(root, delete=args.delete)
+        print(f"[INFO] {len(bad)} corrupt GRIB2 file(s) in {root}")
+    else:
+        budget = parse_size(args.budget) if args.budget else default_budget()
+        evicted = prune(root, budget, keep=args.keep, grace=0)
+        print(f"[INFO] Evicted {len(evicted)} cycle(s)")
+
+
+if __name__ == "__main__":
+    main()
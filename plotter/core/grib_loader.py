@@ -1,17 +1,68 @@
 """Load GFS Wave data from NOMADS HTTPS GRIB2 (OpenDAP retired Feb 2026)."""
 
+import hashlib
+import os
 import tempfile
-import urllib.request
+from urllib.error import HTTPError
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Iterable, Optional
 
 import cfgrib
+import eccodes
+import numpy as np
+import pandas as pd
 import xarray as xr
 
-NOMADS_GFSWAVE_BASE = (
-    "https://nomads.ncep.noaa.gov/pub/data/nccf/com/gfs/prod"
+from . import grib_cache, metrics
+from .downloader import DEFAULT_HOST_LIMIT, DEFAULT_WORKERS, fetch_hours
+from .http_client import default_client
+from .manifest import INPUT_DIGEST_ATTR
+from .utils import load_model_params, subset_bbox
+
+# NUSAWAVE_NOMADS_BASE points runs at a mirror or a local fake NOMADS server.
+NOMADS_GFSWAVE_BASE = os.environ.get(
+    "NUSAWAVE_NOMADS_BASE", "https://nomads.ncep.noaa.gov/pub/data/nccf/com/gfs/prod"
 )
 CACHE_DIR = Path(tempfile.gettempdir()) / "nusawave_grib_cache"
+# Disk budget of CACHE_DIR in bytes; least recently used cycles are evicted.
+CACHE_BUDGET = grib_cache.default_budget()
+
+# .idx inventory (variable, level) for each handler-facing variable name.
+GFSWAVE_IDX_FIELDS = {
+    "ugrdsfc": ("UGRD", "surface"),
+    "vgrdsfc": ("VGRD", "surface"),
+    "htsgwsfc": ("HTSGW", "surface"),
+    "dirpwsfc": ("DIRPW", "surface"),
+    "swell_1": ("SWELL", "1 in sequence"),
+    "swdir_1": ("SWDIR", "1 in sequence"),
+}
+
+# GRIB2 shortName and swell partition (None: not partitioned) of each variable.
+GFSWAVE_GRIB_KEYS = {
+    "ugrdsfc": ("u", None),
+    "vgrdsfc": ("v", None),
+    "htsgwsfc": ("swh", None),
+    "dirpwsfc": ("dirpw", None),
+    "swell_1": ("shts", 1),
+    "swdir_1": ("swdir", 1),
+}
+
+# GFS Wave output: hourly to t+120h, then every 3 hours to t+384h.
+GFSWAVE_HOURLY_UNTIL = 120
+GFSWAVE_STEP_AFTER = 3
+GFSWAVE_LAST_HOUR = 384
+
+# Ranges closer than this are fetched in one request; an unused message in
+# between is cheaper than another round trip to NOMADS.
+RANGE_MERGE_GAP = 256 * 1024
+
+
+def gfswave_forecast_hours(max_hours: int) -> list:
+    """Forecast hours NOMADS publishes for a GFS Wave cycle, those before ``max_hours``."""
+    hourly = range(min(max_hours, GFSWAVE_HOURLY_UNTIL + 1))
+    later = range(GFSWAVE_HOURLY_UNTIL + GFSWAVE_STEP_AFTER, min(max_hours, GFSWAVE_LAST_HOUR + 1), GFSWAVE_STEP_AFTER)
+    return [*hourly, *later]
 
 
 def gfswave_grib_url(cycle: str, forecast_hour: int) -> str:
@@ -21,6 +72,11 @@ def gfswave_grib_url(cycle: str, forecast_hour: int) -> str:
     return f"{NOMADS_GFSWAVE_BASE}/gfs.{y}{m}{d}/{h}/wave/gridded/{fname}"
 
 
+def gfswave_idx_url(cycle: str, forecast_hour: int) -> str:
+    """Return HTTPS URL of the ``.idx`` inventory next to a GFS Wave GRIB2 file."""
+    return gfswave_grib_url(cycle, forecast_hour) + ".idx"
+
+
 def pick_latest_gfswave_cycle() -> str:
     """Pick latest likely-available GFS synoptic cycle (00/06/12/18 UTC)."""
     now = datetime.now(timezone.utc).replace(tzinfo=None)
@@ -30,14 +86,174 @@ def pick_latest_gfswave_cycle() -> str:
     return cycle.strftime("%Y%m%d%H")
 
 
+def gfswave_hour_available(cycle: str, forecast_hour: int, timeout: float = 30) -> bool:
+    """True once NOMADS serves the ``.idx`` inventory of a forecast hour.
+
+    NOMADS writes the inventory after the GRIB2 file is complete, so it is
+    the signal that an hour can be downloaded.
+    """
+    try:
+        default_client().head(gfswave_idx_url(cycle, forecast_hour), timeout=timeout)
+        return True
+    except HTTPError as exc:
+        if exc.code == 404:
+            return False
+        raise
+
+
+def latest_gfswave_cycle(lookback: int = 4, now: Optional[datetime] = None) -> str:
+    """Most recent cycle whose analysis hour is published, checking ``lookback`` cycles.
+
+    Falls back to :func:`pick_latest_gfswave_cycle` when none is found.
+    """
+    now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+    cycle = now.replace(hour=(now.hour // 6) * 6, minute=0, second=0, microsecond=0)
+    for _ in range(lookback):
+        name = cycle.strftime("%Y%m%d%H")
+        try:
+            if gfswave_hour_available(name, 0):
+                return name
+        except Exception as exc:
+            print(f"[WARN] Could not check cycle {name}: {exc}")
+        cycle -= timedelta(hours=6)
+    fallback = pick_latest_gfswave_cycle()
+    print(f"[WARN] No published GFS Wave cycle found, guessing {fallback}")
+    return fallback
+
+
+def _fetch_idx(url: str) -> list:
+    return parse_idx(default_client().get(url + ".idx").body.decode())
+
+
 def _download(url: str, cache_path: Path) -> Path:
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
-    if not cache_path.exists():
-        print(f"[INFO] Downloading {url}")
-        urllib.request.urlretrieve(url, cache_path)
+    if grib_cache.is_cached(cache_path):
+        return cache_path
+    print(f"[INFO] Downloading {url}")
+    entries = _fetch_idx(url)
+    with grib_cache.atomic_file(cache_path) as part:
+        default_client().download(url, part)
+        grib_cache.verify_grib(part, grib_cache.expected_offsets(entries, [(0, None)]))
+    return cache_path
+
+
+def parse_idx(text: str) -> list:
+    """Parse a NOMADS ``.idx`` inventory into message records.
+
+    Each record holds the message number, start offset, end offset (inclusive,
+    ``None`` for the last message), variable, level and forecast label.
+    """
+    entries = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        fields = line.split(":")
+        if len(fields) < 6:
+            raise ValueError(f"[ERROR] Malformed idx line: {line!r}")
+        entries.append({
+            "num": int(fields[0]),
+            "offset": int(fields[1]),
+            "var": fields[3],
+            "level": fields[4],
+            "forecast": fields[5],
+        })
+    entries.sort(key=lambda e: e["offset"])
+    for cur, nxt in zip(entries, entries[1:] + [None]):
+        cur["end"] = nxt["offset"] - 1 if nxt is not None else None
+    return entries
+
+
+def gfswave_variables(params: Optional[Iterable[str]] = None, dataset: str = "gfswave") -> set:
+    """Dataset variables the handlers of ``params`` read (all GFS Wave ones for None)."""
+    if params is None:
+        return set(GFSWAVE_IDX_FIELDS)
+    mapper = load_model_params(dataset)
+    names = set()
+    for param in params:
+        varnames = mapper.get(param)
+        if not isinstance(varnames, dict):
+            raise ValueError(f"[ERROR] Unknown {dataset} param '{param}'")
+        for name in varnames.values():
+            if name not in GFSWAVE_IDX_FIELDS:
+                raise ValueError(f"[ERROR] No GRIB inventory entry for variable '{name}'")
+            names.add(name)
+    return names
+
+
+def gfswave_idx_fields(params: Iterable[str], dataset: str = "gfswave") -> set:
+    """Return the .idx (variable, level) pairs needed to plot ``params``."""
+    return {GFSWAVE_IDX_FIELDS[name] for name in gfswave_variables(params, dataset)}
+
+
+def idx_byte_ranges(entries: list, fields: set, max_gap: int = RANGE_MERGE_GAP) -> list:
+    """Byte ranges ``(start, end)`` covering the wanted messages.
+
+    Neighbouring ranges separated by at most ``max_gap`` bytes are merged.
+    ``end`` is inclusive, or ``None`` when the range runs to end of file.
+    """
+    wanted = [e for e in entries if (e["var"], e["level"]) in fields]
+    missing = set(fields) - {(e["var"], e["level"]) for e in wanted}
+    if missing:
+        raise ValueError(f"[ERROR] Fields missing from idx: {sorted(missing)}")
+
+    ranges = []
+    for e in wanted:
+        start, end = e["offset"], e["end"]
+        if ranges:
+            prev_start, prev_end = ranges[-1]
+            if prev_end is not None and start - prev_end - 1 <= max_gap:
+                ranges[-1] = (prev_start, end)
+                continue
+        ranges.append((start, end))
+    return ranges
+
+
+def _fetch_ranges(url: str, ranges: list, dest: Path) -> int:
+    """Fetch byte ranges of ``url`` and concatenate them into ``dest``."""
+    client = default_client()
+    with open(dest, "w+b") as out:
+        for start, end in ranges:
+            spec = f"bytes={start}-" if end is None else f"bytes={start}-{end}"
+            position = out.tell()
+            resp = client.request("GET", url, {"Range": spec}, sink=out)
+            if resp.status == 200:
+                # Server ignored Range: cut every range out of the full body.
+                out.seek(position)
+                body = out.read()
+                parts = [body[s:] if e is None else body[s:e + 1] for s, e in ranges]
+                out.seek(0)
+                out.truncate()
+                for part in parts:
+                    out.write(part)
+                break
+        return out.tell()
+
+
+def _fetch_subset(url: str, dest: Path, params: Iterable[str]) -> Path:
+    """Download only the GRIB messages needed for ``params`` using the .idx.
+
+    The result is checked against the .idx: a short or garbled transfer
+    raises :class:`~plotter.core.grib_cache.CorruptGribError`.
+    """
+    entries = _fetch_idx(url)
+    ranges = idx_byte_ranges(entries, gfswave_idx_fields(params), RANGE_MERGE_GAP)
+    print(f"[INFO] Downloading {len(ranges)} byte range(s) of {url}")
+    _fetch_ranges(url, ranges, dest)
+    grib_cache.verify_grib(dest, grib_cache.expected_offsets(entries, ranges))
+    return dest
+
+
+def _download_subset(url: str, cache_path: Path, params: Iterable[str]) -> Path:
+    if not grib_cache.is_cached(cache_path):
+        with grib_cache.atomic_file(cache_path) as part:
+            _fetch_subset(url, part, params)
     return cache_path
 
 
+def _subset_tag(params: Iterable[str]) -> str:
+    return "-".join(sorted(set(params)))
+
+
 def _normalize_coords(da: xr.DataArray) -> xr.DataArray:
     rename = {}
     if "longitude" in da.coords:
@@ -49,14 +265,86 @@ def _normalize_coords(da: xr.DataArray) -> xr.DataArray:
     return da
 
 
-def _open_grib_file(path: Path) -> xr.Dataset:
-    parts = cfgrib.open_datasets(str(path))
+def _open_grib_file(path: Path, variables=None) -> xr.Dataset:
+    """cfgrib decode limited to the shortNames of ``variables``.
+
+    The index is kept next to the GRIB2, in its cycle directory, so it counts
+    against the cache budget and is evicted (or cleaned up) with the file.
+    """
+    short_names = sorted({GFSWAVE_GRIB_KEYS[name][0] for name in (variables or GFSWAVE_GRIB_KEYS)})
+    indexpath = path.with_name(f"{path.name}.{{short_hash}}.idx")
+    parts = cfgrib.open_datasets(
+        str(path),
+        backend_kwargs={"filter_by_keys": {"shortName": short_names}, "indexpath": str(indexpath)},
+    )
     merged = xr.merge(parts, compat="override")
     return merged
 
 
+def _message_partition(h):
+    if eccodes.codes_get(h, "typeOfLevel") == "orderedSequenceData":
+        return eccodes.codes_get(h, "level")
+    return None
+
+
+def decode_gfswave_file(path: Path, variables=None) -> xr.Dataset:
+    """Decode only ``variables`` of a GFS Wave GRIB2 file (default: every one present).
+
+    Every message header is read, but values are decoded only for the wanted
+    shortName/partition, straight into float32. The result is shaped like
+    :func:`normalize_gfswave_dataset` output. Grids other than regular
+    lat/lon go through cfgrib, filtered to the same shortNames.
+    """
+    path = Path(path)
+    wanted = {GFSWAVE_GRIB_KEYS[name]: name for name in (variables or GFSWAVE_GRIB_KEYS)}
+    fields = {}
+    lat = lon = valid = None
+    with open(path, "rb") as f:
+        while len(fields) < len(wanted):
+            h = eccodes.codes_grib_new_from_file(f)
+            if h is None:
+                break
+            try:
+                name = wanted.get((eccodes.codes_get(h, "shortName"), _message_partition(h)))
+                if name is None or name in fields:
+                    continue
+                if lat is None:
+                    if eccodes.codes_get(h, "gridType") != "regular_ll":
+                        return normalize_gfswave_dataset(_open_grib_file(path, wanted.values()))
+                    lat = np.array(eccodes.codes_get_array(h, "distinctLatitudes"))
+                    lon = np.array(eccodes.codes_get_array(h, "distinctLongitudes"))
+                    if eccodes.codes_get(h, "jScansPositively") == 0:
+                        lat = lat[::-1] if lat[0] < lat[-1] else lat
+                    valid = pd.Timestamp(
+                        f"{eccodes.codes_get(h, 'validityDate')}{eccodes.codes_get(h, 'validityTime'):04d}"
+                    )
+                values = eccodes.codes_get_float_array(h, "values")
+                if eccodes.codes_get(h, "bitmapPresent"):
+                    values[values == eccodes.codes_get_double(h, "missingValue")] = np.nan
+                fields[name] = xr.Variable(
+                    ("time", "lat", "lon"),
+                    values.astype(np.float32, copy=False).reshape(1, len(lat), len(lon)),
+                    {"units": eccodes.codes_get(h, "units"), "GRIB_shortName": eccodes.codes_get(h, "shortName")},
+                )
+            finally:
+                eccodes.codes_release(h)
+
+    missing = sorted(set(wanted.values()) - set(fields))
+    if (variables and missing) or not fields:
+        raise ValueError(f"[ERROR] Variables {missing} not found in {path}")
+    return xr.Dataset(
+        {name: fields[name] for name in sorted(fields)},
+        coords={"time": [valid.to_datetime64()], "lat": lat, "lon": lon},
+    )
+
+
 def normalize_gfswave_dataset(ds: xr.Dataset) -> xr.Dataset:
     """Map GRIB shortNames to legacy OpenDAP variable names used by handlers."""
+    with metrics.span("normalize"):
+        return _normalize_gfswave_dataset(ds)
+
+
+def _normalize_gfswave_dataset(ds: xr.Dataset) -> xr.Dataset:
     out = {}
 
     if "u" in ds:
@@ -68,11 +356,17 @@ def normalize_gfswave_dataset(ds: xr.Dataset) -> xr.Dataset:
     if "dirpw" in ds:
         out["dirpwsfc"] = _normalize_coords(ds["dirpw"])
 
-    if "shts" in ds and "orderedSequenceData" in ds["shts"].dims:
-        swell_mag = ds["shts"].isel(orderedSequenceData=0)
+    # A full file carries all swell partitions along orderedSequenceData; a
+    # byte-range subset carries only partition 1, as a scalar coordinate.
+    if "shts" in ds:
+        swell_mag = ds["shts"]
+        if "orderedSequenceData" in swell_mag.dims:
+            swell_mag = swell_mag.isel(orderedSequenceData=0)
         out["swell_1"] = _normalize_coords(swell_mag)
-    if "swdir" in ds and "orderedSequenceData" in ds["swdir"].dims:
-        swell_dir = ds["swdir"].isel(orderedSequenceData=0)
+    if "swdir" in ds:
+        swell_dir = ds["swdir"]
+        if "orderedSequenceData" in swell_dir.dims:
+            swell_dir = swell_dir.isel(orderedSequenceData=0)
         out["swdir_1"] = _normalize_coords(swell_dir)
 
     if not out:
@@ -94,33 +388,240 @@ def normalize_gfswave_dataset(ds: xr.Dataset) -> xr.Dataset:
     return result
 
 
-def load_gfswave_forecast(cycle: str, forecast_hour: int, cache: bool = True) -> xr.Dataset:
-    """Load one GFS Wave forecast hour as handler-compatible xarray Dataset."""
+def _bbox_tag(bbox) -> str:
+    return "crop_" + "_".join(f"{v:g}" for v in bbox)
+
+
+def _cropped_cache_path(grib_path: Path, bbox) -> Path:
+    return grib_path.with_name(grib_path.name.replace(".grib2", f".{_bbox_tag(bbox)}.nc"))
+
+
+def crop_gfswave_dataset(ds: xr.Dataset, bbox) -> xr.Dataset:
+    """Crop every variable to ``bbox`` ([min_lon, max_lon, min_lat, max_lat]).
+
+    GFS Wave longitudes run 0..360, so western-hemisphere bboxes are shifted.
+    """
+    minlon, maxlon, minlat, maxlat = bbox
+    if minlon < 0 and float(ds["lon"].max()) > 180:
+        minlon, maxlon = minlon + 360, maxlon + 360
+    cropped = subset_bbox(ds, [minlon, maxlon, minlat, maxlat])
+    if not cropped.sizes.get("lon") or not cropped.sizes.get("lat"):
+        raise ValueError(f"[ERROR] Crop bbox {bbox} does not overlap the GFS Wave grid")
+    return cropped
+
+
+def download_gfswave_forecast(
+    cycle: str,
+    forecast_hour: int,
+    params: Optional[Iterable[str]] = None,
+    bbox=None,
+) -> Path:
+    """Download one GFS Wave forecast hour into the cache and return its path.
+
+    With ``params`` (e.g. ``("wind", "swh")``) only the GRIB messages those
+    handlers need are fetched, via HTTP Range requests driven by the .idx.
+    With ``bbox``, an already cropped NetCDF copy is returned if present.
+    After a download, least recently used cycles are evicted to keep the
+    cache within ``CACHE_BUDGET``.
+    """
     url = gfswave_grib_url(cycle, forecast_hour)
+    grib_cache.touch_cycle(CACHE_DIR / cycle)
+    full_path = CACHE_DIR / cycle / f"f{forecast_hour:03d}.grib2"
+    if params is None or grib_cache.is_cached(full_path):
+        grib_path = full_path
+    else:
+        grib_path = CACHE_DIR / cycle / f"f{forecast_hour:03d}.{_subset_tag(params)}.grib2"
+
+    if bbox is not None:
+        cropped = _cropped_cache_path(grib_path, bbox)
+        if cropped.exists():
+            return cropped
+
+    if grib_cache.is_cached(grib_path):
+        return grib_path
+    with metrics.span("download", cycle=cycle, hour=forecast_hour, subset=grib_path is not full_path) as span:
+        if grib_path is full_path:
+            _download(url, full_path)
+        else:
+            _download_subset(url, grib_path, params)
+        span["bytes"] = grib_path.stat().st_size
+    grib_cache.prune(CACHE_DIR, CACHE_BUDGET, keep={cycle})
+    return grib_path
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def open_gfswave_file(path: Path, bbox=None, params: Optional[Iterable[str]] = None) -> xr.Dataset:
+    """Decode a downloaded GFS Wave file into a handler-compatible Dataset.
+
+    Only the variables of ``params`` (default: all) are decoded. With
+    ``bbox`` the decoded GRIB2 is cropped and replaced in the cache by a
+    compact NetCDF copy, which later calls read directly; that copy keeps
+    every variable the file holds, as other params may read it later.
+    """
+    path = Path(path)
+    if path.suffix == ".nc":
+        with metrics.span("read_cropped", bytes=path.stat().st_size), xr.open_dataset(path) as ds:
+            return ds.load()
+
+    variables = gfswave_variables(params) if bbox is None and params is not None else None
+    with metrics.span("decode", bytes=path.stat().st_size):
+        ds = decode_gfswave_file(path, variables)
+        # Content hash of the downloaded messages, kept through the cropped cache
+        # so incremental renders can tell whether an hour's input changed.
+        ds.attrs[INPUT_DIGEST_ATTR] = _file_digest(path)
+    if bbox is None:
+        return ds
+
+    with metrics.span("crop") as span:
+        ds = crop_gfswave_dataset(ds, bbox).load()
+        target = _cropped_cache_path(path, bbox)
+        with grib_cache.atomic_file(target) as part:
+            ds.to_netcdf(part, encoding={name: {"zlib": True, "complevel": 1} for name in ds.data_vars})
+        span["bytes"] = target.stat().st_size
+    # Drop the global GRIB2 and any cfgrib index (<name>.<hash>.idx) written next to it.
+    for leftover in path.parent.glob(path.name + "*"):
+        leftover.unlink(missing_ok=True)
+    return ds
+
+
+def load_gfswave_forecast(
+    cycle: str,
+    forecast_hour: int,
+    cache: bool = True,
+    params: Optional[Iterable[str]] = None,
+    bbox=None,
+) -> xr.Dataset:
+    """Load one GFS Wave forecast hour as handler-compatible xarray Dataset."""
     if cache:
-        cache_path = CACHE_DIR / cycle / f"f{forecast_hour:03d}.grib2"
-        path = _download(url, cache_path)
+        path = download_gfswave_forecast(cycle, forecast_hour, params=params, bbox=bbox)
+        return open_gfswave_file(path, bbox=bbox, params=params)
+
+    url = gfswave_grib_url(cycle, forecast_hour)
+    tmp = tempfile.NamedTemporaryFile(suffix=".grib2", delete=False)
+    tmp.close()
+    if params is None:
+        default_client().download(url, Path(tmp.name))
+        grib_cache.verify_grib(Path(tmp.name), grib_cache.expected_offsets(_fetch_idx(url), [(0, None)]))
     else:
-        tmp = tempfile.NamedTemporaryFile(suffix=".grib2", delete=False)
-        urllib.request.urlretrieve(url, tmp.name)
-        path = Path(tmp.name)
+        _fetch_subset(url, Path(tmp.name), params)
 
-    raw = _open_grib_file(path)
-    return normalize_gfswave_dataset(raw)
+    ds = open_gfswave_file(Path(tmp.name), params=params)
+    if bbox is not None:
+        ds = crop_gfswave_dataset(ds, bbox)
+    return ds
 
 
-def load_gfswave_cycle(cycle: str, max_hours: int) -> xr.Dataset:
-    """Load consecutive hourly forecasts into a single dataset with time dimension."""
-    datasets = []
-    for t in range(max_hours):
-        try:
-            ds = load_gfswave_forecast(cycle, t)
-            datasets.append(ds)
-        except Exception as exc:
-            print(f"[WARN] Stopping at t+{t:03d}h: {exc}")
-            break
+def iter_gfswave_cycle(
+    cycle: str,
+    max_hours: int,
+    params: Optional[Iterable[str]] = None,
+    workers: int = DEFAULT_WORKERS,
+    host_limit: int = DEFAULT_HOST_LIMIT,
+    bbox=None,
+    store=None,
+):
+    """Yield ``(hour, dataset)`` for the forecast hours of a cycle before ``max_hours``.
+
+    Hours follow the GFS Wave output schedule (:func:`gfswave_forecast_hours`).
+    Up to ``workers`` hours are downloaded concurrently; decoding (and
+    cropping to ``bbox``) happens in the caller's thread, in hour order.
+    Stops at the first hour that is not available. Transient HTTP failures
+    are retried (and resumed) by the shared HTTP client only.
+    """
+    return iter_gfswave_hours(
+        cycle,
+        gfswave_forecast_hours(max_hours),
+        params=params,
+        workers=workers,
+        host_limit=host_limit,
+        bbox=bbox,
+        store=store,
+    )
+
+
+def iter_gfswave_hours(
+    cycle: str,
+    hours: Iterable[int],
+    params: Optional[Iterable[str]] = None,
+    workers: int = DEFAULT_WORKERS,
+    host_limit: int = DEFAULT_HOST_LIMIT,
+    bbox=None,
+    store=None,
+):
+    """Like :func:`iter_gfswave_cycle` for an explicit list of forecast hours.
+
+    With a ``store`` (:class:`~plotter.core.cycle_store.CycleStore`), hours it
+    already holds are read from it and newly decoded hours are appended.
+    """
+    params = list(params) if params is not None else None
+    hours = list(hours)
+    stored = set()
+    grib_cache.touch_cycle(CACHE_DIR / cycle)
+    if store is not None:
+        needed = gfswave_variables(params)
+        stored = {t for t in hours if store.has(t, needed)}
+    downloads = fetch_hours(
+        lambda t: download_gfswave_forecast(cycle, t, params=params, bbox=bbox),
+        [t for t in hours if t not in stored],
+        url_for=lambda t: gfswave_grib_url(cycle, t),
+        workers=workers,
+        host_limit=host_limit,
+        # default_client() already retries and resumes each request.
+        retries=0,
+    )
+    for t in hours:
+        # Not held across the yield: the context would leak into the caller.
+        with metrics.context(cycle=cycle, hour=t):
+            if t in stored:
+                with metrics.span("store_read"):
+                    ds = store.hour(t)
+            else:
+                fetched = next(downloads, None)
+                if fetched is None:
+                    return
+                try:
+                    ds = open_gfswave_file(fetched[1], bbox=bbox, params=params)
+                except Exception as exc:
+                    print(f"[WARN] Stopping at t+{t:03d}h: {exc}")
+                    return
+                if store is not None:
+                    try:
+                        with metrics.span("store_append"):
+                            store.append(t, ds)
+                    except ValueError as exc:
+                        print(f"[WARN] t+{t:03d}h not stored: {exc}")
+        yield t, ds
+
+
+def load_gfswave_cycle(
+    cycle: str,
+    max_hours: int,
+    params: Optional[Iterable[str]] = None,
+    workers: int = DEFAULT_WORKERS,
+    bbox=None,
+    store=None,
+    load: bool = False,
+) -> xr.Dataset:
+    """Load the forecast hours of a cycle into a single dataset with time dimension.
+
+    Hours are appended to ``store`` (default: the cycle's map-layout
+    :class:`~plotter.core.cycle_store.CycleStore`) one at a time, and the
+    result is opened lazily from it rather than concatenated in memory.
+    ``load`` reads it into memory, within the store's memory budget.
+    """
+    from .cycle_store import CycleStore
+
+    store = store or CycleStore.for_cycle(cycle, bbox)
+    hours = [t for t, _ in iter_gfswave_cycle(cycle, max_hours, params=params, workers=workers, bbox=bbox, store=store)]
 
-    if not datasets:
+    if not hours:
         raise RuntimeError(f"No GFS Wave data loaded for cycle {cycle}")
 
-    return xr.concat(datasets, dim="time")
+    return store.open(hours, load=load)
@@ -0,0 +1,172 @@
+"""Quantized binary grids of forecast fields, for colouring and value lookups in the browser.
+
+File layout (little endian)::
+
+    b"NWGRID1\\0"       8-byte magic
+    uint32              length of the JSON header
+    header              UTF-8 JSON, space-padded to a multiple of 4 bytes
+    values              uint8/uint16 codes, row-major (ny, nx), row 0 at ``lat0``
+    direction           optional uint8 codes, same shape
+
+Array offsets in the header (``byte_offset``) count from the end of the
+header. A value is ``offset + code * scale`` unless ``code == nodata``; a
+direction is ``code * 360 / 255`` degrees, the direction the wind or waves
+come from, clockwise from north (255 is nodata). Written with numpy only.
+"""
+
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from .grib_cache import atomic_file
+from .utils import load_model_params
+
+MAGIC = b"NWGRID1\0"
+GRID_VERSION = 1
+DEFAULT_BITS = 8
+DIRECTION_STEP = 360.0 / 255.0
+DIRECTION_NODATA = 255
+
+
+def quantize(values, bits: int = DEFAULT_BITS, vmin=None, vmax=None):
+    """Codes of ``values`` over [vmin, vmax] (default: finite range) as (codes, scale, offset, nodata)."""
+    if bits not in (8, 16):
+        raise ValueError(f"[ERROR] Grid export supports 8 or 16 bits, got {bits}")
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    nodata = 2 ** bits - 1
+    if finite.any():
+        vmin = float(values[finite].min()) if vmin is None else float(vmin)
+        vmax = float(values[finite].max()) if vmax is None else float(vmax)
+    else:
+        vmin, vmax = 0.0, 0.0
+    scale = (vmax - vmin) / (nodata - 1) if vmax > vmin else 1.0
+    codes = np.full(values.shape, nodata, dtype=np.uint8 if bits == 8 else np.uint16)
+    codes[finite] = np.clip(np.rint((values[finite] - vmin) / scale), 0, nodata - 1)
+    return codes, scale, vmin, nodata
+
+
+def dequantize(codes, scale: float, offset: float, nodata: int) -> np.ndarray:
+    values = offset + np.asarray(codes, dtype=np.float64) * scale
+    values[np.asarray(codes) == nodata] = np.nan
+    return values
+
+
+def quantize_direction(degrees) -> np.ndarray:
+    """uint8 codes of directions in degrees (``DIRECTION_STEP`` resolution)."""
+    degrees = np.asarray(degrees, dtype=np.float64)
+    finite = np.isfinite(degrees)
+    codes = np.full(degrees.shape, DIRECTION_NODATA, dtype=np.uint8)
+    codes[finite] = np.rint(np.mod(degrees[finite], 360.0) / DIRECTION_STEP) % DIRECTION_NODATA
+    return codes
+
+
+def field_components(ds, dataset: str, param: str, time_index: int = 0):
+    """(magnitude, direction-from in degrees or None) of ``param`` at one time."""
+    names = load_model_params(dataset)[param]
+
+    def var(name):
+        da = ds[names[name]]
+        return da.isel(time=time_index) if "time" in da.dims else da
+
+    if "u" in names:
+        u, v = var("u"), var("v")
+        direction = np.degrees(np.arctan2(-u, -v)) % 360.0
+        return np.hypot(u, v), direction
+    if "mag" in names:
+        return var("mag"), var("dir")
+    return var("var"), None
+
+
+def _grid_geometry(field) -> dict:
+    lon = np.asarray(field.lon.values, dtype=np.float64)
+    lat = np.asarray(field.lat.values, dtype=np.float64)
+    if field.dims != ("lat", "lon"):
+        field = field.transpose("lat", "lon")
+    return {
+        "shape": [len(lat), len(lon)],
+        "lon0": float(lon[0]),
+        "lat0": float(lat[0]),
+        "dlon": float(lon[1] - lon[0]) if len(lon) > 1 else 0.0,
+        "dlat": float(lat[1] - lat[0]) if len(lat) > 1 else 0.0,
+    }, field
+
+
+def export_grid(ds, dataset: str, param: str, path, settings=None, time_index: int = 0, meta=None) -> int:
+    """Write ``param`` of ``ds`` as a quantized grid file; returns its size in bytes.
+
+    ``settings`` are the resolved config.yaml settings of ``param`` (levels,
+    cmap colours, unit and ``grid.bits``), copied into the header.
+    """
+    settings = settings or {}
+    bits = int((settings.get("grid") or {}).get("bits", DEFAULT_BITS))
+    magnitude, direction = field_components(ds, dataset, param, time_index)
+    geometry, magnitude = _grid_geometry(magnitude)
+
+    codes, scale, offset, nodata = quantize(magnitude.values, bits)
+    arrays = [codes]
+    header = {
+        "version": GRID_VERSION,
+        "param": param,
+        **geometry,
+        "values": {"dtype": codes.dtype.name, "scale": scale, "offset": offset, "nodata": nodata, "byte_offset": 0},
+        "direction": None,
+    }
+    if direction is not None:
+        _, direction = _grid_geometry(direction)
+        dir_codes = quantize_direction(direction.values)
+        header["direction"] = {
+            "dtype": "uint8",
+            "scale": DIRECTION_STEP,
+            "nodata": DIRECTION_NODATA,
+            "byte_offset": codes.nbytes,
+        }
+        arrays.append(dir_codes)
+
+    levels = settings.get("levels")
+    if levels is not None and not isinstance(levels, dict):
+        header["levels"] = [float(v) for v in levels]
+    cmap = settings.get("cmap")
+    if isinstance(cmap, (list, tuple)):
+        header["colors"] = list(cmap)
+    for key in ("extend", "unit"):
+        if settings.get(key) is not None:
+            header[key] = settings[key]
+    header.update(meta or {})
+
+    raw = json.dumps(header, default=str).encode()
+    raw += b" " * (-len(raw) % 4)
+    path = Path(path)
+    with atomic_file(path) as part, open(part, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(raw)))
+        f.write(raw)
+        for arr in arrays:
+            f.write(np.ascontiguousarray(arr).astype(arr.dtype.newbyteorder("<"), copy=False).tobytes())
+    return path.stat().st_size
+
+
+def read_grid(path):
+    """(header, values, direction) of a grid file, decoded to float (NaN for nodata)."""
+    data = Path(path).read_bytes()
+    if data[:8] != MAGIC:
+        raise ValueError(f"[ERROR] {path} is not a NusaWave grid file")
+    (length,) = struct.unpack("<I", data[8:12])
+    header = json.loads(data[12:12 + length])
+    body = data[12 + length:]
+    shape = tuple(header["shape"])
+
+    def array(spec):
+        dtype = np.dtype(spec["dtype"]).newbyteorder("<")
+        count = shape[0] * shape[1]
+        return np.frombuffer(body, dtype=dtype, count=count, offset=spec["byte_offset"]).reshape(shape)
+
+    spec = header["values"]
+    values = dequantize(array(spec), spec["scale"], spec["offset"], spec["nodata"])
+    direction = None
+    if header.get("direction"):
+        spec = header["direction"]
+        direction = dequantize(array(spec), spec["scale"], 0.0, spec["nodata"])
+    return header, values, direction
@@ -0,0 +1,269 @@
+"""Pooled HTTP client for NOMADS: keep-alive, timeouts, retries and resumable transfers.
+
+One :class:`HttpClient` is shared per process (:func:`default_client`), so
+download threads reuse TLS connections to the same host instead of paying a
+handshake per forecast hour. A transfer cut off midway is resumed with a
+``Range`` request from the last byte received, and every request leaves a
+:class:`TransferStats` record (bytes, latency, throughput) on the client.
+"""
+
+import http.client
+import io
+import random
+import ssl
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from email.message import Message
+from pathlib import Path
+from typing import Optional
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlsplit
+
+from .downloader import DEFAULT_RETRIES, RETRY_STATUS
+
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_BACKOFF = 1.0
+# Idle keep-alive connections kept per host.
+POOL_SIZE = 8
+CHUNK_SIZE = 1 << 20
+MAX_REDIRECTS = 5
+STATS_KEPT = 10000
+USER_AGENT = "nusawave-forecast"
+
+
+@dataclass
+class TransferStats:
+    """One request as seen by the client (resumed parts count as attempts)."""
+
+    method: str
+    url: str
+    status: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    attempts: int = 0
+    reused: bool = False
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second of the whole request, retries included."""
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class Response:
+    status: int
+    headers: Message
+    body: bytes = b""
+
+
+class _Retry(Exception):
+    """A transient failure; whatever body arrived is kept in the sink."""
+
+    def __init__(self, cause, stale: bool = False):
+        super().__init__(str(cause))
+        self.cause = cause
+        self.stale = stale
+
+
+def _resume_range(header: Optional[str], done: int) -> str:
+    """``Range`` header asking for what is left after ``done`` body bytes."""
+    if not header:
+        return f"bytes={done}-"
+    start, _, end = header.split("=", 1)[1].partition("-")
+    return f"bytes={int(start) + done}-{end}"
+
+
+class HttpClient:
+    """Thread-safe HTTP/1.1 client with a keep-alive connection pool per host."""
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        pool_size: int = POOL_SIZE,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.stats = deque(maxlen=STATS_KEPT)
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._ssl = ssl.create_default_context()
+        self.connections = 0
+
+    # -- connection pool -------------------------------------------------
+
+    def _acquire(self, scheme: str, netloc: str):
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+            self.connections += 1
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout, context=self._ssl), False
+        return http.client.HTTPConnection(netloc, timeout=self.timeout), False
+
+    def _release(self, scheme: str, netloc: str, conn, reusable: bool):
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault((scheme, netloc), [])
+                if len(idle) < self.pool_size:
+                    idle.append(conn)
+                    return
+        conn.close()
+
+    def close(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    # -- requests --------------------------------------------------------
+
+    def _attempt(self, method, url, headers, sink, stats, origin, resuming, timeout):
+        """One request on a pooled connection; a 2xx body is streamed to ``sink``."""
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        conn, reused = self._acquire(parts.scheme, parts.netloc)
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        stats.reused = stats.reused or reused
+        received = 0
+        try:
+            conn.request(method, path, headers={"User-Agent": USER_AGENT, **headers})
+            resp = conn.getresponse()
+            if not resuming or resp.status == 200:
+                # A 200 to a resume restarts the body: report it, not the first 206.
+                stats.status = resp.status
+            if method != "HEAD" and 200 <= resp.status < 300:
+                if resuming and resp.status == 200:
+                    # The server ignored the resume Range: start the body over.
+                    sink.seek(origin)
+                    sink.truncate()
+                expected = resp.length
+                while True:
+                    chunk = resp.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    sink.write(chunk)
+                    received += len(chunk)
+                if expected is not None and received < expected:
+                    raise http.client.IncompleteRead(b"", expected - received)
+            else:
+                resp.read()
+        except (OSError, http.client.HTTPException) as exc:
+            conn.close()
+            # A pooled connection the server has closed since: not a real failure.
+            stale = reused and received == 0 and isinstance(exc, (ConnectionError, http.client.BadStatusLine))
+            raise _Retry(exc, stale) from None
+        self._release(parts.scheme, parts.netloc, conn, not resp.will_close)
+        return resp
+
+    def request(self, method: str, url: str, headers=None, sink=None, timeout: Optional[float] = None) -> Response:
+        """Send ``method`` to ``url``, streaming a 2xx body into ``sink`` (default: memory).
+
+        Redirects are followed; transient failures are retried with jittered
+        exponential backoff, and a body cut off midway is resumed from the
+        last byte received. Raises :class:`urllib.error.HTTPError` for error
+        statuses and ``ConnectionError`` once retries run out. ``timeout``
+        (default: the client's) bounds each socket operation, not the transfer.
+        """
+        headers = dict(headers or {})
+        memory = sink is None
+        sink = io.BytesIO() if memory else sink
+        origin = sink.tell()
+        stats = TransferStats(method, url)
+        start = time.perf_counter()
+        done = 0
+        failures = 0
+        redirects = 0
+        try:
+            while True:
+                stats.attempts += 1
+                send = dict(headers)
+                if done:
+                    send["Range"] = _resume_range(headers.get("Range"), done)
+                try:
+                    resp = self._attempt(
+                        method, url, send, sink, stats, origin, done > 0, timeout or self.timeout
+                    )
+                except _Retry as retry:
+                    done = sink.tell() - origin
+                    if retry.stale:
+                        continue
+                    failures += 1
+                    if failures > self.retries:
+                        raise ConnectionError(f"[ERROR] {method} {url} failed: {retry.cause}") from retry.cause
+                    self._sleep(failures, f"{url}: {retry.cause}")
+                    continue
+
+                if resp.status in (301, 302, 303, 307, 308) and resp.getheader("Location"):
+                    redirects += 1
+                    if redirects > MAX_REDIRECTS:
+                        raise ConnectionError(f"[ERROR] Too many redirects for {url}")
+                    url = urljoin(url, resp.getheader("Location"))
+                    continue
+                if resp.status in RETRY_STATUS and failures < self.retries:
+                    failures += 1
+                    self._sleep(failures, f"{url}: HTTP {resp.status}")
+                    continue
+                if resp.status >= 400:
+                    raise HTTPError(url, resp.status, resp.reason, resp.headers, None)
+                done = sink.tell() - origin
+                return Response(stats.status, resp.headers, sink.getvalue() if memory else b"")
+        finally:
+            stats.bytes = done
+            stats.seconds = time.perf_counter() - start
+            self.stats.append(stats)
+
+    def _sleep(self, failures: int, reason: str):
+        delay = self.backoff * (2 ** (failures - 1)) * random.uniform(0.5, 1.5)
+        print(f"[WARN] {reason}; retrying in {delay:.1f}s ({failures}/{self.retries})")
+        time.sleep(delay)
+
+    def get(self, url: str, headers=None) -> Response:
+        return self.request("GET", url, headers)
+
+    def head(self, url: str, timeout: Optional[float] = None) -> Response:
+        return self.request("HEAD", url, timeout=timeout)
+
+    def download(self, url: str, dest: Path, headers=None) -> Response:
+        """Stream ``url`` into the file ``dest``."""
+        with open(dest, "wb") as f:
+            return self.request("GET", url, headers, sink=f)
+
+    def summary(self) -> dict:
+        """Totals over the recorded requests."""
+        stats = list(self.stats)
+        seconds = sum(s.seconds for s in stats)
+        total = sum(s.bytes for s in stats)
+        return {
+            "requests": len(stats),
+            "bytes": total,
+            "seconds": seconds,
+            "throughput": total / seconds if seconds > 0 else 0.0,
+            "retries": sum(s.attempts - 1 for s in stats),
+            "connections": self.connections,
+        }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def default_client() -> HttpClient:
+    """Process-wide HttpClient shared by every download thread."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -0,0 +1,82 @@
+"""Static map overlays rendered once and composited onto each data frame."""
+
+import hashlib
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from .grib_cache import atomic_file
+
+LAYER_CACHE_DIR = Path(tempfile.gettempdir()) / "nusawave_layer_cache"
+
+# Bump when the look of the static overlay changes, to invalidate disk caches.
+LAYER_VERSION = 1
+
+
+def figure_rgba(fig) -> np.ndarray:
+    """Draw ``fig`` with Agg and return a copy of its RGBA pixel buffer."""
+    fig.canvas.draw()
+    return np.array(fig.canvas.buffer_rgba())
+
+
+def composite(under: np.ndarray, over: np.ndarray, keep=()) -> np.ndarray:
+    """Alpha-blend ``over`` onto ``under`` (both straight-alpha RGBA uint8).
+
+    ``keep`` lists display-space bboxes (matplotlib ``Bbox``) where ``under``
+    must stay on top, e.g. per-frame annotation boxes drawn inside the axes.
+    """
+    if under.shape != over.shape:
+        raise ValueError(f"[ERROR] Layer size mismatch: {under.shape} vs {over.shape}")
+    alpha = over[..., 3:4].astype(np.float32) / 255.0
+    if keep:
+        alpha = alpha.copy()
+        height = under.shape[0]
+        for box in keep:
+            x0, x1 = int(np.floor(box.x0)), int(np.ceil(box.x1))
+            y0, y1 = height - int(np.ceil(box.y1)), height - int(np.floor(box.y0))
+            alpha[max(y0, 0):max(y1, 0), max(x0, 0):max(x1, 0)] = 0.0
+    out = under.astype(np.float32)
+    out[..., :3] = over[..., :3] * alpha + out[..., :3] * (1.0 - alpha)
+    out[..., 3:4] = np.maximum(out[..., 3:4], alpha * 255.0)
+    return np.rint(out).astype(np.uint8)
+
+
+class LayerCache:
+    """RGBA overlays keyed by region, projection, size and dpi; memory + disk."""
+
+    def __init__(self, root=LAYER_CACHE_DIR):
+        self.root = Path(root)
+        self._memory = {}
+
+    def key(self, **parts) -> str:
+        payload = json.dumps({"version": LAYER_VERSION, **parts}, sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode()).hexdigest()[:16]
+        region = parts.get("region") or "region"
+        return f"{region}_{parts.get('proj', 'proj')}_{parts.get('dpi', 0)}dpi_{digest}"
+
+    def get(self, key: str, render) -> np.ndarray:
+        """Return the overlay for ``key``, calling ``render()`` on a miss."""
+        if key in self._memory:
+            return self._memory[key]
+        path = self.root / f"{key}.npy"
+        if path.exists():
+            layer = np.load(path)
+        else:
+            layer = render()
+            with atomic_file(path) as part, open(part, "wb") as f:
+                np.save(f, layer)
+        self._memory[key] = layer
+        return layer
+
+
+_caches = {}
+
+
+def default_layer_cache(root=None) -> LayerCache:
+    """Process-wide LayerCache for ``root`` (default: LAYER_CACHE_DIR)."""
+    root = Path(root) if root else LAYER_CACHE_DIR
+    if root not in _caches:
+        _caches[root] = LayerCache(root)
+    return _caches[root]
@@ -0,0 +1,116 @@
+"""Render manifest: skip maps whose inputs, config and plotter code are unchanged."""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from .grib_cache import atomic_file
+
+# Dataset attribute holding the sha256 of the GRIB2 messages it was decoded from.
+INPUT_DIGEST_ATTR = "nusawave_input_sha256"
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+# The CLI drives rendering, tile and grid export and encoding, so it counts as plotter code.
+ENTRY_POINTS = ("src/plot.py",)
+
+_code_version = None
+
+
+def _code_sources(root: Path) -> list:
+    """Plotter package sources (test helpers excluded) and entry points under ``root``."""
+    package = root / "plotter"
+    paths = [p for p in package.rglob("*.py") if not p.relative_to(package).as_posix().startswith("testing/")]
+    paths += [root / rel for rel in ENTRY_POINTS if (root / rel).is_file()]
+    return sorted(paths)
+
+
+def code_version() -> str:
+    """Hash of the sources that decide what a map looks like."""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for path in _code_sources(PROJECT_ROOT):
+            digest.update(path.relative_to(PROJECT_ROOT).as_posix().encode())
+            digest.update(path.read_bytes())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def input_digest(ds, variables=None) -> str:
+    """Content hash of a forecast hour.
+
+    Uses the GRIB2 digest recorded at decode time when present; otherwise
+    hashes the coordinates and ``variables`` (default: all data variables).
+    """
+    recorded = ds.attrs.get(INPUT_DIGEST_ATTR)
+    if recorded:
+        return recorded
+    digest = hashlib.sha256()
+    names = sorted(ds.coords) + sorted(variables or ds.data_vars)
+    for name in names:
+        if name not in ds.variables:
+            continue
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(ds[name].values).tobytes())
+    return digest.hexdigest()
+
+
+def render_key(input_key: str, render, **frame) -> str:
+    """Key of one map: input hash, compiled config fingerprint, code version and
+    the per-frame values drawn into the image (times, source, footer year)."""
+    payload = json.dumps(
+        {
+            "input": input_key,
+            "config": render.fingerprint,
+            "code": code_version(),
+            "year": datetime.now().year,
+            **frame,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class RenderManifest:
+    """``{relative output path: render key}`` stored next to the maps it describes."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.path = self.root / MANIFEST_NAME
+        self.entries = {}
+        self._dirty = False
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+            except ValueError:
+                print(f"[WARN] Ignoring unreadable manifest {self.path}")
+                data = {}
+            if data.get("version") == MANIFEST_VERSION:
+                self.entries = data.get("outputs", {})
+
+    def _rel(self, fname) -> str:
+        return Path(fname).resolve().relative_to(self.root.resolve()).as_posix()
+
+    def is_current(self, fname, key: str) -> bool:
+        """True when ``fname`` exists and was last rendered with ``key``."""
+        return Path(fname).exists() and self.entries.get(self._rel(fname)) == key
+
+    def record(self, fname, key: str):
+        self.entries[self._rel(fname)] = key
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        with atomic_file(self.path) as part:
+            part.write_text(
+                json.dumps({"version": MANIFEST_VERSION, "outputs": dict(sorted(self.entries.items()))}, indent=1)
+            )
+        self._dirty = False
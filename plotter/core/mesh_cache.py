@@ -0,0 +1,93 @@
+"""Lat/lon grids projected once per (grid, projection), with their vector rotations."""
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import cartopy.crs as ccrs
+import numpy as np
+
+# Meshes kept per process: a few region grids per projection.
+MESH_CACHE_SIZE = 32
+
+# Step (degrees) used to measure the local lon/lat axes in map coordinates.
+_STEP = 1e-4
+
+_meshes = OrderedDict()
+
+
+@dataclass(frozen=True)
+class ProjectedMesh:
+    """Projected 2D coordinates of a regular lat/lon grid.
+
+    ``east``/``north`` are the map-coordinate directions of a small lon and lat
+    step at every point (same scale for both), i.e. the local Jacobian that
+    cartopy's ``transform_vectors`` measures on each call. ``key`` identifies
+    the (grid, projection) pair.
+    """
+
+    x: np.ndarray
+    y: np.ndarray
+    east: np.ndarray
+    north: np.ndarray
+    key: str = ""
+
+    def points(self, skip: int = 1):
+        return self.x[::skip, ::skip], self.y[::skip, ::skip]
+
+    def rotate(self, u, v, skip: int = 1):
+        """Map lon/lat vector components (already subsampled by ``skip``) to map axes.
+
+        Same result as ``proj.transform_vectors(PlateCarree(), ...)``: the
+        direction follows the projection, the magnitude is kept.
+        """
+        east = self.east[:, ::skip, ::skip]
+        north = self.north[:, ::skip, ::skip]
+        u = np.asarray(u, dtype=np.float64)
+        v = np.asarray(v, dtype=np.float64)
+        pu = u * east[0] + v * north[0]
+        pv = u * east[1] + v * north[1]
+        projected = np.hypot(pu, pv)
+        ratio = np.divide(np.hypot(u, v), projected, out=np.zeros_like(projected), where=projected > 0)
+        return pu * ratio, pv * ratio
+
+
+def _grid_key(lon, lat, proj) -> str:
+    digest = hashlib.sha1()
+    digest.update(proj.proj4_init.encode())
+    digest.update(np.ascontiguousarray(lon, dtype=np.float64).tobytes())
+    digest.update(b"|")
+    digest.update(np.ascontiguousarray(lat, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def projected_mesh(lon, lat, proj: ccrs.Projection) -> ProjectedMesh:
+    """Project the grid of 1D ``lon``/``lat`` into ``proj``, reusing earlier results."""
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    key = _grid_key(lon, lat, proj)
+    if key in _meshes:
+        _meshes.move_to_end(key)
+        return _meshes[key]
+
+    src = ccrs.PlateCarree()
+    lon2d, lat2d = np.meshgrid(lon, lat)
+    xyz = proj.transform_points(src, lon2d, lat2d)[..., :2]
+    # Step towards the equator so points at +/-90 stay inside the projection.
+    dlat = np.where(lat2d > 0, -_STEP, _STEP)
+    east = proj.transform_points(src, lon2d + _STEP, lat2d)[..., :2] - xyz
+    north = (proj.transform_points(src, lon2d, lat2d + dlat)[..., :2] - xyz) * np.sign(dlat)[..., None]
+    mesh = ProjectedMesh(
+        xyz[..., 0],
+        xyz[..., 1],
+        np.moveaxis(east, -1, 0),
+        np.moveaxis(north, -1, 0),
+        key,
+    )
+    for arr in (mesh.x, mesh.y, mesh.east, mesh.north):
+        arr.setflags(write=False)
+
+    _meshes[key] = mesh
+    while len(_meshes) > MESH_CACHE_SIZE:
+        _meshes.popitem(last=False)
+    return mesh
@@ -0,0 +1,170 @@
+"""Structured timing spans as JSON lines, and a Prometheus textfile summary.
+
+Spans are written only when ``NUSAWAVE_METRICS`` names a file (``plot.py
+--metrics``). Render pool workers inherit the variable, so every process
+appends to the same file, one JSON object per line::
+
+    {"span": "encode", "seconds": 0.05, "ok": true, "run": "...", "pid": 4242,
+     "cycle": "2026010100", "region": "java", "param": "swh", "hour": 3, "bytes": 81234}
+
+Task identity (cycle, region, param, hour) comes from the enclosing
+:func:`context` blocks; a span adds its own fields (bytes, counts).
+"""
+
+import contextvars
+import json
+import os
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from .grib_cache import atomic_file
+
+METRICS_ENV = "NUSAWAVE_METRICS"
+RUN_ENV = "NUSAWAVE_RUN_ID"
+PROMETHEUS_PREFIX = "nusawave"
+# Labels of the Prometheus summary; other span fields stay in the JSON lines.
+SUMMARY_LABELS = ("span", "region", "param")
+
+_context = contextvars.ContextVar("nusawave_metrics_context", default={})
+
+
+def configure(path, run_id=None) -> str:
+    """Send spans of this process and its future children to ``path``; returns the run id.
+
+    Each call starts a new run unless ``run_id`` is given.
+    """
+    run_id = run_id or uuid.uuid4().hex[:12]
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    os.environ[METRICS_ENV] = str(path)
+    os.environ[RUN_ENV] = run_id
+    return run_id
+
+
+def metrics_path():
+    return os.environ.get(METRICS_ENV) or None
+
+
+@contextmanager
+def context(**fields):
+    """Attach ``fields`` (e.g. region, param, hour) to every span inside the block."""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+@contextmanager
+def span(name: str, **fields):
+    """Time the block and emit it as one JSON line.
+
+    Yields the record, so the block can add fields such as ``bytes``. A
+    block that raises is recorded with ``"ok": false`` and the error
+    re-raised.
+    """
+    record = {"span": name, **_context.get(), **fields}
+    start = time.time()
+    clock = time.perf_counter()
+    ok = True
+    try:
+        yield record
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        path = metrics_path()
+        if path:
+            record.update(seconds=round(time.perf_counter() - clock, 6), ok=ok, time=round(start, 3))
+            emit(record, path)
+
+
+def emit(record: dict, path=None):
+    """Append ``record`` (plus run id and pid) to the metrics file, if one is configured."""
+    path = path or metrics_path()
+    if not path:
+        return
+    record = {"run": os.environ.get(RUN_ENV), "pid": os.getpid(), **record}
+    line = json.dumps({k: v for k, v in record.items() if v is not None}, default=str) + "\n"
+    # One O_APPEND write per line, so lines from concurrent workers never interleave.
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, line.encode())
+    finally:
+        os.close(fd)
+
+
+def read_spans(path, run=None) -> list:
+    """Spans in a metrics file, only those of ``run`` if given."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    spans = []
+    for line in path.read_text().splitlines():
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if run is None or record.get("run") == run:
+            spans.append(record)
+    return spans
+
+
+def summarize(spans) -> dict:
+    """{(span, region, param): {"count", "seconds", "bytes", "failures"}}."""
+    totals = defaultdict(lambda: {"count": 0, "seconds": 0.0, "bytes": 0, "failures": 0})
+    for record in spans:
+        key = tuple(str(record.get(label) or "") for label in SUMMARY_LABELS)
+        entry = totals[key]
+        entry["count"] += 1
+        entry["seconds"] += float(record.get("seconds", 0.0))
+        entry["bytes"] += int(record.get("bytes") or 0)
+        entry["failures"] += 0 if record.get("ok", True) else 1
+    return dict(totals)
+
+
+def _labels(values: dict) -> str:
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in values.items()) + "}"
+
+
+def write_prometheus(path, spans, labels=None) -> Path:
+    """Write a node_exporter textfile summarizing ``spans``, atomically.
+
+    ``labels`` (e.g. cycle, dataset) are added to every sample.
+    """
+    labels = dict(labels or {})
+    p = PROMETHEUS_PREFIX
+    lines = [
+        f"# HELP {p}_span_seconds Seconds spent in each span of the last run.",
+        f"# TYPE {p}_span_seconds summary",
+    ]
+    totals = summarize(spans)
+    for key, entry in sorted(totals.items()):
+        sample = _labels({**labels, **dict(zip(SUMMARY_LABELS, key))})
+        lines.append(f"{p}_span_seconds_sum{sample} {entry['seconds']:.6f}")
+        lines.append(f"{p}_span_seconds_count{sample} {entry['count']}")
+    lines += [f"# HELP {p}_span_bytes Bytes downloaded or written by each span.", f"# TYPE {p}_span_bytes gauge"]
+    for key, entry in sorted(totals.items()):
+        if entry["bytes"]:
+            lines.append(f"{p}_span_bytes{_labels({**labels, **dict(zip(SUMMARY_LABELS, key))})} {entry['bytes']}")
+    lines += [f"# HELP {p}_span_failures Failed spans in the last run.", f"# TYPE {p}_span_failures gauge"]
+    for key, entry in sorted(totals.items()):
+        if entry["failures"]:
+            lines.append(f"{p}_span_failures{_labels({**labels, **dict(zip(SUMMARY_LABELS, key))})} {entry['failures']}")
+    lines += [
+        f"# HELP {p}_last_run_timestamp_seconds End of the last run (Unix time).",
+        f"# TYPE {p}_last_run_timestamp_seconds gauge",
+        f"{p}_last_run_timestamp_seconds{_labels(labels)} {time.time():.0f}",
+    ]
+
+    path = Path(path)
+    with atomic_file(path) as part:
+        part.write_text("\n".join(lines) + "\n")
+    return path
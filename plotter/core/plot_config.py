@@ -1,3 +1,6 @@
+import copy
+
+
 class PlotConfig:
     """
     Flexible config container.
@@ -68,6 +71,7 @@ class PlotConfig:
             "colors": "black",
         }
 
-        # Dynamic config overrides (from YAML)
+        # Dynamic config overrides (from YAML); copied so that nested dicts
+        # such as quiver are never shared between configs.
         for k, v in kwargs.items():
-            setattr(self, k, v)
\ No newline at end of file
+            setattr(self, k, copy.deepcopy(v) if isinstance(v, (dict, list)) else v)
\ No newline at end of file
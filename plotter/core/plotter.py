@@ -1,14 +1,19 @@
 import importlib
-import math
 import os
 import sys
 import matplotlib.pyplot as plt
 import cartopy.crs as ccrs
 import cartopy.feature as cfeature
 from cartopy.mpl.gridliner import LONGITUDE_FORMATTER, LATITUDE_FORMATTER
-from .utils import get_projection, deep_update
+from .utils import get_projection, deep_update, figure_size, get_cmap_norm
 from .config_loader import load_param_config
+from .geometry_cache import region_geometries
+from . import metrics
+from .encoder import encode_options, write_image
+from .layers import composite, default_layer_cache, figure_rgba
+from .tiles import render_tile_pyramid
 from pathlib import Path
+from concurrent.futures import Future
 from matplotlib.offsetbox import (AnchoredOffsetbox, HPacker,
                                 TextArea)
 from matplotlib.ticker import FuncFormatter
@@ -30,9 +35,17 @@ def _ensure_project_root():
 class Plotter:
     """Main engine to plot any parameter using plugin handlers."""
 
-    def __init__(self, config):
+    def __init__(self, config, encoder=None):
         self.config = config
-        self.yaml_cfg  = load_param_config()
+        # With an ImageEncoder, maps are encoded and written in the background
+        # (flush the encoder before trusting the files); without, inline.
+        self.encoder = encoder
+        # Future of the encoded bytes of the last map written.
+        self.written = None
+        # Compiled configs (see render_config) are already resolved and shared
+        # read-only between plots; only legacy configs need config.yaml here.
+        self.compiled = getattr(config, "compiled", False)
+        self.yaml_cfg = None if self.compiled else load_param_config()
 
     def __format_tick__(self, x, pos):
         return f'{x:g}'
@@ -105,21 +118,17 @@ class Plotter:
 
     def _resolve_figsize(self):
         """Pick figure size from region bbox; portrait regions get a taller canvas."""
-        bbox = self.config.bbox or [90, 150, -20, 25]
-        lon_span = bbox[1] - bbox[0]
-        lat_span = bbox[3] - bbox[2]
-        lat_mid = (bbox[2] + bbox[3]) / 2
-        map_w = max(lon_span * math.cos(math.radians(lat_mid)), 1e-6)
-        map_h = max(lat_span, 1e-6)
-        aspect = map_h / map_w
-        portrait = aspect > 1.05
-        if portrait:
-            height = min(10.0, max(6.5, 6.5 * aspect))
-            return (5.5, height), True
-        width = min(11.0, max(7.0, 7.5 * (map_w / map_h)))
-        return (width, 6.0), False
+        if self.compiled:
+            return self.config.figsize, self.config.portrait
+        return figure_size(self.config.bbox)
 
     def _add_map_annotations(self, ax, fig, portrait):
+        self._add_header_annotations(ax, portrait)
+        self._add_footer_annotations(ax, portrait)
+
+    def _add_header_annotations(self, ax, portrait):
+        """Variable, region and time boxes; returns the artists added."""
+        artists = []
         initime, fcstime = self._time_annotation_lines()
         title_size = 7 if portrait else 9
         meta_size = 6 if portrait else 7
@@ -147,6 +156,7 @@ class Plotter:
             headerbox.patch.set_alpha(0.88)
             headerbox.patch.set_edgecolor("none")
             ax.add_artist(headerbox)
+            artists.append(headerbox)
         else:
             varbox = TextArea(
                 f"{self.config.var2display}\n{self._region_label()}",
@@ -179,7 +189,11 @@ class Plotter:
                 artist.patch.set_alpha(0.88)
                 artist.patch.set_edgecolor("none")
                 ax.add_artist(artist)
+                artists.append(artist)
+        return artists
 
+    def _add_footer_annotations(self, ax, portrait):
+        """Source and credit boxes; identical for every param and hour."""
         source = f"Source: {self.config.datasource}"
         credit = f"Nusawave Forecast \u00A9{datetime.now().year}"
         sourcetext = TextArea(
@@ -239,15 +253,7 @@ class Plotter:
             min_lon, max_lon, min_lat, max_lat = bbox
             ax.set_extent([min_lon, max_lon, min_lat, max_lat], crs=ccrs.PlateCarree())
         
-    def plot_map(self, ds, param):
-        self._apply_region_config(self.config.region)
-        self._apply_param_config(param)
-        handler = self._load_handler(param)
-        data = handler.load(ds)
-
-        figsize, portrait = self._resolve_figsize()
-        self.config.figsize = figsize
-
+    def _new_figure(self, figsize, portrait):
         proj = get_projection(self.config.proj)
         fig = plt.figure(figsize=figsize, dpi=self.config.dpi)
         if portrait:
@@ -255,58 +261,71 @@ class Plotter:
         else:
             fig.subplots_adjust(left=0.06, right=0.94, top=0.92, bottom=0.14)
         ax = plt.axes(projection=proj)
+        return fig, ax
+
+    def _add_colorbar(self, fig, ax, im, iq, portrait):
+        fig.canvas.draw()
+        bbox = ax.get_position()
+        cbar_width = bbox.width * 0.65
+        cbar_left = bbox.x0 + (bbox.width - cbar_width) / 2
+        cbar_bottom = bbox.y0 - (0.055 if portrait else 0.03)
+        cbar_height = 0.018
+        cbar_ax = fig.add_axes([cbar_left, cbar_bottom, cbar_width, cbar_height])
+
+        cbar = fig.colorbar(im, 
+                            cax=cbar_ax, 
+                            ticks = self.config.levels,
+                            orientation='horizontal', 
+                            pad=0.05,
+                            extend=self.config.extend)
+        cbar.ax.tick_params(direction='inout', labelsize=8)
+        cbar.ax.xaxis.set_major_formatter(FuncFormatter(self.__format_tick__))
+        cbar.set_label("")
+        cbar_ax.text(
+            1.05, -0.8,
+            f"{self.config.unit}",
+            va="center",
+            ha="left",
+            fontsize=9,
+            fontname="monospace",
+            rotation=0,
+            transform=cbar_ax.transAxes
+        )
 
-        im, iq = handler.plot(ax, data)
-
-        if im is not None:
-            fig.canvas.draw()
-            bbox = ax.get_position()
-            cbar_width = bbox.width * 0.65
-            cbar_left = bbox.x0 + (bbox.width - cbar_width) / 2
-            cbar_bottom = bbox.y0 - (0.055 if portrait else 0.03)
-            cbar_height = 0.018
-            cbar_ax = fig.add_axes([cbar_left, cbar_bottom, cbar_width, cbar_height])
-
-            cbar = fig.colorbar(im, 
-                                cax=cbar_ax, 
-                                ticks = self.config.levels,
-                                orientation='horizontal', 
-                                pad=0.05,
-                                extend=self.config.extend)
-            cbar.ax.tick_params(direction='inout', labelsize=8)
-            cbar.ax.xaxis.set_major_formatter(FuncFormatter(self.__format_tick__))
-            cbar.set_label("")
-            cbar_ax.text(
-                1.05, -0.8,
-                f"{self.config.unit}",
-                va="center",
-                ha="left",
-                fontsize=9,
-                fontname="monospace",
-                rotation=0,
-                transform=cbar_ax.transAxes
+        if iq is not None:
+            cbar_bbox = ax.get_position()
+            arrow_x = cbar_bbox.x0
+            arrow_y = cbar_bbox.y0 - (0.055 if portrait else 0.04)
+
+            fig.text(arrow_x + 0.06, arrow_y, self.config.arrlabel, fontsize=7, ha='center', va='center')
+            arrax = fig.add_axes([arrow_x, arrow_y - 0.005, 0.014, 0.01], frameon=True)
+            arrow_length = 0.01  # Length of the arrow
+            arrow_width = 0.01  # Width of the arrow shaft
+            head_width = 0.01  # Width of the arrow head
+            head_length = 0.01  # Length of the arrow head
+            overhang = 1
+
+            arrax.arrow(0+0.02, 0, arrow_length, arrow_width, head_width=head_width, head_length=head_length, overhang=overhang, fc='k', ec='k')
+            arrax.axis('off')
+
+    def _add_features(self, ax):
+        if getattr(self.config, "geometrycache", False) and self.config.bbox:
+            geoms = region_geometries(
+                self.config.region,
+                self.config.bbox,
+                self.config.proj,
+                cache_dir=getattr(self.config, "geometrycache_dir", None),
             )
-
-            if iq is not None:
-                cbar_bbox = ax.get_position()
-                arrow_x = cbar_bbox.x0
-                arrow_y = cbar_bbox.y0 - (0.055 if portrait else 0.04)
-
-                fig.text(arrow_x + 0.06, arrow_y, self.config.arrlabel, fontsize=7, ha='center', va='center')
-                arrax = fig.add_axes([arrow_x, arrow_y - 0.005, 0.014, 0.01], frameon=True)
-                arrow_length = 0.01  # Length of the arrow
-                arrow_width = 0.01  # Width of the arrow shaft
-                head_width = 0.01  # Width of the arrow head
-                head_length = 0.01  # Length of the arrow head
-                overhang = 1
-
-                arrax.arrow(0+0.02, 0, arrow_length, arrow_width, head_width=head_width, head_length=head_length, overhang=overhang, fc='k', ec='k')
-                arrax.axis('off')
-
+            proj = ax.projection
+            ax.add_geometries(geoms["coastline"], crs=proj, facecolor='none', edgecolor='black', linewidth=1, zorder=2)
+            ax.add_geometries(geoms["borders"], crs=proj, facecolor='none', edgecolor='black', linewidth=1, zorder=3)
+            ax.add_geometries(geoms["land"], crs=proj, edgecolor='black', facecolor='gray', zorder=2)
+            return
         ax.coastlines(linewidth=1, zorder=2)
         ax.add_feature(cfeature.BORDERS, linewidth=1, zorder=3)
         ax.add_feature(cfeature.LAND, edgecolor='black', facecolor='gray', zorder=2)
-        self._apply_bbox(ax, self.config.bbox)
+
+    def _add_gridlines(self, ax, portrait):
         ax.spines['geo'].set_visible(True)
         gl = ax.gridlines(
             crs=ccrs.PlateCarree(),
@@ -350,22 +369,211 @@ class Plotter:
                 bbox=dict(fc='lightgrey', alpha=0.8, ec='none', boxstyle="round,pad=0.4")
             )
 
-        self._add_map_annotations(ax, fig, portrait)
+    def _outfile_name(self):
+        if not os.path.exists(os.path.dirname(self.config.outfile)):
+            os.makedirs(os.path.dirname(self.config.outfile))
+        return f"{self.config.outfile}.{self.config.fileformat}"
+
+    def _metrics_context(self, param):
+        baserun = getattr(self.config, "baserun", None)
+        return metrics.context(
+            cycle=pd.Timestamp(baserun).strftime("%Y%m%d%H") if baserun is not None else None,
+            region=getattr(self.config, "region", None),
+            param=param,
+            hour=getattr(self.config, "forecast_hour", None),
+        )
+
+    def _save_frame(self, image):
+        """Write an RGBA frame to the outfile; returns a Future of the encoded bytes."""
+        fname = self._outfile_name()
+        options = encode_options(self.config.fileformat, getattr(self.config, "webp", None))
+        if self.encoder is not None:
+            future = self.encoder.submit(image, fname, self.config.fileformat, self.config.dpi, options)
+            print(f"[INFO] File queued for {fname}")
+            return future
+        future = Future()
+        future.set_result(write_image(image, fname, self.config.fileformat, self.config.dpi, options))
+        print(f"[INFO] File saved at {fname}")
+        return future
+
+    def plot_map(self, ds, param):
+        with self._metrics_context(param), metrics.span("plot_map") as record:
+            self.written = None
+            image = self._plot_map(ds, param)
+            if self.encoder is None and self.written is not None:
+                record["bytes"] = len(self.written.result())
+            return image
+
+    def _plot_map(self, ds, param):
+        if not self.compiled:
+            self._apply_region_config(self.config.region)
+            self._apply_param_config(param)
+        handler = self._load_handler(param)
+        with metrics.span("handler_load"):
+            data = handler.load(ds)
+
+        figsize, portrait = self._resolve_figsize()
+        if not self.compiled:
+            self.config.figsize = figsize
+
+        if getattr(self.config, "layercache", False):
+            return self._plot_map_layered(handler, data, figsize, portrait)
+
+        fig, ax = self._new_figure(figsize, portrait)
+
+        with metrics.span("plot"):
+            im, iq = handler.plot(ax, data)
+
+        if im is not None:
+            with metrics.span("colorbar"):
+                self._add_colorbar(fig, ax, im, iq, portrait)
+
+        with metrics.span("features"):
+            self._add_features(ax)
+            self._apply_bbox(ax, self.config.bbox)
+        with metrics.span("annotations"):
+            self._add_gridlines(ax, portrait)
+            self._add_map_annotations(ax, fig, portrait)
         plt.tick_params(axis='both', which='major', labelsize=4)
 
+        if not self.config.outfile:
+            plt.close(fig)
+            return None
+        # Rasterize here; encoding and writing can happen off this thread.
+        with metrics.span("draw"):
+            image = figure_rgba(fig)
+        plt.close(fig)
+        self.written = self._save_frame(image)
+        return image
+
+    def _render_static_layer(self, figsize, portrait):
+        """Features, gridlines, labels and footer on a transparent canvas."""
+        fig, ax = self._new_figure(figsize, portrait)
+        fig.patch.set_alpha(0)
+        ax.patch.set_visible(False)
+        self._apply_bbox(ax, self.config.bbox)
+        self._add_features(ax)
+        self._add_gridlines(ax, portrait)
+        self._add_footer_annotations(ax, portrait)
+        try:
+            return figure_rgba(fig)
+        finally:
+            plt.close(fig)
+
+    def _render_header_layer(self, figsize, position, portrait):
+        """Per-frame header boxes on a transparent canvas, over axes at ``position``."""
+        fig = plt.figure(figsize=figsize, dpi=self.config.dpi)
+        fig.patch.set_alpha(0)
+        ax = fig.add_axes(position)
+        ax.set_axis_off()
+        self._add_header_annotations(ax, portrait)
+        try:
+            return figure_rgba(fig)
+        finally:
+            plt.close(fig)
+
+    def _plot_map_layered(self, handler, data, figsize, portrait):
+        """Render only the data layer and composite the cached static overlay."""
+        fig, ax = self._new_figure(figsize, portrait)
+        with metrics.span("plot"):
+            im, iq = handler.plot(ax, data)
+        if im is not None:
+            with metrics.span("colorbar"):
+                self._add_colorbar(fig, ax, im, iq, portrait)
+        self._apply_bbox(ax, self.config.bbox)
+        # The overlay draws the map frame; drawing it twice thickens its edges.
+        ax.spines["geo"].set_visible(False)
+        with metrics.span("draw"):
+            frame = figure_rgba(fig)
+        header = self._render_header_layer(figsize, ax.get_position(), portrait)
+        plt.close(fig)
+
+        cache = default_layer_cache(getattr(self.config, "layercache_dir", None))
+        key = cache.key(
+            region=self.config.region,
+            bbox=self.config.bbox,
+            proj=self.config.proj,
+            dpi=self.config.dpi,
+            figsize=figsize,
+            datasource=self.config.datasource,
+            year=datetime.now().year,
+        )
+        with metrics.span("composite"):
+            overlay = cache.get(key, lambda: self._render_static_layer(figsize, portrait))
+            image = composite(composite(frame, overlay), header)
+
+        if self.config.outfile:
+            self.written = self._save_frame(image)
+        return image
+
+    def plot_tiles(self, ds, param):
+        """Render ``param`` into an XYZ tile pyramid under ``config.outfile``.
+
+        Needs a handler exposing the whole-grid scalar field as ``domain``
+        after ``load`` (wind, swh, swell); zooms come from ``config.tiles``.
+        """
+        with self._metrics_context(param), metrics.span("plot_tiles") as record:
+            record["tiles"] = self._plot_tiles(ds, param)
+            return record["tiles"]
+
+    def _plot_tiles(self, ds, param):
+        if not self.compiled:
+            self._apply_param_config(param)
+        handler = self._load_handler(param)
+        handler.load(ds)
+        field = getattr(handler, "domain", None)
+        if field is None:
+            raise ValueError(f"[ERROR] Tile output is not supported for '{param}'")
+
+        tiles = getattr(self.config, "tiles", None) or {}
+        cmap, norm = get_cmap_norm(self.config)
+        count = render_tile_pyramid(
+            field,
+            self.config.outfile,
+            range(tiles.get("minzoom", 3), tiles.get("maxzoom", 6) + 1),
+            cmap,
+            norm,
+            self.config.levels,
+            extend=self.config.extend,
+            bbox=tiles.get("bbox"),
+            fileformat=self.config.fileformat,
+            meta={"param": param, "unit": getattr(self.config, "unit", None)},
+        )
+        print(f"[INFO] {count} tiles saved under {self.config.outfile}")
+        return count
+
+    def plot_route(self, ds, route_points, speed_kn=None, depart=None, name=None):
+        """Forecast along waypoints ``[(lat, lon), ...]``, as a chart if ``outfile`` is set.
+
+        ``depart`` defaults to the first forecast hour and ``speed_kn`` to
+        routes.DEFAULT_SPEED_KN. Returns the track Dataset of
+        :func:`routes.interpolate_routes`.
+        """
+        from .routes import Route, interpolate_routes, plot_route_chart
+
+        route = Route(id=name or "route", waypoints=tuple(map(tuple, route_points)), name=name or "",
+                      depart=depart, speed_kn=speed_kn)
+        tracks = interpolate_routes(ds, [route], self.config.dataset or "gfswave")
         if self.config.outfile:
-            fname = f"{self.config.outfile}.{self.config.fileformat}"
-            if not os.path.exists(os.path.dirname(self.config.outfile)):
-                os.makedirs(os.path.dirname(self.config.outfile))
-            plt.savefig(fname, format=self.config.fileformat, dpi=self.config.dpi, bbox_inches=None, pad_inches=0.05)
+            # Local: the config is shared with later map renders.
+            fileformat = getattr(self.config, "fileformat", "png")
+            fname = f"{self.config.outfile}.{fileformat}"
+            plot_route_chart(tracks, route.id, fname, fileformat, self.config.dpi)
             print(f"[INFO] File saved at {fname}")
+        return tracks
 
-        plt.close(fig)
+    def plot_station(self, ds, lat, lon, name=None):
+        """Forecast time series at (lat, lon), as a meteogram if ``outfile`` is set.
 
-    def plot_route(self, ds, route_points):
-        """Later: along-track interpolation."""
-        raise NotImplementedError
+        Returns the (site, time) Dataset of :func:`stations.extract_sites`.
+        """
+        from .stations import Site, extract_sites, plot_meteogram
 
-    def plot_station(self, ds, lat, lon):
-        """Later: time-series plotting."""
-        raise NotImplementedError
+        site = Site(id=name or f"{lat:.3f}_{lon:.3f}", lat=float(lat), lon=float(lon), name=name or "")
+        series = extract_sites(ds, [site], self.config.dataset or "gfswave")
+        if self.config.outfile:
+            fileformat = getattr(self.config, "fileformat", "png")
+            fname = f"{self.config.outfile}.{fileformat}"
+            plot_meteogram(series, site.id, fname, fileformat, self.config.dpi)
+            print(f"[INFO] File saved at {fname}")
+        return series
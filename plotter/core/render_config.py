@@ -0,0 +1,143 @@
+"""config.yaml compiled once into frozen per-(region, param) render settings."""
+
+import copy
+import hashlib
+import json
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+import matplotlib
+import matplotlib.colors as mcolors
+import numpy as np
+
+from .config_loader import load_param_config
+from .plot_config import PlotConfig
+from .utils import deep_update, figure_size
+
+
+@dataclass(frozen=True)
+class RenderConfig:
+    """Resolved settings for one (region, param); shared, never mutated."""
+
+    region: str
+    param: str
+    settings: Mapping
+    figsize: Tuple[float, float]
+    portrait: bool
+    colormap: Optional[mcolors.Colormap]
+    norm: Optional[mcolors.Normalize]
+    fingerprint: str
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _levels_array(levels):
+    if not isinstance(levels, (list, tuple)) or not levels:
+        return _freeze(levels)
+    if not all(isinstance(v, (int, float)) for v in levels):
+        return _freeze(levels)
+    arr = np.asarray(levels, dtype=float)
+    arr.setflags(write=False)
+    return arr
+
+
+def _colormap_and_norm(settings):
+    cmap = settings.get("cmap")
+    levels = settings.get("levels")
+    if isinstance(cmap, list):
+        colormap = mcolors.ListedColormap(cmap)
+        norm = None
+        if isinstance(levels, list) and levels:
+            norm = mcolors.BoundaryNorm(boundaries=levels, ncolors=colormap.N, extend=settings.get("extend") or "neither")
+        return colormap, norm
+    if isinstance(cmap, str):
+        return matplotlib.colormaps[cmap], None
+    return None, None
+
+
+def resolve_settings(yaml_cfg: dict, region: str, param: str) -> dict:
+    """Merge PlotConfig defaults, config.yaml defaults, region and variable settings.
+
+    Same precedence as building a PlotConfig from defaults + variable settings
+    and then applying the region and variable overrides in Plotter.plot_map.
+    """
+    base = PlotConfig()
+    settings = {"proj": base.proj, "figsize": base.figsize, "dpi": base.dpi, "cmap": base.cmap,
+                "levels": base.levels, "extend": base.extend, "clims": base.clims,
+                "quiver": base.quiver, "contour": base.contour}
+    variable = yaml_cfg.get("variables", {}).get(param, {})
+    settings.update(copy.deepcopy(yaml_cfg.get("defaults", {})))
+    settings.update(copy.deepcopy(variable))
+    for overrides in (yaml_cfg.get("regions", {}).get(region, {}), variable):
+        for key, value in copy.deepcopy(overrides).items():
+            if isinstance(settings.get(key), dict) and isinstance(value, dict):
+                deep_update(settings[key], value)
+            else:
+                settings[key] = value
+    return settings
+
+
+def compile_render_config(yaml_cfg: dict, region: str, param: str) -> RenderConfig:
+    settings = resolve_settings(yaml_cfg, region, param)
+    figsize, portrait = figure_size(settings.get("bbox"))
+    colormap, norm = _colormap_and_norm(settings)
+    fingerprint = hashlib.sha256(
+        json.dumps({"region": region, "param": param, **settings}, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+    frozen = {k: _freeze(v) for k, v in settings.items()}
+    frozen["levels"] = _levels_array(settings.get("levels"))
+    return RenderConfig(
+        region=region,
+        param=param,
+        settings=MappingProxyType(frozen),
+        figsize=figsize,
+        portrait=portrait,
+        colormap=colormap,
+        norm=norm,
+        fingerprint=fingerprint,
+    )
+
+
+def compile_render_configs(yaml_cfg: Optional[dict] = None, regions=None, params=None) -> dict:
+    """Compile every (region, param) pair of config.yaml (or the given subset).
+
+    A ``None`` region compiles region-less settings, used for tile pyramids.
+    """
+    yaml_cfg = load_param_config() if yaml_cfg is None else yaml_cfg
+    regions = list(yaml_cfg.get("regions", {})) if regions is None else regions
+    params = list(yaml_cfg.get("variables", {})) if params is None else params
+    return {
+        (region, param): compile_render_config(yaml_cfg, region, param)
+        for region in regions
+        for param in params
+        if param in yaml_cfg.get("variables", {})
+    }
+
+
+def plot_config_for(render: RenderConfig, **frame) -> PlotConfig:
+    """Per-frame PlotConfig backed by the shared, read-only ``render`` settings.
+
+    ``frame`` holds what changes per map: dataset, time selection, baserun,
+    outfile, datasource.
+    """
+    cfg = PlotConfig()
+    for key, value in render.settings.items():
+        setattr(cfg, key, value)
+    for key, value in frame.items():
+        setattr(cfg, key, value)
+    cfg.region = render.region
+    cfg.figsize = render.figsize
+    cfg.portrait = render.portrait
+    cfg.colormap = render.colormap
+    cfg.norm = render.norm
+    cfg.render = render
+    cfg.compiled = True
+    return cfg
@@ -0,0 +1,175 @@
+"""Run independent (region, param, hour) map renders on a process pool."""
+
+import io
+import multiprocessing
+import os
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+import xarray as xr
+
+from . import metrics
+from .config_loader import load_param_config
+from .plot_config import PlotConfig
+from .plotter import Plotter
+from .render_config import compile_render_configs, plot_config_for
+
+# Decoded hour datasets kept per worker process; tasks arrive roughly in hour
+# order, so a couple of entries is enough to open each hour once per worker.
+_DATASET_CACHE_SIZE = 2
+_datasets = OrderedDict()
+_render_configs = None
+
+
+@dataclass(frozen=True)
+class RenderTask:
+    """One map to render. ``source`` is a NetCDF path or URL readable by xarray.
+
+    ``kind`` is ``"map"`` for a region image or ``"tiles"`` for the tile
+    pyramid of a param (``region`` is None and ``outfile`` the pyramid root).
+    With ``bundle``, the encoded map comes back in ``RenderResult.frame``.
+    """
+
+    source: str
+    dataset: str
+    region: str
+    param: str
+    forecast_hour: int
+    outfile: str
+    baserun: object
+    datasource: str
+    time_index: Optional[int] = None
+    time_value: object = None
+    key: Optional[str] = None
+    kind: str = "map"
+    bundle: bool = False
+
+
+@dataclass
+class RenderResult:
+    task: RenderTask
+    ok: bool
+    seconds: float
+    log: str = ""
+    error: Optional[str] = field(default=None)
+    frame: Optional[bytes] = None
+
+
+def build_plot_config(task: RenderTask, render_configs: dict) -> PlotConfig:
+    """PlotConfig for a task, backed by its compiled (region, param) settings."""
+    return plot_config_for(
+        render_configs[(task.region, task.param)],
+        dataset=task.dataset,
+        time_index=task.time_index,
+        time_value=task.time_value,
+        forecast_hour=task.forecast_hour,
+        outfile=task.outfile,
+        baserun=task.baserun,
+        datasource=task.datasource,
+    )
+
+
+def _open_source(source: str) -> xr.Dataset:
+    if source in _datasets:
+        _datasets.move_to_end(source)
+        return _datasets[source]
+    if os.path.exists(source):
+        # Per-hour files are small (cropped); read them fully once per worker.
+        with xr.open_dataset(source) as ds:
+            loaded = ds.load()
+    else:
+        loaded = xr.open_dataset(source, engine="netcdf4")
+    _datasets[source] = loaded
+    while len(_datasets) > _DATASET_CACHE_SIZE:
+        _datasets.popitem(last=False)
+    return loaded
+
+
+def render_task(task: RenderTask) -> RenderResult:
+    """Worker entry point: render one map, capturing its log and any failure."""
+    global _render_configs
+    start = time.perf_counter()
+    buf = io.StringIO()
+    ok, error, frame = True, None, None
+    with redirect_stdout(buf), redirect_stderr(buf):
+        try:
+            if _render_configs is None:
+                yaml_cfg = load_param_config()
+                _render_configs = compile_render_configs(yaml_cfg, [*yaml_cfg.get("regions", {}), None])
+            with metrics.span("task", region=task.region, param=task.param, hour=task.forecast_hour, kind=task.kind):
+                ds = _open_source(task.source)
+                plotter = Plotter(build_plot_config(task, _render_configs))
+                if task.kind == "tiles":
+                    plotter.plot_tiles(ds, task.param)
+                else:
+                    plotter.plot_map(ds, task.param)
+                    if task.bundle and plotter.written is not None:
+                        frame = plotter.written.result()
+        except Exception:
+            ok, error = False, traceback.format_exc()
+    return RenderResult(task, ok, time.perf_counter() - start, buf.getvalue(), error, frame)
+
+
+def run_render_tasks(
+    tasks: Iterable[RenderTask],
+    workers: int,
+    on_result: Optional[Callable[[RenderResult], None]] = None,
+    on_source_done: Optional[Callable[[str], None]] = None,
+    max_sources: Optional[int] = None,
+) -> list:
+    """Render ``tasks`` on ``workers`` processes and return one result per task.
+
+    ``tasks`` may be a generator (e.g. fed by the cycle downloader); tasks are
+    submitted as they are produced. ``on_source_done(source)`` fires once every
+    task reading a source has finished, so per-hour files can be removed.
+    With ``max_sources``, no further task is taken from ``tasks`` while that
+    many sources still have unfinished tasks, so a generator decoding hours
+    never runs far ahead of the renders.
+    """
+    results = []
+    remaining = {}
+    finished_sources = set()
+
+    def release(source):
+        if source in finished_sources and remaining[source] == 0 and on_source_done is not None:
+            finished_sources.discard(source)
+            on_source_done(source)
+
+    def collect(done):
+        for future in done:
+            result = future.result()
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+            remaining[result.task.source] -= 1
+            release(result.task.source)
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max(1, workers), mp_context=ctx) as pool:
+        pending = set()
+        last_source = None
+        for task in tasks:
+            if last_source is not None and task.source != last_source:
+                finished_sources.add(last_source)
+                release(last_source)
+            last_source = task.source
+            remaining[task.source] = remaining.get(task.source, 0) + 1
+            pending.add(pool.submit(render_task, task))
+            done = {f for f in pending if f.done()}
+            pending -= done
+            collect(done)
+            while max_sources and pending and sum(1 for n in remaining.values() if n > 0) > max_sources:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+        if last_source is not None:
+            finished_sources.add(last_source)
+            release(last_source)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done)
+    return results
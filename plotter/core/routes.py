@@ -0,0 +1,389 @@
+"""Forecasts along ship routes: every variable at each track point's ETA.
+
+A route is a list of waypoints plus a departure time and speed (knots), or
+an ETA per waypoint. :func:`densify` follows the great circle of each leg
+every ``step_km`` and gives each point its ETA. :func:`interpolate_routes`
+then samples all points of all routes at once: the spatial weights come from
+one :class:`~plotter.core.stations.SiteIndex` over every point, the temporal
+weights from the two forecast hours around each ETA, and the data from a
+single indexed read of the cycle.
+
+Routes are read from a GeoJSON of LineStrings (properties ``id``, ``name``,
+``depart`` and ``speed_kn``, or ``etas``, one per vertex) or a CSV with one
+waypoint per row (``route,lat,lon`` and either ``eta`` on every row or
+``depart``/``speed_kn`` on the first row of a route).
+
+Usage: ``python -m plotter.core.routes --cycle 2026010100 --max-hours 72 --routes lanes.geojson``
+"""
+
+import argparse
+import csv
+import json
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from .grib_cache import atomic_file
+from .stations import (
+    DEFAULT_SEARCH, EARTH_RADIUS_KM, METHODS, SiteIndex,
+    dataset_params, derive_fields, json_values, wet_mask,
+)
+
+DEFAULT_STEP_KM = 10.0
+DEFAULT_SPEED_KN = 12.0
+KM_PER_NM = 1.852
+
+
+@dataclass(frozen=True)
+class Route:
+    id: str
+    waypoints: tuple          # ((lat, lon), ...)
+    name: str = ""
+    depart: object = None     # departure time; None departs at the first forecast hour
+    speed_kn: float = None    # None uses DEFAULT_SPEED_KN unless ``etas`` is given
+    etas: tuple = None        # one time per waypoint, instead of depart/speed
+
+
+def _route(route_id, waypoints, name="", depart=None, speed_kn=None, etas=None, source=""):
+    if len(waypoints) < 2:
+        raise ValueError(f"[ERROR] {source}: route '{route_id}' needs at least two waypoints")
+    if etas is not None:
+        if len(etas) != len(waypoints):
+            raise ValueError(f"[ERROR] {source}: route '{route_id}' needs one ETA per waypoint")
+        etas = tuple(pd.Timestamp(t) for t in etas)
+        if any(b < a for a, b in zip(etas, etas[1:])):
+            raise ValueError(f"[ERROR] {source}: ETAs of route '{route_id}' go back in time")
+    try:
+        speed_kn = float(speed_kn) if speed_kn not in (None, "") else None
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"[ERROR] {source}: bad speed of route '{route_id}': {exc}") from exc
+    if speed_kn is not None and speed_kn <= 0:
+        raise ValueError(f"[ERROR] {source}: route '{route_id}' needs a positive speed")
+    return Route(
+        str(route_id),
+        tuple((float(lat), float(lon)) for lat, lon in waypoints),
+        str(name or ""),
+        pd.Timestamp(depart) if depart else None,
+        speed_kn,
+        etas,
+    )
+
+
+def load_routes(path) -> list:
+    """Routes of a GeoJSON (LineStrings) or CSV (one waypoint per row) file."""
+    path = Path(path)
+    routes = []
+    if path.suffix.lower() in (".geojson", ".json"):
+        features = json.loads(path.read_text()).get("features", [])
+        for i, feature in enumerate(features):
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") != "LineString":
+                raise ValueError(f"[ERROR] {path}: feature {i} is not a LineString")
+            props = feature.get("properties") or {}
+            routes.append(_route(
+                props.get("id", feature.get("id", f"route{i}")),
+                [(lat, lon) for lon, lat, *_ in geometry["coordinates"]],
+                props.get("name"), props.get("depart"), props.get("speed_kn"), props.get("etas"), path,
+            ))
+    else:
+        rows = {}
+        with open(path, newline="") as f:
+            for i, row in enumerate(csv.DictReader(f)):
+                try:
+                    rows.setdefault(row["route"], []).append(((float(row["lat"]), float(row["lon"])), row))
+                except (KeyError, TypeError, ValueError) as exc:
+                    raise ValueError(f"[ERROR] {path}: bad waypoint on line {i + 2}: {exc}") from exc
+        for route_id, points in rows.items():
+            first = points[0][1]
+            etas = [row.get("eta") for _, row in points]
+            routes.append(_route(
+                route_id, [p for p, _ in points], first.get("name"), first.get("depart"),
+                first.get("speed_kn"), etas if all(etas) else None, path,
+            ))
+    if len({r.id for r in routes}) != len(routes):
+        raise ValueError(f"[ERROR] {path}: route ids must be unique")
+    return routes
+
+
+def _unit(lat, lon):
+    lat, lon = np.deg2rad(lat), np.deg2rad(lon)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def densify(route: Route, step_km: float = DEFAULT_STEP_KM, depart=None):
+    """(lat, lon, distance_km, eta) of points every ``step_km`` along the great circles of ``route``.
+
+    Waypoints are always kept. ``depart`` is used when the route has neither
+    its own departure time nor ETAs.
+    """
+    points = np.asarray(route.waypoints, dtype=np.float64)
+    a, b = _unit(points[:-1, 0], points[:-1, 1]), _unit(points[1:, 0], points[1:, 1])
+    angle = np.arctan2(np.linalg.norm(np.cross(a, b), axis=1), (a * b).sum(axis=1))
+    legs = angle * EARTH_RADIUS_KM
+    counts = np.maximum(1, np.ceil(legs / step_km)).astype(np.int64)
+
+    # Fraction along its leg of every point but the last waypoint.
+    leg = np.repeat(np.arange(len(legs)), counts)
+    frac = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    frac = frac / counts[leg]
+    sin = np.sin(angle[leg])
+    safe = np.where(sin > 1e-12, sin, 1.0)
+    wa = np.where(sin > 1e-12, np.sin((1 - frac) * angle[leg]) / safe, 1 - frac)
+    wb = np.where(sin > 1e-12, np.sin(frac * angle[leg]) / safe, frac)
+    xyz = np.concatenate([wa[:, None] * a[leg] + wb[:, None] * b[leg], b[-1:]])
+    xyz /= np.linalg.norm(xyz, axis=1, keepdims=True)
+    lat = np.degrees(np.arcsin(np.clip(xyz[:, 2], -1, 1)))
+    lon = np.degrees(np.arctan2(xyz[:, 1], xyz[:, 0]))
+    # Keep the longitude convention of the waypoints (0..360 east of the dateline).
+    if points[:, 1].max() > 180:
+        lon %= 360.0
+
+    start = np.concatenate([[0.0], np.cumsum(legs)])
+    distance = np.concatenate([start[leg] + frac * legs[leg], start[-1:]])
+    if route.etas is not None:
+        at = np.array([t.value for t in route.etas], dtype=np.int64)
+        eta = np.interp(distance, start, at.astype(np.float64)) if start[-1] > 0 else np.full(len(distance), at[0])
+    else:
+        depart = route.depart or depart
+        if depart is None:
+            raise ValueError(f"[ERROR] Route '{route.id}' has no departure time")
+        speed = route.speed_kn or DEFAULT_SPEED_KN
+        hours = distance / (speed * KM_PER_NM)
+        eta = pd.Timestamp(depart).value + hours * 3.6e12
+    return lat, lon, distance, np.asarray(eta).astype(np.int64).astype("datetime64[ns]")
+
+
+def time_weights(times, eta):
+    """(first hour index, weight of the next hour, valid) of each ETA between forecast ``times``."""
+    times = np.asarray(times, dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+    eta = np.asarray(eta, dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+    valid = (eta >= times[0]) & (eta <= times[-1])
+    if len(times) == 1:
+        return np.zeros(len(eta), dtype=np.int64), np.zeros(len(eta)), valid
+    t0 = np.clip(np.searchsorted(times, eta, side="right") - 1, 0, len(times) - 2)
+    weight = np.clip((eta - times[t0]) / (times[t0 + 1] - times[t0]), 0.0, 1.0)
+    return t0, weight, valid
+
+
+class RouteIndex:
+    """Spatial and temporal weights of every track point of ``routes`` on one grid and set of hours."""
+
+    def __init__(self, lat, lon, times, routes, wet=None, step_km: float = DEFAULT_STEP_KM,
+                 method: str = "bilinear", search: int = DEFAULT_SEARCH, depart=None):
+        self.routes = list(routes)
+        depart = depart if depart is not None else pd.Timestamp(np.asarray(times)[0])
+        tracks = [densify(route, step_km, depart) for route in self.routes]
+        self.route = np.repeat([r.id for r in self.routes], [len(t[0]) for t in tracks])
+        self.seq = np.concatenate([np.arange(len(t[0])) for t in tracks])
+        self.lat, self.lon, self.distance_km, self.eta = (np.concatenate([t[i] for t in tracks]) for i in range(4))
+
+        self.space = SiteIndex.at_points(lat, lon, self.lat, self.lon, wet, method, search)
+        self.t0, self.tw, in_time = time_weights(times, self.eta)
+        self.valid = self.space.valid & in_time
+        # Only the forecast hours some point falls between are read.
+        used = self.t0[self.valid]
+        self.first = int(used.min()) if len(used) else 0
+        self.last = min(int(used.max()) + 1, len(times) - 1) if len(used) else 0
+
+    def cells(self, data, budget=None) -> np.ndarray:
+        """Values (..., time, cell) of ``data`` at the index cells, for the hours in use."""
+        return self.space.cells(data.isel(time=slice(self.first, self.last + 1)), budget)
+
+    def combine(self, cells: np.ndarray) -> np.ndarray:
+        """Point values (..., point) from cell values (..., time, cell), bilinear in space, linear in time."""
+        t0 = self.t0 - self.first
+        t1 = np.minimum(t0 + 1, cells.shape[-2] - 1)
+        corner, weights = self.space.corner, self.space.weights
+        before = (cells[..., t0[:, None], corner] * weights).sum(axis=-1)
+        after = (cells[..., t1[:, None], corner] * weights).sum(axis=-1)
+        # Exact hours take the hour itself, so a missing next hour never leaks in.
+        out = np.where(self.tw > 0, before * (1 - self.tw) + after * self.tw, before)
+        out[..., ~self.valid] = np.nan
+        return out
+
+    def combine_direction(self, cells: np.ndarray) -> np.ndarray:
+        """Like :meth:`combine` for directions in degrees, averaged as unit vectors."""
+        rad = np.deg2rad(cells)
+        return np.degrees(np.arctan2(self.combine(np.sin(rad)), self.combine(np.cos(rad)))) % 360.0
+
+
+def interpolate_routes(ds, routes, dataset: str = "gfswave", params=None, step_km: float = DEFAULT_STEP_KM,
+                       method: str = "bilinear", search: int = DEFAULT_SEARCH, depart=None) -> xr.Dataset:
+    """``params`` (default: all in ``ds``) along every route, as one Dataset over track points.
+
+    Each point has its ``route``, ``seq`` (order along the route), position,
+    ``distance_km`` from the start and ``eta``. Variables follow
+    :func:`~plotter.core.stations.extract_sites`; points whose ETA is outside
+    the forecast, or off the wet grid, are NaN.
+    """
+    params = dataset_params(ds, dataset, params)
+    names = sorted({n for roles in params.values() for n in roles.values()})
+    if "time" not in ds.dims:
+        ds = ds.expand_dims("time")
+    index = RouteIndex(ds["lat"].values, ds["lon"].values, ds["time"].values, routes,
+                       wet_mask(ds, names), step_km, method, search, depart)
+    cells = dict(zip(names, index.cells(ds[names].transpose("time", "lat", "lon"))))
+    data_vars = derive_fields(
+        ds, params,
+        lambda name: index.combine(cells[name]),
+        lambda name: index.combine_direction(cells[name]),
+    )
+    coords = {
+        "route": ("point", index.route),
+        "seq": ("point", index.seq),
+        "lat": ("point", index.lat),
+        "lon": ("point", index.lon),
+        "distance_km": ("point", index.distance_km),
+        "eta": ("point", index.eta),
+        "fallback": ("point", index.space.fallback),
+    }
+    names = {r.id: r.name for r in index.routes}
+    return xr.Dataset(
+        {name: ("point", values.astype(np.float32), attrs) for name, (values, attrs) in data_vars.items()},
+        coords=coords,
+        attrs={"route_names": json.dumps(names)},
+    )
+
+
+def route_table(tracks: xr.Dataset, route_id: str) -> xr.Dataset:
+    """The points of one route of :func:`interpolate_routes`, in order."""
+    return tracks.isel(point=np.flatnonzero(tracks["route"].values == route_id))
+
+
+def write_json(tracks: xr.Dataset, path, meta=None) -> Path:
+    """Compact JSON: per route, its points' position, distance, ETA and variables (NaN as null)."""
+    names = json.loads(tracks.attrs.get("route_names", "{}"))
+    doc = {
+        **(meta or {}),
+        "variables": {name: {"units": tracks[name].attrs.get("units")} for name in tracks.data_vars},
+        "routes": [],
+    }
+    for route_id in pd.unique(tracks["route"].values):
+        table = route_table(tracks, route_id)
+        entry = {
+            "id": str(route_id),
+            "name": names.get(str(route_id), ""),
+            "lat": json_values(table["lat"].values, 4),
+            "lon": json_values(table["lon"].values, 4),
+            "distance_km": json_values(table["distance_km"].values, 1),
+            "eta": [pd.Timestamp(t).isoformat() for t in table["eta"].values],
+        }
+        for name in tracks.data_vars:
+            entry[name] = json_values(table[name].values, 0 if name.endswith("_dir") else 2)
+        doc["routes"].append(entry)
+    path = Path(path)
+    with atomic_file(path) as part:
+        part.write_text(json.dumps(doc, separators=(",", ":")) + "\n")
+    return path
+
+
+def write_csv(tracks: xr.Dataset, path) -> Path:
+    """One row per track point, one column per variable."""
+    names = list(tracks.data_vars)
+    values = {name: tracks[name].values for name in names}
+    etas = [pd.Timestamp(t).isoformat() for t in tracks["eta"].values]
+    path = Path(path)
+    with atomic_file(path) as part:
+        with open(part, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["route", "seq", "lat", "lon", "distance_km", "eta", *names])
+            for i in range(tracks.sizes["point"]):
+                row = [values[name][i] for name in names]
+                writer.writerow([
+                    tracks["route"].values[i], int(tracks["seq"].values[i]),
+                    f"{tracks['lat'].values[i]:.4f}", f"{tracks['lon'].values[i]:.4f}",
+                    f"{tracks['distance_km'].values[i]:.1f}", etas[i],
+                    *("" if np.isnan(v) else f"{v:.3f}" for v in row),
+                ])
+    return path
+
+
+def plot_route_chart(tracks: xr.Dataset, route_id: str, outfile, fileformat: str = "png", dpi: int = 100) -> Path:
+    """One panel per variable along ``route_id`` against distance, ETAs on the top axis."""
+    table = route_table(tracks, route_id)
+    names = [n for n in tracks.data_vars if not n.endswith("_dir")]
+    distance = table["distance_km"].values
+    fig, axes = plt.subplots(len(names), 1, figsize=(8, 1.8 * len(names) + 0.9), sharex=True, squeeze=False)
+    try:
+        for ax, name in zip(axes[:, 0], names):
+            values = table[name].values
+            ax.plot(distance, values, color="tab:blue", lw=1.2)
+            if f"{name}_dir" in table:
+                # Arrows point where the wind/waves go; at most ~40 per panel.
+                step = max(1, len(distance) // 40)
+                rad = np.deg2rad(table[f"{name}_dir"].values[::step])
+                ax.quiver(distance[::step], values[::step], -np.sin(rad), -np.cos(rad),
+                          angles="uv", scale=30, width=0.003, color="tab:gray")
+            units = tracks[name].attrs.get("units")
+            ax.set_ylabel(f"{name} ({units})" if units else name, fontsize=8)
+            ax.grid(alpha=0.3)
+            ax.tick_params(labelsize=7)
+        axes[-1, 0].set_xlabel("Distance along route (km)", fontsize=8)
+        # The whole route, even where its ETAs run past the forecast.
+        axes[0, 0].set_xlim(0, max(distance[-1], 1.0))
+
+        top = axes[0, 0].twiny()
+        top.set_xlim(axes[0, 0].get_xlim())
+        ticks = np.unique(np.linspace(0, len(distance) - 1, 6).astype(int))
+        top.set_xticks(distance[ticks])
+        top.set_xticklabels([pd.Timestamp(t).strftime("%d %H:%MZ") for t in table["eta"].values[ticks]], fontsize=7)
+        label = json.loads(tracks.attrs.get("route_names", "{}")).get(route_id) or route_id
+        top.set_title(f"{label} ({distance[-1]:.0f} km)", fontsize=9)
+
+        outfile = Path(outfile)
+        with atomic_file(outfile) as part:
+            fig.savefig(part, format=fileformat, dpi=dpi, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return outfile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interpolate GFS Wave forecasts along ship routes")
+    parser.add_argument("--cycle", required=True, help="YYYYMMDDHH model cycle")
+    parser.add_argument("--max-hours", type=int, default=4)
+    parser.add_argument("--routes", required=True, help="GeoJSON of LineStrings or CSV of waypoints")
+    parser.add_argument("--output", default="routes.json", help="Route table file; .csv for CSV, else JSON")
+    parser.add_argument("--charts", default=None, help="Directory for one along-track chart PNG per route")
+    parser.add_argument("--depart", default=None, help="Departure time of routes without one (default: cycle time)")
+    parser.add_argument("--speed", type=float, default=DEFAULT_SPEED_KN, help="Speed (knots) of routes without one")
+    parser.add_argument("--step-km", type=float, default=DEFAULT_STEP_KM)
+    parser.add_argument("--method", choices=METHODS, default="bilinear")
+    parser.add_argument("--search", type=int, default=DEFAULT_SEARCH, help="Cells searched for a wet cell near the coast")
+    parser.add_argument("--crop-margin", type=float, default=2.0, help="As plot.py, to share its cycle store")
+    parser.add_argument("--no-crop", action="store_true")
+    parser.add_argument("--layout", default="map", help="Cycle store layout (map, as plot.py writes, or series)")
+    args = parser.parse_args()
+
+    from .config_loader import load_param_config
+    from .cycle_store import convert_cycle
+    from .utils import regions_bbox
+
+    routes = [r if r.speed_kn or r.etas else replace(r, speed_kn=args.speed) for r in load_routes(args.routes)]
+    yaml_cfg = load_param_config()
+    bbox = None if args.no_crop else regions_bbox(list(yaml_cfg.get("regions", {})), yaml_cfg, margin=args.crop_margin)
+    store = convert_cycle(args.cycle, args.max_hours, bbox=bbox, layout=args.layout)
+    tracks = interpolate_routes(store.open(range(args.max_hours)), routes, step_km=args.step_km,
+                                method=args.method, search=args.search, depart=args.depart)
+
+    first = next(iter(tracks.data_vars))
+    missing = int(tracks[first].isnull().sum().item())
+    if missing:
+        print(f"[WARN] {missing} of {tracks.sizes['point']} track points are off the wet grid or past the forecast")
+    if str(args.output).endswith(".csv"):
+        write_csv(tracks, args.output)
+    else:
+        write_json(tracks, args.output, {"cycle": args.cycle})
+    print(f"[INFO] {len(routes)} routes ({tracks.sizes['point']} points) saved at {args.output}")
+    if args.charts:
+        for route in routes:
+            plot_route_chart(tracks, route.id, Path(args.charts) / f"{route.id}.png")
+        print(f"[INFO] Route charts saved under {args.charts}")
+
+
+if __name__ == "__main__":
+    main()
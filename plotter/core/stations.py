@@ -0,0 +1,432 @@
+"""Point forecasts at many sites: one interpolation index per grid, one gather per cycle.
+
+Sites come from a CSV (``id,name,lat,lon``) or a GeoJSON of Points. A
+:class:`SiteIndex` is built once per grid: bilinear weights of the four
+cells around each site (or its nearest cell), with dry cells (NaN in the
+wave fields, i.e. land) dropped and the rest renormalized. A coastal site
+whose cells are all dry takes the nearest wet cell within ``search`` cells.
+Every variable is then read for all sites in one indexed read of the
+(lazily opened) cycle per run of hours that fits the memory budget, instead
+of an xarray ``.sel`` per site.
+
+Usage: ``python -m plotter.core.stations --cycle 2026010100 --max-hours 24 --sites ports.csv``
+"""
+
+import argparse
+import csv
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from .cycle_store import time_blocks
+from .grib_cache import atomic_file
+from .utils import load_model_params
+
+DEFAULT_SEARCH = 3
+METHODS = ("bilinear", "nearest")
+EARTH_RADIUS_KM = 6371.0
+
+
+@dataclass(frozen=True)
+class Site:
+    id: str
+    lat: float
+    lon: float
+    name: str = ""
+
+
+def load_sites(path) -> list:
+    """Sites of a CSV (``id``, ``lat``, ``lon`` and optional ``name`` columns) or GeoJSON file."""
+    path = Path(path)
+    sites = []
+    if path.suffix.lower() in (".geojson", ".json"):
+        features = json.loads(path.read_text()).get("features", [])
+        for i, feature in enumerate(features):
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") != "Point":
+                raise ValueError(f"[ERROR] {path}: feature {i} is not a Point")
+            props = feature.get("properties") or {}
+            lon, lat = geometry["coordinates"][:2]
+            site_id = props.get("id", feature.get("id", f"site{i}"))
+            sites.append(Site(str(site_id), float(lat), float(lon), str(props.get("name", ""))))
+    else:
+        with open(path, newline="") as f:
+            for i, row in enumerate(csv.DictReader(f)):
+                try:
+                    sites.append(Site(str(row.get("id") or f"site{i}"), float(row["lat"]), float(row["lon"]), row.get("name") or ""))
+                except (KeyError, TypeError, ValueError) as exc:
+                    raise ValueError(f"[ERROR] {path}: bad site on line {i + 2}: {exc}") from exc
+    if len({s.id for s in sites}) != len(sites):
+        raise ValueError(f"[ERROR] {path}: site ids must be unique")
+    return sites
+
+
+def _axis(values, name):
+    """(origin, step) of a regular coordinate axis."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < 2:
+        raise ValueError(f"[ERROR] Need at least two {name} values to interpolate")
+    step = values[1] - values[0]
+    if not np.allclose(np.diff(values), step, atol=abs(step) * 1e-3):
+        raise ValueError(f"[ERROR] Station extraction needs a regular {name} axis")
+    return values[0], step
+
+
+class SiteIndex:
+    """Cells and weights of each site on one grid, built once and reused for every field.
+
+    ``wet`` is a (lat, lon) boolean mask of cells with data; without it every
+    cell counts as wet. Sites outside the grid, or with no wet cell within
+    ``search`` cells, come out as NaN (``valid`` is False).
+    """
+
+    def __init__(self, lat, lon, sites, wet=None, method: str = "bilinear", search: int = DEFAULT_SEARCH):
+        self.sites = list(sites)
+        self._build(lat, lon, [s.lat for s in self.sites], [s.lon for s in self.sites], wet, method, search)
+
+    @classmethod
+    def at_points(cls, lat, lon, point_lat, point_lon, wet=None, method: str = "bilinear",
+                  search: int = DEFAULT_SEARCH) -> "SiteIndex":
+        """Index of bare coordinate arrays (e.g. route track points), without Site objects."""
+        index = cls.__new__(cls)
+        index.sites = []
+        index._build(lat, lon, point_lat, point_lon, wet, method, search)
+        return index
+
+    def _build(self, lat, lon, slat, slon, wet, method, search):
+        if method not in METHODS:
+            raise ValueError(f"[ERROR] Unknown interpolation '{method}', expected one of {METHODS}")
+        lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+        ny, nx = len(lat), len(lon)
+        lat0, dlat = _axis(lat, "lat")
+        lon0, dlon = _axis(lon, "lon")
+        wet = np.ones((ny, nx), dtype=bool) if wet is None else np.asarray(wet, dtype=bool)
+        periodic = abs(nx * dlon) >= 360.0 - 1e-6
+
+        slat = np.asarray(slat, dtype=np.float64)
+        slon = np.asarray(slon, dtype=np.float64)
+        # Site longitudes in the grid's convention (0..360 or -180..180).
+        slon = (slon - min(lon0, lon[-1])) % 360.0 + min(lon0, lon[-1])
+        fy = (slat - lat0) / dlat
+        fx = (slon - lon0) / dlon
+        inside = (fy >= -1e-9) & (fy <= ny - 1 + 1e-9)
+        inside &= periodic | ((fx >= -1e-9) & (fx <= nx - 1 + 1e-9))
+
+        if method == "bilinear":
+            y0 = np.clip(np.floor(fy), 0, ny - 2).astype(np.int64)
+            x0 = np.floor(fx).astype(np.int64) if periodic else np.clip(np.floor(fx), 0, nx - 2).astype(np.int64)
+            ty, tx = fy - y0, fx - x0
+            cy = np.stack([y0, y0, y0 + 1, y0 + 1], axis=1)
+            cx = np.stack([x0, x0 + 1, x0, x0 + 1], axis=1)
+            weights = np.stack([(1 - ty) * (1 - tx), (1 - ty) * tx, ty * (1 - tx), ty * tx], axis=1)
+        else:
+            cy = np.repeat(np.rint(fy).astype(np.int64)[:, None], 4, axis=1)
+            cx = np.repeat(np.rint(fx).astype(np.int64)[:, None], 4, axis=1)
+            weights = np.zeros((len(slat), 4))
+            weights[:, 0] = 1.0
+        cy = np.clip(cy, 0, ny - 1)
+        cx = cx % nx if periodic else np.clip(cx, 0, nx - 1)
+
+        weights = np.where(wet[cy, cx], weights, 0.0)
+        weights = np.clip(weights, 0.0, None)
+        total = weights.sum(axis=1)
+        self.fallback = inside & (total <= 1e-12)
+        if self.fallback.any():
+            cy[self.fallback, 0], cx[self.fallback, 0], found = self._nearest_wet(
+                fy[self.fallback], fx[self.fallback], slat[self.fallback], wet, dlat, dlon, search, periodic
+            )
+            weights[self.fallback] = 0.0
+            weights[self.fallback, 0] = found
+            total = weights.sum(axis=1)
+        self.valid = inside & (total > 1e-12)
+        self.fallback &= self.valid
+        weights[self.valid] /= total[self.valid, None]
+        weights[~self.valid] = 0.0
+
+        # Zero-weight corners point at the main cell, so NaNs of dry cells never leak in.
+        main = np.argmax(weights, axis=1)
+        rows = np.arange(len(slat))
+        dead = weights <= 0
+        cy = np.where(dead, cy[rows, main][:, None], cy)
+        cx = np.where(dead, cx[rows, main][:, None], cx)
+
+        flat = cy * nx + cx
+        cells, corner = np.unique(flat, return_inverse=True)
+        self.cell_y, self.cell_x = np.divmod(cells, nx)
+        self.corner = corner.reshape(flat.shape)
+        self.weights = weights
+        self.grid_lat = np.where(self.valid, lat[cy[rows, main]], np.nan)
+        self.grid_lon = np.where(self.valid, lon[cx[rows, main]], np.nan)
+        self.distance_km = _haversine(slat, slon, self.grid_lat, self.grid_lon)
+
+    @staticmethod
+    def _nearest_wet(fy, fx, slat, wet, dlat, dlon, search, periodic):
+        """(cell y, cell x, 1.0 or 0.0 if none) of the nearest wet cell within ``search`` cells."""
+        ny, nx = wet.shape
+        offsets = np.arange(-search, search + 1)
+        dy, dx = (a.ravel() for a in np.meshgrid(offsets, offsets, indexing="ij"))
+        cy = np.rint(fy).astype(np.int64)[:, None] + dy
+        cx = np.rint(fx).astype(np.int64)[:, None] + dx
+        dist = ((cy - fy[:, None]) * dlat) ** 2 + ((cx - fx[:, None]) * dlon * np.cos(np.deg2rad(slat))[:, None]) ** 2
+        cx = cx % nx if periodic else cx
+        ok = (cy >= 0) & (cy < ny) & (cx >= 0) & (cx < nx)
+        cyc, cxc = np.clip(cy, 0, ny - 1), np.clip(cx, 0, nx - 1)
+        dist = np.where(ok & wet[cyc, cxc], dist, np.inf)
+        best = np.argmin(dist, axis=1)
+        rows = np.arange(len(fy))
+        return cyc[rows, best], cxc[rows, best], np.isfinite(dist[rows, best]).astype(np.float64)
+
+    def cells(self, data, budget=None) -> np.ndarray:
+        """Values of ``data`` (DataArray or Dataset, dims (..., [time,] lat, lon)) at the index cells.
+
+        One indexed read per run of hours that fits ``budget`` bytes
+        (:func:`~plotter.core.cycle_store.time_blocks`), so a long lazy
+        cycle is never loaded whole.
+        """
+        if "time" not in data.dims:
+            return self._gather(data)
+        return np.concatenate([self._gather(data.isel(time=block)) for block in time_blocks(data, budget)], axis=-2)
+
+    def _gather(self, data) -> np.ndarray:
+        picked = data.isel(lat=xr.DataArray(self.cell_y, dims="cell"), lon=xr.DataArray(self.cell_x, dims="cell"))
+        if isinstance(picked, xr.Dataset):
+            picked = picked.to_array("variable")
+        return picked.values
+
+    def combine(self, cells: np.ndarray) -> np.ndarray:
+        """Weighted site values (..., site) from cell values (..., cell)."""
+        out = (cells[..., self.corner] * self.weights).sum(axis=-1)
+        out[..., ~self.valid] = np.nan
+        return out
+
+    def combine_direction(self, cells: np.ndarray) -> np.ndarray:
+        """Like :meth:`combine` for directions in degrees, averaged as unit vectors."""
+        rad = np.deg2rad(cells)
+        sin = self.combine(np.sin(rad))
+        cos = self.combine(np.cos(rad))
+        return np.degrees(np.arctan2(sin, cos)) % 360.0
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.deg2rad(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def dataset_params(ds, dataset: str, params=None) -> dict:
+    """{param: {role: variable}} of the params ``ds`` has every variable of."""
+    mapper = load_model_params(dataset)
+    params = params or [p for p, v in mapper.items() if isinstance(v, dict)]
+    found = {p: mapper[p] for p in params if isinstance(mapper.get(p), dict) and all(n in ds for n in mapper[p].values())}
+    if not found:
+        raise ValueError(f"[ERROR] None of {list(params)} is in the dataset")
+    return found
+
+
+def wet_mask(ds, names) -> np.ndarray:
+    """Cells where every variable in ``names`` has data at the first time."""
+    wet = None
+    for name in names:
+        da = ds[name]
+        if "time" in da.dims:
+            da = da.isel(time=0)
+        finite = np.isfinite(da.values)
+        wet = finite if wet is None else wet & finite
+    return wet
+
+
+def derive_fields(ds, params: dict, sample, sample_direction) -> dict:
+    """{name: (values, attrs)} of each param of ``params`` (as :func:`dataset_params` returns).
+
+    ``sample(variable)`` gives the interpolated values of a variable of
+    ``ds``, ``sample_direction(variable)`` those of a direction in degrees.
+    """
+    data_vars = {}
+    for param, roles in params.items():
+        units = ds[next(iter(roles.values()))].attrs.get("units")
+        if "u" in roles:
+            u, v = sample(roles["u"]), sample(roles["v"])
+            data_vars[param] = (np.hypot(u, v), {"units": units})
+            data_vars[f"{param}_dir"] = (np.degrees(np.arctan2(-u, -v)) % 360.0, {"units": "degree true"})
+        elif "mag" in roles:
+            data_vars[param] = (sample(roles["mag"]), {"units": units})
+            data_vars[f"{param}_dir"] = (sample_direction(roles["dir"]), {"units": "degree true"})
+        else:
+            data_vars[param] = (sample(roles["var"]), {"units": units})
+    return data_vars
+
+
+def extract_sites(ds, sites, dataset: str = "gfswave", params=None, method: str = "bilinear",
+                  search: int = DEFAULT_SEARCH, index=None) -> xr.Dataset:
+    """Time series of ``params`` (default: all in ``ds``) at ``sites``, as a (site, time) Dataset.
+
+    Each param gives ``<param>`` (magnitude) and, when it has one,
+    ``<param>_dir`` (direction it comes from, degrees clockwise from north).
+    Pass ``index`` to reuse a :class:`SiteIndex` across cycles on the same grid.
+    """
+    params = dataset_params(ds, dataset, params)
+    names = sorted({n for roles in params.values() for n in roles.values()})
+    if index is None:
+        index = SiteIndex(ds["lat"].values, ds["lon"].values, sites, wet_mask(ds, names), method, search)
+    if "time" not in ds.dims:
+        ds = ds.expand_dims("time")
+    cells = dict(zip(names, index.cells(ds[names].transpose("time", "lat", "lon"))))
+    data_vars = derive_fields(
+        ds, params,
+        lambda name: index.combine(cells[name]),
+        lambda name: index.combine_direction(cells[name]),
+    )
+
+    coords = {
+        "time": ds["time"].values,
+        "site": [s.id for s in index.sites],
+        "name": ("site", [s.name for s in index.sites]),
+        "lat": ("site", [s.lat for s in index.sites]),
+        "lon": ("site", [s.lon for s in index.sites]),
+        "grid_lat": ("site", index.grid_lat),
+        "grid_lon": ("site", index.grid_lon),
+        "distance_km": ("site", index.distance_km),
+        "fallback": ("site", index.fallback),
+    }
+    if "forecast_hour" in ds.coords:
+        coords["forecast_hour"] = ("time", ds["forecast_hour"].values)
+    return xr.Dataset(
+        {name: (("time", "site"), values.astype(np.float32), attrs) for name, (values, attrs) in data_vars.items()},
+        coords=coords,
+    ).transpose("site", "time")
+
+
+def json_values(values, digits):
+    """``values`` rounded for JSON, NaN as None (a scalar stays a scalar)."""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.round(np.atleast_1d(values), digits).astype(object)
+    out[np.isnan(np.atleast_1d(values))] = None
+    return out.tolist() if values.ndim else out[0]
+
+
+def write_json(series: xr.Dataset, path, meta=None) -> Path:
+    """Compact JSON: shared times, then each site's values per variable (NaN as null)."""
+    doc = {
+        **(meta or {}),
+        "times": [pd.Timestamp(t).isoformat() for t in series["time"].values],
+        "variables": {name: {"units": series[name].attrs.get("units")} for name in series.data_vars},
+        "sites": [],
+    }
+    if "forecast_hour" in series.coords:
+        doc["forecast_hours"] = series["forecast_hour"].values.tolist()
+    for i, site in enumerate(series["site"].values):
+        entry = {
+            "id": str(site),
+            "name": str(series["name"].values[i]),
+            "lat": float(series["lat"].values[i]),
+            "lon": float(series["lon"].values[i]),
+            "grid_lat": json_values(series["grid_lat"].values[i], 4),
+            "grid_lon": json_values(series["grid_lon"].values[i], 4),
+            "fallback": bool(series["fallback"].values[i]),
+        }
+        for name in series.data_vars:
+            entry[name] = json_values(series[name].values[i], 0 if name.endswith("_dir") else 2)
+        doc["sites"].append(entry)
+    path = Path(path)
+    with atomic_file(path) as part:
+        part.write_text(json.dumps(doc, separators=(",", ":")) + "\n")
+    return path
+
+
+def write_csv(series: xr.Dataset, path) -> Path:
+    """One row per (site, time), one column per variable."""
+    names = list(series.data_vars)
+    times = [pd.Timestamp(t).isoformat() for t in series["time"].values]
+    hours = series["forecast_hour"].values.tolist() if "forecast_hour" in series.coords else [""] * len(times)
+    values = {name: series[name].values for name in names}
+    path = Path(path)
+    with atomic_file(path) as part:
+        with open(part, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["site", "time", "forecast_hour", *names])
+            for i, site in enumerate(series["site"].values):
+                for j, time in enumerate(times):
+                    row = [values[name][i, j] for name in names]
+                    writer.writerow([site, time, hours[j], *("" if np.isnan(v) else f"{v:.3f}" for v in row)])
+    return path
+
+
+def plot_meteogram(series: xr.Dataset, site: str, outfile, fileformat: str = "png", dpi: int = 100) -> Path:
+    """One panel per variable of ``site``, with direction arrows where there is one."""
+    point = series.sel(site=site)
+    names = [n for n in series.data_vars if not n.endswith("_dir")]
+    times = pd.to_datetime(point["time"].values)
+    fig, axes = plt.subplots(len(names), 1, figsize=(8, 1.8 * len(names) + 0.6), sharex=True, squeeze=False)
+    try:
+        for ax, name in zip(axes[:, 0], names):
+            values = point[name].values
+            ax.plot(times, values, color="tab:blue", lw=1.2)
+            if f"{name}_dir" in point:
+                # Arrows point where the wind/waves go; at most ~40 per panel.
+                step = max(1, len(times) // 40)
+                rad = np.deg2rad(point[f"{name}_dir"].values[::step])
+                ax.quiver(times[::step], values[::step], -np.sin(rad), -np.cos(rad),
+                          angles="uv", scale=30, width=0.003, color="tab:gray")
+            units = series[name].attrs.get("units")
+            ax.set_ylabel(f"{name} ({units})" if units else name, fontsize=8)
+            ax.grid(alpha=0.3)
+            ax.tick_params(labelsize=7)
+        label = str(point["name"].values) or site
+        axes[0, 0].set_title(f"{label} ({float(point['lat']):.3f}, {float(point['lon']):.3f})", fontsize=9)
+        fig.autofmt_xdate()
+        outfile = Path(outfile)
+        with atomic_file(outfile) as part:
+            fig.savefig(part, format=fileformat, dpi=dpi, bbox_inches="tight")
+    finally:
+        plt.close(fig)
+    return outfile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract GFS Wave time series at a list of sites")
+    parser.add_argument("--cycle", required=True, help="YYYYMMDDHH model cycle")
+    parser.add_argument("--max-hours", type=int, default=4)
+    parser.add_argument("--sites", required=True, help="CSV (id,name,lat,lon) or GeoJSON of Points")
+    parser.add_argument("--output", default="stations.json", help="Series file; .csv for CSV, else JSON")
+    parser.add_argument("--meteograms", default=None, help="Directory for one meteogram PNG per site")
+    parser.add_argument("--method", choices=METHODS, default="bilinear")
+    parser.add_argument("--search", type=int, default=DEFAULT_SEARCH, help="Cells searched for a wet cell near coastal sites")
+    parser.add_argument("--crop-margin", type=float, default=2.0, help="As plot.py, to share its cycle store")
+    parser.add_argument("--no-crop", action="store_true")
+    parser.add_argument("--layout", default="map", help="Cycle store layout (map, as plot.py writes, or series)")
+    args = parser.parse_args()
+
+    from .config_loader import load_param_config
+    from .cycle_store import convert_cycle
+    from .utils import regions_bbox
+
+    sites = load_sites(args.sites)
+    yaml_cfg = load_param_config()
+    bbox = None if args.no_crop else regions_bbox(list(yaml_cfg.get("regions", {})), yaml_cfg, margin=args.crop_margin)
+    store = convert_cycle(args.cycle, args.max_hours, bbox=bbox, layout=args.layout)
+    series = extract_sites(store.open(range(args.max_hours)), sites, method=args.method, search=args.search)
+
+    missing = [str(s) for s, ok in zip(series["site"].values, np.isfinite(series["grid_lat"].values)) if not ok]
+    if missing:
+        print(f"[WARN] No wet grid cell near {len(missing)} site(s): {', '.join(missing[:10])}")
+    fallback = int(series["fallback"].values.sum())
+    if fallback:
+        print(f"[INFO] {fallback} coastal site(s) use the nearest wet cell")
+    if str(args.output).endswith(".csv"):
+        write_csv(series, args.output)
+    else:
+        write_json(series, args.output, {"cycle": args.cycle})
+    print(f"[INFO] {len(sites)} sites x {series.sizes['time']} hours saved at {args.output}")
+    if args.meteograms:
+        for site in series["site"].values:
+            plot_meteogram(series, site, Path(args.meteograms) / f"{site}.png")
+        print(f"[INFO] Meteograms saved under {args.meteograms}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""XYZ (Web Mercator) tile pyramids of a forecast field.
+
+Each (param, hour) is contoured once and drawn into blocks of tiles at a time;
+blocks are cut into 256 px tiles and tiles without data (outside the grid, or
+over land where the wave fields are undefined) are not written.
+"""
+
+import json
+import math
+from pathlib import Path
+
+import cartopy.crs as ccrs
+import matplotlib.colors as mcolors
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+
+from .contour_cache import CachedContourSet, filled_contours
+from .grib_cache import atomic_dir
+from .layers import figure_rgba
+from .mesh_cache import projected_mesh
+
+TILE_SIZE = 256
+# Tiles per block edge: one figure of up to 8x8 tiles (2048 px) per draw.
+BLOCK_TILES = 8
+# Latitude limit of the Web Mercator tile grid.
+MAX_LAT = 85.0511287798
+EARTH_RADIUS = 6378137.0
+HALF_WORLD = math.pi * EARTH_RADIUS
+TILES_META = "tiles.json"
+
+WEB_MERCATOR = ccrs.Mercator.GOOGLE
+
+
+def tile_index(lon: float, lat: float, zoom: int):
+    """(x, y) of the tile containing ``lon``/``lat`` at ``zoom``; ``lon`` may be 0..360."""
+    n = 2 ** zoom
+    if not -180.0 <= lon <= 180.0:
+        lon = ((lon + 180.0) % 360.0) - 180.0
+    lat = max(-MAX_LAT, min(MAX_LAT, lat))
+    x = (lon + 180.0) / 360.0 * n
+    y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    return min(max(int(x), 0), n - 1), min(max(int(y), 0), n - 1)
+
+
+def tile_range(bbox, zoom: int):
+    """Inclusive tile ranges (x0, x1, y0, y1) covering ``[min_lon, max_lon, min_lat, max_lat]``."""
+    min_lon, max_lon, min_lat, max_lat = bbox
+    x0, y0 = tile_index(min_lon, max_lat, zoom)
+    x1, y1 = tile_index(max_lon, min_lat, zoom)
+    if x1 < x0:
+        # The bbox crosses the antimeridian: cover every column.
+        x0, x1 = 0, 2 ** zoom - 1
+    return x0, x1, y0, y1
+
+
+def tile_bounds(zoom: int, x: int, y: int):
+    """Web Mercator extent (x0, x1, y0, y1) in metres of tile ``x``/``y``."""
+    size = 2 * HALF_WORLD / 2 ** zoom
+    return -HALF_WORLD + x * size, -HALF_WORLD + (x + 1) * size, HALF_WORLD - (y + 1) * size, HALF_WORLD - y * size
+
+
+def _block_extent(zoom, bx0, bx1, by0, by1):
+    left, _, _, top = tile_bounds(zoom, bx0, by0)
+    _, right, bottom, _ = tile_bounds(zoom, bx1, by1)
+    return left, right, bottom, top
+
+
+def _lonlat(mx: float, my: float):
+    return math.degrees(mx / EARTH_RADIUS), math.degrees(math.atan(math.sinh(my / EARTH_RADIUS)))
+
+
+def _blocks(x0, x1, y0, y1, size):
+    for by in range(y0, y1 + 1, size):
+        for bx in range(x0, x1 + 1, size):
+            yield bx, min(bx + size - 1, x1), by, min(by + size - 1, y1)
+
+
+def _has_data(field, lon0, lon1, lat0, lat1) -> bool:
+    """True when ``field`` has a finite value in (or next to) the lon/lat window."""
+    lon = field.lon.values
+    lat = field.lat.values
+    step = max(abs(float(lon[1] - lon[0])) if len(lon) > 1 else 0.0,
+               abs(float(lat[1] - lat[0])) if len(lat) > 1 else 0.0)
+    cols = (lon >= lon0 - step) & (lon <= lon1 + step)
+    rows = (lat >= lat0 - step) & (lat <= lat1 + step)
+    if not cols.any() or not rows.any():
+        return False
+    return bool(np.isfinite(field.values[np.ix_(rows, cols)]).any())
+
+
+def _render_block(contours, extent, ncols, nrows, cmap, norm, levels, extend):
+    """RGBA pixels of ``ncols`` x ``nrows`` tiles spanning ``extent``, transparent outside the bands."""
+    # One inch per tile at dpi=TILE_SIZE keeps tile edges on pixel boundaries.
+    fig = plt.figure(figsize=(ncols, nrows), dpi=TILE_SIZE)
+    try:
+        fig.patch.set_alpha(0)
+        ax = fig.add_axes([0, 0, 1, 1], projection=WEB_MERCATOR)
+        ax.set_axis_off()
+        ax.patch.set_visible(False)
+        left, right, bottom, top = extent
+        ax.set_xlim(left, right)
+        ax.set_ylim(bottom, top)
+        CachedContourSet(ax, contours, levels=levels, filled=True, cmap=cmap, norm=norm, extend=extend)
+        return figure_rgba(fig)
+    finally:
+        plt.close(fig)
+
+
+def _write_tile(tile: np.ndarray, path: Path, fileformat: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Flat colour bands compress far better (and exactly) without loss.
+    options = {"lossless": True} if fileformat == "webp" else {}
+    Image.fromarray(tile, "RGBA").save(path, format=fileformat.upper(), **options)
+
+
+def render_tile_pyramid(
+    field,
+    outdir,
+    zooms,
+    cmap,
+    norm,
+    levels,
+    extend=None,
+    bbox=None,
+    fileformat: str = "webp",
+    block: int = BLOCK_TILES,
+    meta=None,
+) -> int:
+    """Write ``outdir/{z}/{x}/{y}.{fileformat}`` tiles of a lon/lat DataArray.
+
+    ``zooms`` is an iterable of zoom levels; ``bbox`` limits the pyramid
+    (default: the extent of ``field``). Tiles without data are skipped.
+    ``outdir/tiles.json`` describes the pyramid and is written last, so its
+    presence marks a complete render. The pyramid is built in a sibling
+    directory that replaces ``outdir`` once done. A 0..360 ``field`` is
+    shifted to -180..180 first. Returns the number of tiles written.
+    """
+    outdir = Path(outdir)
+    extend = extend or "neither"
+    if float(field.lon.max()) > 180.0:
+        # Native 0..360 grid (--no-crop): the tile grid runs -180..180.
+        field = field.assign_coords(lon=((field.lon + 180.0) % 360.0) - 180.0).sortby("lon")
+    field = field.where(np.abs(field.lat) <= MAX_LAT, drop=True)
+    if bbox is None:
+        bbox = [float(field.lon.min()), float(field.lon.max()), float(field.lat.min()), float(field.lat.max())]
+
+    mesh = projected_mesh(field.lon.values, field.lat.values, WEB_MERCATOR)
+    contours = filled_contours(mesh.x, mesh.y, field.values, levels, extend)
+
+    zooms = sorted(set(int(z) for z in zooms))
+    written = 0
+    # Rendered beside the live pyramid and swapped in whole: a site serving
+    # outdir keeps the previous tiles until the new ones are complete.
+    with atomic_dir(outdir) as staging:
+        for zoom in zooms:
+            for bx0, bx1, by0, by1 in _blocks(*tile_range(bbox, zoom), block):
+                extent = _block_extent(zoom, bx0, bx1, by0, by1)
+                lon0, lat0 = _lonlat(extent[0], extent[2])
+                lon1, lat1 = _lonlat(extent[1], extent[3])
+                if not _has_data(field, lon0, lon1, lat0, lat1):
+                    continue
+                pixels = _render_block(contours, extent, bx1 - bx0 + 1, by1 - by0 + 1, cmap, norm, levels, extend)
+                for ty in range(by0, by1 + 1):
+                    for tx in range(bx0, bx1 + 1):
+                        r, c = (ty - by0) * TILE_SIZE, (tx - bx0) * TILE_SIZE
+                        tile = pixels[r:r + TILE_SIZE, c:c + TILE_SIZE]
+                        if not tile[..., 3].any():
+                            continue
+                        _write_tile(tile, staging / str(zoom) / str(tx) / f"{ty}.{fileformat}", fileformat)
+                        written += 1
+
+        info = {
+            "format": fileformat,
+            "tile_size": TILE_SIZE,
+            "minzoom": zooms[0] if zooms else None,
+            "maxzoom": zooms[-1] if zooms else None,
+            "bounds": [round(float(v), 4) for v in bbox],
+            "levels": [float(v) for v in levels],
+            "extend": extend,
+            "tiles": written,
+        }
+        if isinstance(cmap, mcolors.ListedColormap):
+            info["colors"] = [mcolors.to_hex(c) for c in cmap.colors]
+        info.update(meta or {})
+        (staging / TILES_META).write_text(json.dumps(info, indent=1))
+    return written
@@ -1,4 +1,5 @@
 import sys
+import math
 import importlib
 import cartopy.crs as ccrs
 from pathlib import Path
@@ -55,7 +56,11 @@ def select_time(ds, cfg):
 def select_bbox(data, cfg):
     if not cfg.bbox:
         return data
-    minlon, maxlon, minlat, maxlat = cfg.bbox
+    return subset_bbox(data, cfg.bbox)
+
+def subset_bbox(data, bbox):
+    """Slice data to [min_lon, max_lon, min_lat, max_lat], whatever the lat order."""
+    minlon, maxlon, minlat, maxlat = bbox
 
     lon_slice = slice(minlon, maxlon)
     if "lat" in data.coords:
@@ -74,6 +79,22 @@ def select_bbox(data, cfg):
         return data.sel(longitude=lon_slice, latitude=lat_slice)
     return data
 
+def union_bbox(bboxes, margin=0.0):
+    """Smallest bbox covering all of ``bboxes``, grown by ``margin`` degrees."""
+    bboxes = [b for b in bboxes if b]
+    if not bboxes:
+        return None
+    minlon = min(b[0] for b in bboxes) - margin
+    maxlon = max(b[1] for b in bboxes) + margin
+    minlat = max(min(b[2] for b in bboxes) - margin, -90.0)
+    maxlat = min(max(b[3] for b in bboxes) + margin, 90.0)
+    return [minlon, maxlon, minlat, maxlat]
+
+def regions_bbox(regions, yaml_cfg, margin=0.0):
+    """Union bbox of the named regions in config.yaml."""
+    region_cfg = yaml_cfg.get("regions", {})
+    return union_bbox([region_cfg.get(r, {}).get("bbox") for r in regions], margin)
+
 def select_level(data, cfg):
     if cfg.level is None:
         return data
@@ -124,14 +145,14 @@ def get_dataset_url(dataset, cycle):
     raise ValueError("Unknown dataset source")
 
 
-def open_dataset(dataset, cycle, max_hours=None):
+def open_dataset(dataset, cycle, max_hours=None, bbox=None):
     """Open a forecast dataset using the appropriate backend."""
     if dataset == "gfswave":
         from .grib_loader import load_gfswave_cycle, load_gfswave_forecast
         if max_hours is not None and max_hours == 1:
-            return load_gfswave_forecast(cycle, 0)
+            return load_gfswave_forecast(cycle, 0, bbox=bbox)
         hours = max_hours or 72
-        return load_gfswave_cycle(cycle, hours)
+        return load_gfswave_cycle(cycle, hours, bbox=bbox)
 
     import xarray as xr
     url = get_dataset_url(dataset, cycle)
@@ -153,6 +174,35 @@ def deep_update(base: dict, updates: dict):
             base[k] = v
     return base
 
+def figure_size(bbox):
+    """Figure size for a region bbox; portrait regions get a taller canvas."""
+    bbox = bbox or [90, 150, -20, 25]
+    lon_span = bbox[1] - bbox[0]
+    lat_span = bbox[3] - bbox[2]
+    lat_mid = (bbox[2] + bbox[3]) / 2
+    map_w = max(lon_span * math.cos(math.radians(lat_mid)), 1e-6)
+    map_h = max(lat_span, 1e-6)
+    aspect = map_h / map_w
+    portrait = aspect > 1.05
+    if portrait:
+        height = min(10.0, max(6.5, 6.5 * aspect))
+        return (5.5, height), True
+    width = min(11.0, max(7.0, 7.5 * (map_w / map_h)))
+    return (width, 6.0), False
+
+def get_cmap_norm(cfg):
+    """Listed colormap and boundary norm for cfg; prebuilt ones when compiled."""
+    if getattr(cfg, "colormap", None) is not None and getattr(cfg, "norm", None) is not None:
+        return cfg.colormap, cfg.norm
+    import matplotlib.colors as mcolors
+    cmap = mcolors.ListedColormap(cfg.cmap)
+    norm = mcolors.BoundaryNorm(
+        boundaries=cfg.levels,
+        ncolors=cmap.N,
+        extend=cfg.extend,
+    )
+    return cmap, norm
+
 def compute_quiver_params(lat, lon, cfg):
     lat = np.asarray(lat)
     lon = np.asarray(lon)
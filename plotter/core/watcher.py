@@ -0,0 +1,112 @@
+"""Follow a GFS Wave cycle as NOMADS publishes it, hour by hour."""
+
+import time
+from typing import Callable, Iterable, Optional
+
+from .downloader import DEFAULT_HOST_LIMIT, DEFAULT_WORKERS
+from .grib_loader import gfswave_forecast_hours, gfswave_hour_available, iter_gfswave_hours
+
+DEFAULT_POLL = 60.0
+DEFAULT_MAX_POLL = 600.0
+# Stop watching when no new hour appeared for this long (NOMADS finishes a
+# GFS Wave cycle in well under two hours once it starts).
+DEFAULT_GIVE_UP = 3 * 3600.0
+
+
+class AdaptiveBackoff:
+    """Poll delay that grows while nothing new is published and resets on progress."""
+
+    def __init__(self, initial: float = DEFAULT_POLL, maximum: float = DEFAULT_MAX_POLL, factor: float = 1.5):
+        self.initial = initial
+        self.maximum = max(initial, maximum)
+        self.factor = factor
+        self.delay = initial
+
+    def reset(self):
+        self.delay = self.initial
+
+    def next(self) -> float:
+        delay = self.delay
+        self.delay = min(self.maximum, self.delay * self.factor)
+        return delay
+
+
+def published_hours(
+    cycle: str,
+    start: int,
+    stop: int,
+    limit: int,
+    available: Callable[[str, int], bool] = gfswave_hour_available,
+) -> list:
+    """Consecutive output hours from ``start`` (before ``stop``) that are published, at most ``limit``."""
+    ready = []
+    for t in [t for t in gfswave_forecast_hours(stop) if t >= start][:limit]:
+        if not available(cycle, t):
+            break
+        ready.append(t)
+    return ready
+
+
+def watch_gfswave_cycle(
+    cycle: str,
+    max_hours: int,
+    params: Optional[Iterable[str]] = None,
+    bbox=None,
+    workers: int = DEFAULT_WORKERS,
+    host_limit: int = DEFAULT_HOST_LIMIT,
+    store=None,
+    poll: float = DEFAULT_POLL,
+    max_poll: float = DEFAULT_MAX_POLL,
+    give_up: float = DEFAULT_GIVE_UP,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+):
+    """Yield batches of ``(hour, dataset)`` as the hours of ``cycle`` are published.
+
+    Each poll checks the ``.idx`` of upcoming hours; every run of consecutive
+    published hours (up to ``2 * workers``) is downloaded concurrently and
+    yielded as one batch. While nothing new appears the poll interval grows
+    from ``poll`` to ``max_poll``. Ends after ``max_hours`` hours, or when no
+    hour was published for ``give_up`` seconds. Hours go through ``store``
+    like in :func:`~plotter.core.grib_loader.iter_gfswave_hours`.
+    """
+    params = list(params) if params is not None else None
+    backoff = AdaptiveBackoff(poll, max_poll)
+    batch_size = max(1, workers) * 2
+    next_hour = 0
+    last_hour = max(gfswave_forecast_hours(max_hours), default=-1)
+    last_progress = clock()
+
+    while next_hour <= last_hour:
+        try:
+            ready = published_hours(cycle, next_hour, max_hours, batch_size)
+        except Exception as exc:
+            print(f"[WARN] Could not check t+{next_hour:03d}h: {exc}")
+            ready = []
+
+        batch = []
+        if ready:
+            batch = list(
+                iter_gfswave_hours(
+                    cycle,
+                    ready,
+                    params=params,
+                    workers=workers,
+                    host_limit=host_limit,
+                    bbox=bbox,
+                    store=store,
+                )
+            )
+        if batch:
+            next_hour = batch[-1][0] + 1
+            backoff.reset()
+            last_progress = clock()
+            yield batch
+            continue
+
+        if clock() - last_progress >= give_up:
+            print(f"[WARN] No new hour of cycle {cycle} for {give_up:.0f}s; stopping at t+{next_hour:03d}h")
+            return
+        delay = backoff.next()
+        print(f"[INFO] Waiting {delay:g}s for t+{next_hour:03d}h of cycle {cycle}")
+        sleep(delay)
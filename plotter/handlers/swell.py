@@ -1,8 +1,8 @@
-from ..core.utils import load_model_params, select_bbox, load_model_params, select_time, compute_quiver_params
+from ..core.utils import load_model_params, select_bbox, load_model_params, select_time, compute_quiver_params, get_cmap_norm
 from ..core.base_handler import BaseHandler
-import cartopy.crs as ccrs
+from ..core.contour_cache import shared_contourf
+from ..core.mesh_cache import projected_mesh
 import numpy as np
-import matplotlib.colors as mcolors
 
 class SwellHandler(BaseHandler):
     def load(self, ds):
@@ -12,6 +12,8 @@ class SwellHandler(BaseHandler):
         dir = ds[varnames["dir"]]
         mag = select_time(mag, self.config)
         dir = select_time(dir, self.config)
+        # Whole (cropped) grid, contoured once and shared between regions.
+        self.set_domain(mag, "swell")
         mag = select_bbox(mag, self.config)
         dir = select_bbox(dir, self.config)
         return mag, dir
@@ -20,35 +22,32 @@ class SwellHandler(BaseHandler):
         im, iq = None, None
         mag, direction = data
 
-        lon = mag.lon.values
-        lat = mag.lat.values
-
         dir_rad = np.deg2rad(direction.values)
         u = -np.sin(dir_rad)
         v = -np.cos(dir_rad)
 
-        cmap = mcolors.ListedColormap(self.config.cmap)
-        norm = mcolors.BoundaryNorm(
-            boundaries=self.config.levels,
-            ncolors=cmap.N,
-            extend=self.config.extend,
-        )
-        im = ax.contourf(
-            mag.lon, mag.lat, mag,
-            cmap=cmap,
-            norm=norm,
-            levels=self.config.levels,
-            extend=self.config.extend,
-            transform=ccrs.PlateCarree(),
-        )
+        cmap, norm = get_cmap_norm(self.config)
+        mesh = projected_mesh(mag.lon.values, mag.lat.values, ax.projection)
+        if getattr(self.config, "sharedcontours", False):
+            im = shared_contourf(ax, self.domain, cmap, norm, self.config.levels, self.config.extend, key=self.domain_key)
+        else:
+            im = ax.contourf(
+                mesh.x, mesh.y, mag,
+                cmap=cmap,
+                norm=norm,
+                levels=self.config.levels,
+                extend=self.config.extend,
+                transform=ax.projection,
+            )
         skip, scale = compute_quiver_params(mag.lat, mag.lon, self.config)
         if self.config.quiver.get('skip') and self.config.quiver.get('scale') is not None:
             skip = self.config.quiver.get('skip')
             scale = self.config.quiver.get('scale')
+        qx, qy = mesh.points(skip)
+        qu, qv = mesh.rotate(u[::skip, ::skip], v[::skip, ::skip], skip)
         iq = ax.quiver(
-            lon[::skip], lat[::skip],
-            u[::skip, ::skip], v[::skip, ::skip],
-            transform=ccrs.PlateCarree(),
+            qx, qy, qu, qv,
+            transform=ax.projection,
             scale=scale,
             width=self.config.quiver.get("width"),
             headwidth=self.config.quiver.get("headwidth"),
@@ -1,8 +1,8 @@
 from ..core.base_handler import BaseHandler
-from ..core.utils import load_model_params, select_bbox, select_time, select_level, compute_quiver_params
-import cartopy.crs as ccrs
+from ..core.utils import load_model_params, select_bbox, select_time, select_level, compute_quiver_params, get_cmap_norm
+from ..core.contour_cache import shared_contourf
+from ..core.mesh_cache import projected_mesh
 import numpy as np
-import matplotlib.colors as mcolors
 
 class WindHandler(BaseHandler):
     def load(self, ds):
@@ -14,9 +14,12 @@ class WindHandler(BaseHandler):
 
         u = select_time(u, self.config)
         u = select_level(u, self.config)
-        u = select_bbox(u, self.config)
         v = select_time(v, self.config)
         v = select_level(v, self.config)
+        # Whole (cropped) grid speed, contoured once and shared between regions;
+        # only computed when shared contours or tiles ask for it.
+        self.set_domain(lambda u=u, v=v: np.sqrt(u**2 + v**2), "wind")
+        u = select_bbox(u, self.config)
         v = select_bbox(v, self.config)
 
         return u, v
@@ -24,35 +27,33 @@ class WindHandler(BaseHandler):
     def plot(self, ax, data):
         im, iq = None, None
         u, v = data
-        lon = u.lon.values
-        lat = u.lat.values
         u_np = u.values
         v_np = v.values
         mag = np.sqrt(u_np**2 + v_np**2)
         u_np = u_np / mag
         v_np = v_np / mag
-        cmap = mcolors.ListedColormap(self.config.cmap)
-        norm = mcolors.BoundaryNorm(
-            boundaries=self.config.levels,
-            ncolors=cmap.N,
-            extend=self.config.extend,
-        )
+        cmap, norm = get_cmap_norm(self.config)
         skip, scale = compute_quiver_params(u.lat, u.lon, self.config)
         if self.config.quiver.get('skip') and self.config.quiver.get('scale') is not None:
             skip = self.config.quiver.get('skip')
             scale = self.config.quiver.get('scale')
-        im = ax.contourf(
-            u.lon, u.lat, mag,
-            cmap=cmap,
-            norm=norm,
-            levels=self.config.levels,
-            extend=self.config.extend,
-            transform=ccrs.PlateCarree(),
-        )
+        mesh = projected_mesh(u.lon.values, u.lat.values, ax.projection)
+        if getattr(self.config, "sharedcontours", False):
+            im = shared_contourf(ax, self.domain, cmap, norm, self.config.levels, self.config.extend, key=self.domain_key)
+        else:
+            im = ax.contourf(
+                mesh.x, mesh.y, mag,
+                cmap=cmap,
+                norm=norm,
+                levels=self.config.levels,
+                extend=self.config.extend,
+                transform=ax.projection,
+            )
+        qx, qy = mesh.points(skip)
+        qu, qv = mesh.rotate(u_np[::skip, ::skip], v_np[::skip, ::skip], skip)
         iq = ax.quiver(
-            lon[::skip], lat[::skip],
-            u_np[::skip, ::skip], v_np[::skip, ::skip],
-            transform=ccrs.PlateCarree(),
+            qx, qy, qu, qv,
+            transform=ax.projection,
             scale=scale,
             width=self.config.quiver.get("width"),
             headwidth=self.config.quiver.get("headwidth"),
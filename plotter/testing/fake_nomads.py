@@ -0,0 +1,335 @@
+"""Local stand-in for the NOMADS GFS Wave GRIB2 tree, for tests and benchmarks."""
+
+import re
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import eccodes
+import numpy as np
+
+NOMADS_PATH = "/pub/data/nccf/com/gfs/prod"
+
+# (idx name, idx level, discipline, category, number, typeOfFirstFixedSurface, partition)
+# in the order NCEP writes them into gfswave.tHHz.global.0p25.fNNN.grib2.
+GFSWAVE_MESSAGES = [
+    ("WIND", "surface", 0, 2, 1, 1, None),
+    ("WDIR", "surface", 0, 2, 0, 1, None),
+    ("UGRD", "surface", 0, 2, 2, 1, None),
+    ("VGRD", "surface", 0, 2, 3, 1, None),
+    ("HTSGW", "surface", 10, 0, 3, 1, None),
+    ("PERPW", "surface", 10, 0, 11, 1, None),
+    ("DIRPW", "surface", 10, 0, 10, 1, None),
+    ("WVHGT", "surface", 10, 0, 5, 1, None),
+    ("SWELL", "1 in sequence", 10, 0, 8, 241, 1),
+    ("SWELL", "2 in sequence", 10, 0, 8, 241, 2),
+    ("SWELL", "3 in sequence", 10, 0, 8, 241, 3),
+    ("WVPER", "surface", 10, 0, 6, 1, None),
+    ("SWPER", "1 in sequence", 10, 0, 9, 241, 1),
+    ("SWPER", "2 in sequence", 10, 0, 9, 241, 2),
+    ("SWPER", "3 in sequence", 10, 0, 9, 241, 3),
+    ("WVDIR", "surface", 10, 0, 4, 1, None),
+    ("SWDIR", "1 in sequence", 10, 0, 7, 241, 1),
+    ("SWDIR", "2 in sequence", 10, 0, 7, 241, 2),
+    ("SWDIR", "3 in sequence", 10, 0, 7, 241, 3),
+]
+
+DEFAULT_GRID = {"lon": (90.0, 150.0), "lat": (25.0, -20.0), "step": 0.5}
+
+
+def _fcst_label(hour: int) -> str:
+    return "anl" if hour == 0 else f"{hour} hour fcst"
+
+
+def _message(cycle: str, hour: int, spec, lons, lats, rng):
+    name, _, discipline, category, number, level_type, partition = spec
+    h = eccodes.codes_grib_new_from_samples("GRIB2")
+    try:
+        eccodes.codes_set(h, "centre", 7)
+        eccodes.codes_set(h, "discipline", discipline)
+        eccodes.codes_set(h, "parameterCategory", category)
+        eccodes.codes_set(h, "parameterNumber", number)
+        eccodes.codes_set(h, "typeOfFirstFixedSurface", level_type)
+        if partition is None:
+            eccodes.codes_set_missing(h, "scaledValueOfFirstFixedSurface")
+            eccodes.codes_set_missing(h, "scaleFactorOfFirstFixedSurface")
+        else:
+            eccodes.codes_set(h, "scaleFactorOfFirstFixedSurface", 0)
+            eccodes.codes_set(h, "scaledValueOfFirstFixedSurface", partition)
+        eccodes.codes_set_missing(h, "typeOfSecondFixedSurface")
+        eccodes.codes_set(h, "Ni", len(lons))
+        eccodes.codes_set(h, "Nj", len(lats))
+        eccodes.codes_set(h, "latitudeOfFirstGridPointInDegrees", float(lats[0]))
+        eccodes.codes_set(h, "longitudeOfFirstGridPointInDegrees", float(lons[0]))
+        eccodes.codes_set(h, "latitudeOfLastGridPointInDegrees", float(lats[-1]))
+        eccodes.codes_set(h, "longitudeOfLastGridPointInDegrees", float(lons[-1]))
+        eccodes.codes_set(h, "iDirectionIncrementInDegrees", float(abs(lons[1] - lons[0])))
+        eccodes.codes_set(h, "jDirectionIncrementInDegrees", float(abs(lats[1] - lats[0])))
+        eccodes.codes_set(h, "jScansPositively", 0)
+        eccodes.codes_set(h, "dataDate", int(cycle[:8]))
+        eccodes.codes_set(h, "dataTime", int(cycle[8:10]) * 100)
+        eccodes.codes_set(h, "forecastTime", hour)
+
+        # Smooth synoptic-scale patterns that drift with the forecast hour,
+        # so contouring costs what it does on real model output.
+        lon2d, lat2d = np.meshgrid(lons, lats)
+        phase = hour / 12.0 + rng.uniform(0, 2 * np.pi)
+        wave = np.sin(np.deg2rad(lon2d) * 6 + phase) * np.cos(np.deg2rad(lat2d) * 8 - phase)
+        if name in ("WDIR", "DIRPW", "WVDIR", "SWDIR"):
+            values = (180 + 180 * wave) % 360
+        elif name in ("UGRD", "VGRD"):
+            values = 8 * wave
+        else:
+            values = 2.5 + 2.5 * wave
+        eccodes.codes_set_values(h, values.ravel())
+        return eccodes.codes_get_message(h)
+    finally:
+        eccodes.codes_release(h)
+
+
+def write_gfswave_grib(path: Path, cycle: str, hour: int, grid=None, seed=None) -> Path:
+    """Write a small synthetic GFS Wave GRIB2 file plus its NOMADS-style ``.idx``."""
+    grid = grid or DEFAULT_GRID
+    lons = np.arange(grid["lon"][0], grid["lon"][1] + grid["step"] / 2, grid["step"])
+    lat_step = -grid["step"] if grid["lat"][0] > grid["lat"][1] else grid["step"]
+    lats = np.arange(grid["lat"][0], grid["lat"][1] + lat_step / 2, lat_step)
+    rng = np.random.default_rng(hour if seed is None else seed)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = []
+    offset = 0
+    with open(path, "wb") as f:
+        for num, spec in enumerate(GFSWAVE_MESSAGES, start=1):
+            msg = _message(cycle, hour, spec, lons, lats, rng)
+            lines.append(f"{num}:{offset}:d={cycle}:{spec[0]}:{spec[1]}:{_fcst_label(hour)}:")
+            f.write(msg)
+            offset += len(msg)
+    Path(f"{path}.idx").write_text("\n".join(lines) + "\n")
+    return path
+
+
+def gfswave_fixture_path(root: Path, cycle: str, hour: int) -> Path:
+    """Path of a forecast hour inside a fake NOMADS document root."""
+    ymd, hh = cycle[:8], cycle[8:10]
+    fname = f"gfswave.t{hh}z.global.0p25.f{hour:03d}.grib2"
+    return Path(root) / NOMADS_PATH.lstrip("/") / f"gfs.{ymd}" / hh / "wave" / "gridded" / fname
+
+
+_RANGE_RE = re.compile(r"bytes=(\d+)-(\d*)$")
+THROTTLE_CHUNK = 64 * 1024
+
+
+class _RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Static file handler that honours single ``Range: bytes=a-b`` requests."""
+
+    # Keep-alive, as NOMADS does.
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def copyfile(self, source, outputfile):
+        cut = self.server.take_cut()
+        if cut is not None:
+            # Drop the connection after ``cut`` body bytes, like a flaky link.
+            outputfile.write(source.read(cut))
+            outputfile.flush()
+            self.close_connection = True
+            return
+        bandwidth = self.server.bandwidth
+        if not bandwidth:
+            return super().copyfile(source, outputfile)
+        # Throttle each transfer to ``bandwidth`` bytes/s.
+        start = time.perf_counter()
+        sent = 0
+        while True:
+            chunk = source.read(THROTTLE_CHUNK)
+            if not chunk:
+                break
+            sent += len(chunk)
+            ahead = sent / bandwidth - (time.perf_counter() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+            outputfile.write(chunk)
+
+    def send_head(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        header = self.headers.get("Range")
+        path = Path(self.translate_path(self.path))
+        server.record(self.path, header)
+        if header is not None and server.take_ignored_range():
+            # Like a mirror without Range support: the whole file, 200.
+            header = None
+        if header is None or not path.is_file():
+            f = super().send_head()
+            if f is not None and path.is_file():
+                server.add_bytes(path.stat().st_size if self.command == "GET" else 0)
+            return f
+
+        m = _RANGE_RE.match(header.strip())
+        size = path.stat().st_size
+        if not m:
+            self.send_error(416, "Unsupported range")
+            return None
+        start = int(m.group(1))
+        end = int(m.group(2)) if m.group(2) else size - 1
+        end = min(end, size - 1)
+        if start > end:
+            self.send_error(416, "Requested range not satisfiable")
+            return None
+
+        f = open(path, "rb")
+        f.seek(start)
+        length = end - start + 1
+        self.send_response(206)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        server.add_bytes(length if self.command == "GET" else 0)
+        return _LimitedReader(f, length)
+
+
+class _LimitedReader:
+    """File wrapper that stops after ``length`` bytes (used by ``copyfile``)."""
+
+    def __init__(self, f, length):
+        self._f = f
+        self._left = length
+
+    def read(self, n=-1):
+        if self._left <= 0:
+            return b""
+        n = self._left if n is None or n < 0 else min(n, self._left)
+        data = self._f.read(n)
+        self._left -= len(data)
+        return data
+
+    def close(self):
+        self._f.close()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self.requests = []
+        self.bytes_sent = 0
+        self.connections = 0
+        self.latency = 0.0
+        self.bandwidth = None
+        self._cuts = []
+        self._ranges_seen = 0
+        self._ignored_ranges = set()
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    def take_cut(self):
+        with self._lock:
+            return self._cuts.pop(0) if self._cuts else None
+
+    def take_ignored_range(self) -> bool:
+        with self._lock:
+            n = self._ranges_seen
+            self._ranges_seen += 1
+            return n in self._ignored_ranges
+
+    def record(self, path, range_header):
+        with self._lock:
+            self.requests.append((path, range_header))
+
+    def add_bytes(self, n):
+        with self._lock:
+            self.bytes_sent += n
+
+
+class FakeNomadsServer:
+    """Serve a directory laid out like NOMADS over HTTP on localhost.
+
+    Use as a context manager; ``base_url`` is a drop-in replacement for
+    ``grib_loader.NOMADS_GFSWAVE_BASE``. ``latency`` (seconds before each
+    response) and ``bandwidth`` (bytes/s per transfer) mimic NOMADS under
+    load at cycle time.
+    """
+
+    def __init__(self, root: Path, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, bandwidth=None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        handler = partial(_RangeRequestHandler, directory=str(self.root))
+        self._httpd = _Server((host, port), handler)
+        self._httpd.latency = latency
+        self._httpd.bandwidth = bandwidth
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{NOMADS_PATH}"
+
+    @property
+    def requests(self):
+        return list(self._httpd.requests)
+
+    @property
+    def bytes_sent(self) -> int:
+        return self._httpd.bytes_sent
+
+    @property
+    def connections(self) -> int:
+        """TCP connections accepted so far."""
+        return self._httpd.connections
+
+    def cut_next_transfer(self, after: int):
+        """Close the connection of the next GET after ``after`` body bytes."""
+        with self._httpd._lock:
+            self._httpd._cuts.append(after)
+
+    def ignore_range(self, nth: int = 0):
+        """Answer the ``nth`` Range request from now (0: the next) with the whole file."""
+        with self._httpd._lock:
+            self._httpd._ignored_ranges.add(self._httpd._ranges_seen + nth)
+
+    def publish(self, cycle: str, hour: int, grid=None) -> Path:
+        """Generate and expose one forecast hour (GRIB2 + idx)."""
+        return write_gfswave_grib(gfswave_fixture_path(self.root, cycle, hour), cycle, hour, grid=grid)
+
+    def publish_over_time(self, cycle: str, hours, interval: float, grid=None) -> threading.Thread:
+        """Publish ``hours`` one by one, ``interval`` seconds apart, in the background."""
+
+        def run():
+            for hour in hours:
+                time.sleep(interval)
+                self.publish(cycle, hour, grid=grid)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
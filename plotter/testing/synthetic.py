@@ -0,0 +1,57 @@
+"""Synthetic decoded datasets shaped like the real ones, for tests and benchmarks."""
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from ..core.utils import load_model_params
+
+DIRECTION_HINTS = ("dir",)
+
+
+def _variables(dataset: str) -> dict:
+    """{variable name: role} of every param in ``plotter/modelparams/<dataset>.py``."""
+    roles = {}
+    for value in load_model_params(dataset).values():
+        if isinstance(value, dict):
+            for role, name in value.items():
+                roles[name] = role
+    return roles
+
+
+def synthetic_dataset(
+    bbox,
+    step: float = 0.25,
+    hours: int = 1,
+    dataset: str = "gfswave",
+    baserun="2026-01-01T00",
+    seed: int = 0,
+) -> xr.Dataset:
+    """Hourly float32 fields on a ``step`` grid over ``bbox``, named as ``dataset`` expects.
+
+    Latitudes run north to south and values are smooth synoptic-scale
+    patterns drifting with the hour, like the fake NOMADS GRIB2 files, so
+    contouring and quivers cost what they do on model output.
+    """
+    minlon, maxlon, minlat, maxlat = bbox
+    lon = np.arange(minlon, maxlon + step / 2, step)
+    lat = np.arange(maxlat, minlat - step / 2, -step)
+    time = pd.Timestamp(baserun) + pd.to_timedelta(np.arange(hours), unit="h")
+    lon2d, lat2d = np.meshgrid(np.deg2rad(lon), np.deg2rad(lat))
+    rng = np.random.default_rng(seed)
+
+    data_vars = {}
+    for name, role in sorted(_variables(dataset).items()):
+        fields = []
+        for t in range(hours):
+            phase = t / 12.0 + rng.uniform(0, 2 * np.pi)
+            wave = np.sin(lon2d * 6 + phase) * np.cos(lat2d * 8 - phase)
+            if role in DIRECTION_HINTS:
+                values = (180 + 180 * wave) % 360
+            elif role in ("u", "v"):
+                values = 8 * wave
+            else:
+                values = 2.5 + 2.5 * wave
+            fields.append(values.astype(np.float32))
+        data_vars[name] = (("time", "lat", "lon"), np.stack(fields))
+    return xr.Dataset(data_vars, coords={"time": time, "lat": lat, "lon": lon})
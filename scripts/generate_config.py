@@ -4,10 +4,16 @@
 import argparse
 import json
 import re
+import sys
 from pathlib import Path
 from typing import Optional
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from plotter.core.grib_cache import atomic_file  # noqa: E402
+
 CONFIG_PATH = ROOT / "assets" / "config" / "config.json"
 MAPS_ROOT = ROOT / "assets" / "maps"
 
@@ -34,6 +40,7 @@ BACKEND_TO_UI = {v: k for k, v in UI_PARAMS.items()}
 UI_PARAM_ORDER = ["surface_wind", "swh", "swell"]
 
 FILE_PATTERN = re.compile(r"^(?P<param>[a-z_]+)_(?P<hour>\d{3})\.webp$")
+GRID_PATTERN = re.compile(r"^(?P<param>[a-z_]+)_(?P<hour>\d{3})\.bin$")
 
 
 def empty_wind_waves(dataset: str):
@@ -69,17 +76,67 @@ def scan_dataset(dataset_dir: Path):
     return regions
 
 
+def scan_tiles(dataset_dir: Path):
+    """Return {backend_param: {hour_suffix: tiles.json contents}} of complete tile pyramids."""
+    pyramids = {}
+    tiles_dir = dataset_dir / "tiles"
+    if not tiles_dir.is_dir():
+        return pyramids
+    for meta in sorted(tiles_dir.glob("*/[0-9][0-9][0-9]/tiles.json")):
+        hour_dir = meta.parent
+        try:
+            info = json.loads(meta.read_text())
+        except ValueError:
+            continue
+        pyramids.setdefault(hour_dir.parent.name, {})[hour_dir.name] = info
+    return pyramids
+
+
+def scan_grids(dataset_dir: Path):
+    """Return {backend_param: [hour_suffixes]} of exported binary grids."""
+    grids = {}
+    for f in sorted((dataset_dir / "grid").glob("*.bin")):
+        m = GRID_PATTERN.match(f.name)
+        if m:
+            grids.setdefault(m.group("param"), []).append(m.group("hour"))
+    return grids
+
+
+def scan_bundles(dataset_dir: Path):
+    """Return {region: {backend_param: bundle file name}} of frame bundles (plot.py --bundles)."""
+    bundles = {}
+    for f in sorted(dataset_dir.glob("*/*.bundle")):
+        bundles.setdefault(f.parent.name, {})[f.stem] = f.name
+    return bundles
+
+
 FORECAST_HOURS = 4
 
 
-def canonical_hours(max_hours: int = FORECAST_HOURS):
-    """Fixed forecast window shared by all regions (F000 … F{max-1})."""
-    return [f"{h:03d}" for h in range(max_hours)]
+def canonical_hours(max_hours: int = FORECAST_HOURS, dataset: str = "gfswave"):
+    """Fixed forecast window shared by all regions, the hours plot.py fetches before ``max_hours``.
 
+    GFS Wave follows its output schedule (hourly to F120, then 3-hourly);
+    other datasets are hourly.
+    """
+    if dataset == "gfswave":
+        from plotter.core.grib_loader import gfswave_forecast_hours
 
-def build_config(dataset: str, cycle: Optional[str] = None, max_hours: int = FORECAST_HOURS):
-    scanned = scan_dataset(MAPS_ROOT / dataset)
-    canon = canonical_hours(max_hours)
+        hours = gfswave_forecast_hours(max_hours)
+    else:
+        hours = range(max_hours)
+    return [f"{h:03d}" for h in hours]
+
+
+def build_config(
+    dataset: str,
+    cycle: Optional[str] = None,
+    max_hours: int = FORECAST_HOURS,
+    maps_root: Path = MAPS_ROOT,
+):
+    scanned = scan_dataset(Path(maps_root) / dataset)
+    bundles = scan_bundles(Path(maps_root) / dataset)
+    canon = canonical_hours(max_hours, dataset)
     regions = {"Select Region (or Click on Map)": {}}
 
     region_ids = ALL_REGIONS + [r for r in scanned if r not in ALL_REGIONS]
@@ -107,36 +164,64 @@ def build_config(dataset: str, cycle: Optional[str] = None, max_hours: int = FOR
         else:
             timestamps = []
 
-        regions[region] = {
-            "forecast_types": {
-                "Wind and Waves": {
-                    "parameters": ui_params,
-                    "models": ["GFS"],
-                    "timestamps": timestamps,
-                    "dataset": dataset,
-                }
-            }
+        meta = {
+            "parameters": ui_params,
+            "models": ["GFS"],
+            "timestamps": timestamps,
+            "dataset": dataset,
+        }
+        region_bundles = {
+            ui_key: f"assets/maps/{dataset}/{region}/{bundles[region][UI_PARAMS[ui_key]]}"
+            for ui_key in UI_PARAM_ORDER
+            if UI_PARAMS[ui_key] in bundles.get(region, {})
         }
+        if region_bundles:
+            meta["bundles"] = region_bundles
+        regions[region] = {"forecast_types": {"Wind and Waves": meta}}
 
     config = {"regions": regions}
+
+    pyramids = scan_tiles(Path(maps_root) / dataset)
+    if pyramids:
+        first = next(iter(next(iter(pyramids.values())).values()))
+        config["tiles"] = {
+            "url": f"assets/maps/{dataset}/tiles/{{param}}/{{hour}}/{{z}}/{{x}}/{{y}}.{first.get('format', 'webp')}",
+            "minzoom": first.get("minzoom"),
+            "maxzoom": first.get("maxzoom"),
+            "bounds": first.get("bounds"),
+            "parameters": {
+                ui_key: [f"F{h}" for h in canon if h in pyramids.get(UI_PARAMS[ui_key], {})]
+                for ui_key in UI_PARAM_ORDER
+            },
+        }
+
+    grids = scan_grids(Path(maps_root) / dataset)
+    if grids:
+        config["grids"] = {
+            "url": f"assets/maps/{dataset}/grid/{{param}}_{{hour}}.bin",
+            "parameters": {
+                ui_key: [f"F{h}" for h in canon if h in grids.get(UI_PARAMS[ui_key], [])]
+                for ui_key in UI_PARAM_ORDER
+            },
+        }
     if cycle:
         config["cycle"] = cycle
         config["updated"] = cycle
     return config
 
 
-def main():
-    parser = argparse.ArgumentParser(description="Generate frontend config from map assets")
-    parser.add_argument("--dataset", default="gfswave")
-    parser.add_argument("--cycle", default=None, help="YYYYMMDDHH model cycle")
-    parser.add_argument("--max-hours", type=int, default=FORECAST_HOURS, help="Forecast hours in config")
-    parser.add_argument("--output", default=str(CONFIG_PATH))
-    args = parser.parse_args()
-
-    config = build_config(args.dataset, args.cycle, args.max_hours)
-    out = Path(args.output)
-    out.parent.mkdir(parents=True, exist_ok=True)
-    out.write_text(json.dumps(config, indent=2) + "\n")
+def write_config(
+    dataset: str,
+    cycle: Optional[str] = None,
+    max_hours: int = FORECAST_HOURS,
+    output=CONFIG_PATH,
+    maps_root: Path = MAPS_ROOT,
+):
+    """Build the config and replace ``output`` atomically (the site may read it mid-run)."""
+    config = build_config(dataset, cycle, max_hours, maps_root)
+    out = Path(output)
+    with atomic_file(out) as part:
+        part.write_text(json.dumps(config, indent=2) + "\n")
 
     with_data = sum(
         1
@@ -149,5 +234,16 @@ def main():
     print(f"[INFO] Wrote {out} ({with_data}/{len(ALL_REGIONS)} regions with forecast data)")
 
 
+def main():
+    parser = argparse.ArgumentParser(description="Generate frontend config from map assets")
+    parser.add_argument("--dataset", default="gfswave")
+    parser.add_argument("--cycle", default=None, help="YYYYMMDDHH model cycle")
+    parser.add_argument("--max-hours", type=int, default=FORECAST_HOURS, help="Forecast hours in config")
+    parser.add_argument("--output", default=str(CONFIG_PATH))
+    parser.add_argument("--maps-root", default=str(MAPS_ROOT), help="Directory plot.py wrote maps under")
+    args = parser.parse_args()
+    write_config(args.dataset, args.cycle, args.max_hours, output=args.output, maps_root=Path(args.maps_root))
+
+
 if __name__ == "__main__":
     main()
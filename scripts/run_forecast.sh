@@ -14,10 +14,21 @@ print(pick_latest_gfswave_cycle())
 "
 }
 
+if [ -n "${WATCH:-}" ]; then
+    # Follow the newest published cycle and render hours as NOMADS uploads
+    # them; plot.py rewrites config.json after every batch.
+    CYCLE="${CYCLE:-latest}"
+    python3 src/plot.py --dataset gfswave --cycle "$CYCLE" --region "${REGION:-all}" \
+        --max-hours "${MAX_HOURS:-4}" --download-workers "${DOWNLOAD_WORKERS:-4}" --watch
+    exit 0
+fi
+
 CYCLE="${CYCLE:-$(pick_cycle)}"
 MAX_HOURS="${MAX_HOURS:-4}"
 REGION="${REGION:-all}"
+DOWNLOAD_WORKERS="${DOWNLOAD_WORKERS:-4}"
 
 echo "[INFO] Using cycle: $CYCLE, forecast hours: $MAX_HOURS"
-python3 src/plot.py --dataset gfswave --cycle "$CYCLE" --region "$REGION" --max-hours "$MAX_HOURS"
+python3 src/plot.py --dataset gfswave --cycle "$CYCLE" --region "$REGION" --max-hours "$MAX_HOURS" \
+    --download-workers "$DOWNLOAD_WORKERS"
 python3 scripts/generate_config.py --dataset gfswave --cycle "$CYCLE" --max-hours "$MAX_HOURS"
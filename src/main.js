@@ -81,7 +81,12 @@
     };
 
     let playInterval = null;
+    let playing = false;
     let pendingMapSrc = null;
+    // Frame bundle of the current layer (plot.py --bundles): every hour in one
+    // file, fetched once and shown as Blob slices instead of a request per frame.
+    const BUNDLE_MAGIC = 'NWANIM1\0';
+    let bundle = { url: null, frames: null, loading: null };
 
     function showStaticMap() {
         pendingMapSrc = null;
@@ -111,6 +116,70 @@
     }
 
 
+    /* ------------------------------------------------------------
+     * Frame Bundles
+     * ------------------------------------------------------------ */
+    function parseBundle(buf) {
+        const bytes = new Uint8Array(buf);
+        if (new TextDecoder().decode(bytes.subarray(0, 8)) !== BUNDLE_MAGIC) {
+            throw new Error('not a frame bundle');
+        }
+        const length = new DataView(buf).getUint32(8, true);
+        const header = JSON.parse(new TextDecoder().decode(bytes.subarray(12, 12 + length)));
+        const body = 12 + length;
+        const blob = new Blob([buf]);
+        const type = `image/${header.format || 'webp'}`;
+        const frames = {};
+        header.frames.forEach(f => {
+            const start = body + f.offset;
+            frames[String(f.hour).padStart(3, '0')] = URL.createObjectURL(blob.slice(start, start + f.length, type));
+        });
+        return frames;
+    }
+
+    function bundleUrl() {
+        if (isRegionPlaceholder(regionSelect.value)) return null;
+        return forecastMeta().bundles?.[parameterSelect.value] || null;
+    }
+
+    function releaseBundle() {
+        if (bundle.frames) Object.values(bundle.frames).forEach(u => URL.revokeObjectURL(u));
+        bundle = { url: null, frames: null, loading: null };
+    }
+
+    // Resolves once the current layer's bundle is loaded, or to null without one.
+    function loadBundle() {
+        const url = bundleUrl();
+        if (!url) {
+            releaseBundle();
+            return Promise.resolve(null);
+        }
+        if (bundle.url === url) return bundle.loading;
+        releaseBundle();
+        const current = { url, frames: null, loading: null };
+        current.loading = fetch(url)
+            .then(r => {
+                if (!r.ok) throw new Error(`HTTP ${r.status}`);
+                return r.arrayBuffer();
+            })
+            .then(buf => {
+                const frames = parseBundle(buf);
+                if (bundle !== current) {
+                    Object.values(frames).forEach(u => URL.revokeObjectURL(u));
+                    return null;
+                }
+                current.frames = frames;
+                return frames;
+            })
+            .catch(err => {
+                console.warn('Frame bundle unavailable, loading frames one by one:', url, err);
+                return null;
+            });
+        bundle = current;
+        return current.loading;
+    }
+
+
     /* ------------------------------------------------------------
      * Update Map Image
      * ------------------------------------------------------------ */
@@ -170,8 +239,11 @@
             return;
         }
 
+        // Follow layer changes while animating; frames load one by one until the new bundle is in.
+        if (bundle.url !== bundleUrl() && (playing || bundle.url)) loadBundle();
+        const bundled = bundle.frames?.[timeIndex];
         const dataset = meta.dataset || MODEL_DATASET[model] || 'gfswave';
-        pendingMapSrc = `assets/maps/${dataset}/${region}/${paramSlug}_${timeIndex}.webp`;
+        pendingMapSrc = bundled || `assets/maps/${dataset}/${region}/${paramSlug}_${timeIndex}.webp`;
         mapImage.src = pendingMapSrc;
     }
 
@@ -261,11 +333,13 @@
         idx += delta;
         if (idx < 0 || idx >= opts.length) return;
         opts[idx].selected = true;
+        loadBundle();
         updateMap();
     }
 
     function togglePlay() {
-        if (playInterval) {
+        if (playing) {
+            playing = false;
             clearInterval(playInterval);
             playInterval = null;
             playBtn.textContent = '▶️';
@@ -273,19 +347,24 @@
         }
         const opts = validTimeOptions();
         if (opts.length <= 1) return;
+        playing = true;
         playBtn.textContent = '⏸️';
-        playInterval = setInterval(() => {
-            const list = validTimeOptions();
-            const current = timeSelect.options[timeSelect.selectedIndex];
-            let idx = list.indexOf(current);
-            if (idx < 0) idx = 0;
-            if (idx >= list.length - 1) {
-                list[0].selected = true;
-            } else {
-                list[idx + 1].selected = true;
-            }
-            updateMap();
-        }, 800);
+        // Start once the layer's bundle is in (one request for every frame).
+        loadBundle().then(() => {
+            if (!playing || playInterval) return;
+            playInterval = setInterval(() => {
+                const list = validTimeOptions();
+                const current = timeSelect.options[timeSelect.selectedIndex];
+                let idx = list.indexOf(current);
+                if (idx < 0) idx = 0;
+                if (idx >= list.length - 1) {
+                    list[0].selected = true;
+                } else {
+                    list[idx + 1].selected = true;
+                }
+                updateMap();
+            }, 800);
+        });
     }
 
     if (prevBtn) prevBtn.addEventListener('click', () => stepTime(-1));
@@ -295,7 +374,7 @@
     const overviewBtn = document.getElementById('overviewBtn');
     if (overviewBtn) {
         overviewBtn.addEventListener('click', () => {
-            if (playInterval) togglePlay();
+            if (playing) togglePlay();
             regionSelect.value = 'Select Region (or Click on Map)';
             loadForecastTypes();
         });
@@ -1,6 +1,8 @@
 import argparse
 import os
+import shutil
 import sys
+import tempfile
 from datetime import datetime
 from pathlib import Path
 
@@ -13,10 +15,17 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+from plotter.core import metrics
 from plotter.core.plotter import Plotter
-from plotter.core.plot_config import PlotConfig
 from plotter.core.config_loader import load_param_config
-from plotter.core.utils import get_dataset_url, load_model_params
+from plotter.core.bundles import BundleCollector
+from plotter.core.encoder import default_encoder
+from plotter.core.grid_export import export_grid
+from plotter.core.manifest import RenderManifest, input_digest, render_key
+from plotter.core.render_config import compile_render_configs
+from plotter.core.render_pool import RenderTask, build_plot_config, run_render_tasks
+from plotter.core.tiles import TILES_META
+from plotter.core.utils import get_dataset_url, load_model_params, regions_bbox
 
 GFSWAVE_PARAMS = ("wind", "swh", "swell")
 GFSATMOS_PARAMS = ("rainrate", "temp", "relhum", "mslp")
@@ -26,14 +35,18 @@ DATASET_PARAMS = {
 }
 
 
-def parse_args():
+def parse_args(argv=None):
     parser = argparse.ArgumentParser(description="NusaWave Plotting Engine")
     parser.add_argument(
         "--dataset",
         required=True,
         choices=["gfsatmos", "gfswave", "ecmwfatmos", "ecmwfwave", "hycom", "cmems"],
     )
-    parser.add_argument("--cycle", required=True, help="YYYYMMDDHH model cycle")
+    parser.add_argument(
+        "--cycle",
+        required=True,
+        help="YYYYMMDDHH model cycle, or 'latest' (gfswave) for the newest published one",
+    )
     parser.add_argument(
         "--max-hours",
         type=int,
@@ -47,7 +60,123 @@ def parse_args():
         help="Legacy: forecast length in days (overrides --max-hours if set)",
     )
     parser.add_argument("--region", default="all", help="Region name or 'all'")
-    return parser.parse_args()
+    parser.add_argument(
+        "--assets-dir",
+        default=str(ROOT / "assets"),
+        help="Site assets directory; maps go under <assets-dir>/maps (default: the repo's assets/)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Render maps on N worker processes (default: 1, render inline)",
+    )
+    parser.add_argument(
+        "--fetch",
+        choices=["range", "full"],
+        default="range",
+        help="gfswave: fetch only needed GRIB messages via .idx byte ranges, or whole files",
+    )
+    parser.add_argument(
+        "--download-workers",
+        type=int,
+        default=4,
+        help="gfswave: forecast hours downloaded concurrently (default: 4)",
+    )
+    parser.add_argument(
+        "--host-connections",
+        type=int,
+        default=4,
+        help="gfswave: max simultaneous transfers per host (default: 4)",
+    )
+    parser.add_argument(
+        "--crop-margin",
+        type=float,
+        default=2.0,
+        help="gfswave: degrees added around the union of rendered region bboxes when cropping (default: 2)",
+    )
+    parser.add_argument(
+        "--no-crop",
+        action="store_true",
+        help="gfswave: keep the full global grid instead of cropping on ingest",
+    )
+    parser.add_argument(
+        "--no-store",
+        action="store_true",
+        help="gfswave: do not keep decoded hours in the cycle's chunked NetCDF store "
+        "(re-runs then decode the GRIB cache again)",
+    )
+    parser.add_argument(
+        "--cache-budget",
+        default=None,
+        help="gfswave: disk budget of the GRIB cache, e.g. 20G; least recently used "
+        "cycles are evicted beyond it (default: $NUSAWAVE_GRIB_CACHE_BUDGET or 10G)",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        default=None,
+        help="Memory for forecast values read at once (cycle store reads) and for frames held "
+        "for --bundles, e.g. 2G (default: $NUSAWAVE_MEMORY_BUDGET or 1G)",
+    )
+    parser.add_argument(
+        "--output",
+        choices=["maps", "tiles", "both"],
+        default="maps",
+        help="Render per-region maps, an XYZ tile pyramid per param and hour "
+        "(assets/maps/<dataset>/tiles/<param>/<hour>/{z}/{x}/{y}), or both (default: maps)",
+    )
+    parser.add_argument(
+        "--export-grids",
+        action="store_true",
+        help="gfswave: also write each (param, hour) as a quantized binary grid "
+        "(assets/maps/<dataset>/grid/<param>_<hour>.bin) for client-side rendering",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-render every map even if the manifest says it is up to date",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="gfswave: keep polling NOMADS and render each hour as soon as it is published, "
+        "updating assets/config/config.json after every batch",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=60.0,
+        help="--watch: initial seconds between availability checks (default: 60)",
+    )
+    parser.add_argument(
+        "--max-poll-interval",
+        type=float,
+        default=600.0,
+        help="--watch: upper bound the poll interval backs off to (default: 600)",
+    )
+    parser.add_argument(
+        "--watch-timeout",
+        type=float,
+        default=3 * 3600.0,
+        help="--watch: give up after this many seconds without a new hour (default: 10800)",
+    )
+    parser.add_argument(
+        "--bundles",
+        action="store_true",
+        help="Also write each region's frames of a param into one file "
+        "(assets/maps/<dataset>/<region>/<param>.bundle) for the frontend animation",
+    )
+    parser.add_argument(
+        "--metrics",
+        default=None,
+        help="Append per-stage timing spans (JSON lines, one per span) to this file",
+    )
+    parser.add_argument(
+        "--prometheus",
+        default=None,
+        help="Write a Prometheus textfile summary of this run's spans (node_exporter textfile collector)",
+    )
+    return parser.parse_args(argv)
 
 
 def params_for_dataset(dataset):
@@ -58,9 +187,85 @@ def params_for_dataset(dataset):
     return [p for p in mapper.keys() if p not in skip]
 
 
-def main():
-    args = parse_args()
+def _report(result):
+    """Print a finished pool task's captured log, or its failure."""
+    task = result.task
+    where = "tiles" if task.kind == "tiles" else f"for region {task.region}"
+    label = f"{task.param} {where} at t+{task.forecast_hour:03d}h"
+    if result.log:
+        print(result.log, end="")
+    if result.ok:
+        print(f"[INFO] Plotted {label} in {result.seconds:.1f}s")
+    else:
+        print(f"[ERROR] Failed {label}:\n{result.error}", end="")
+
+
+def _render_inline(task, ds, render_configs, encoder=None):
+    plotter = Plotter(build_plot_config(task, render_configs), encoder=encoder)
+    if task.kind == "tiles":
+        print(f"[INFO] Tiling {task.param} at t+{task.forecast_hour:03d}h")
+        plotter.plot_tiles(ds, task.param)
+        return
+    print(f"[INFO] Plotting {task.param} for region {task.region} at t+{task.forecast_hour:03d}h")
+    plotter.plot_map(ds, task.param)
+    return plotter.written
+
+
+def _summarize(results):
+    failed = [r for r in results if not r.ok]
+    total = sum(r.seconds for r in results)
+    print(f"[INFO] Rendered {len(results) - len(failed)}/{len(results)} maps ({total:.1f}s of worker time)")
+    if failed:
+        for r in failed:
+            print(f"[ERROR] {r.task.param}/{r.task.region or 'tiles'} t+{r.task.forecast_hour:03d}h failed")
+        sys.exit(1)
+
+
+def _report_downloads():
+    from plotter.core.http_client import default_client
+
+    stats = default_client().summary()
+    if stats["requests"]:
+        print(
+            f"[INFO] HTTP: {stats['requests']} request(s) on {stats['connections']} connection(s), "
+            f"{stats['bytes'] / 1e6:.1f} MB in {stats['seconds']:.1f}s "
+            f"({stats['throughput'] / 1e6:.1f} MB/s), {stats['retries']} retried"
+        )
+
+
+def _write_frontend_config(dataset, cycle, max_hours, assets):
+    """Regenerate assets/config/config.json from the maps rendered so far."""
+    scripts = Path(__file__).resolve().parents[1] / "scripts"
+    if str(scripts) not in sys.path:
+        sys.path.insert(0, str(scripts))
+    import generate_config
+
+    generate_config.write_config(
+        dataset,
+        cycle,
+        max_hours,
+        output=assets / "config" / "config.json",
+        maps_root=assets / "maps",
+    )
+
+
+def run(args):
+    if args.dataset != "gfswave" and (args.watch or args.cycle == "latest"):
+        raise ValueError("[ERROR] --watch and --cycle latest are only supported for gfswave")
+    if args.dataset != "gfswave" and (args.output != "maps" or args.export_grids):
+        raise ValueError("[ERROR] --output tiles|both and --export-grids are only supported for gfswave")
+    if args.cycle == "latest":
+        from plotter.core.grib_loader import latest_gfswave_cycle
+
+        args.cycle = latest_gfswave_cycle()
+        print(f"[INFO] Latest published cycle: {args.cycle}")
     baserun = datetime.strptime(args.cycle, "%Y%m%d%H")
+    from plotter.core.cycle_store import MEMORY_BUDGET_ENV, memory_budget
+    from plotter.core.grib_cache import parse_size
+
+    if args.memory_budget:
+        # Through the environment, so render pool workers get the same budget.
+        os.environ[MEMORY_BUDGET_ENV] = str(parse_size(args.memory_budget))
 
     url = get_dataset_url(args.dataset, args.cycle)
     print(f"[INFO] Loading dataset: {url}")
@@ -68,51 +273,230 @@ def main():
     max_t = args.MAXFORECAST * 24 if args.MAXFORECAST is not None else args.max_hours
 
     yaml_cfg = load_param_config()
-    yaml_defaults = yaml_cfg.get("defaults", {})
     yaml_params = yaml_cfg.get("variables", {})
     yaml_regions = yaml_cfg.get("regions", {})
 
     regions = [args.region] if args.region != "all" else list(yaml_regions.keys())
     params = params_for_dataset(args.dataset)
     params_load = load_model_params(args.dataset)
-
-    maps_root = ROOT / "assets" / "maps" / args.dataset
+    maps = args.output in ("maps", "both")
+    tiles = args.output in ("tiles", "both")
+    # Tile pyramids and grids use the region-less settings, compiled under region None.
+    regionless = tiles or args.export_grids
+    render_configs = compile_render_configs(yaml_cfg, regions + [None] if regionless else regions, params)
+
+    maps_root = Path(args.assets_dir) / "maps" / args.dataset
+    manifest = RenderManifest(maps_root)
+    bundles = BundleCollector(maps_root, budget=memory_budget()) if args.bundles and maps else None
+    datasource = params_load.get("source", args.dataset)
+
+    def output_file(task):
+        if task.kind == "tiles":
+            # Written last by render_tile_pyramid, once the pyramid is complete.
+            return str(Path(task.outfile) / TILES_META)
+        fileformat = render_configs[(task.region, task.param)].settings.get("fileformat")
+        return f"{task.outfile}.{fileformat}"
+
+    def tasks_for_hour(t, tforecast, source, input_key, time_index=None):
+        """Tasks for hour ``t`` whose outputs are missing or out of date."""
+        targets = [(region, "map") for region in regions] if maps else []
+        if tiles:
+            targets.append((None, "tiles"))
+        skipped = 0
+        for region, kind in targets:
+            for param in params:
+                if param not in yaml_params:
+                    continue
+                if kind == "tiles":
+                    outfile = maps_root / "tiles" / param / f"{t:03d}"
+                else:
+                    outfile = maps_root / region / f"{param}_{t:03d}"
+                key = render_key(
+                    input_key,
+                    render_configs[(region, param)],
+                    baserun=baserun,
+                    forecast_hour=t,
+                    time_value=tforecast,
+                    datasource=datasource,
+                )
+                task = RenderTask(
+                    source=source,
+                    dataset=args.dataset,
+                    region=region,
+                    param=param,
+                    forecast_hour=t,
+                    outfile=str(outfile),
+                    baserun=baserun,
+                    datasource=datasource,
+                    time_index=time_index,
+                    time_value=tforecast,
+                    key=key,
+                    kind=kind,
+                    bundle=bundles is not None and kind == "map",
+                )
+                if not args.force and manifest.is_current(output_file(task), key):
+                    skipped += 1
+                    if task.bundle:
+                        bundles.unchanged(region, param, render_configs[(region, param)].settings.get("fileformat"))
+                    continue
+                yield task
+        if skipped:
+            print(f"[INFO] t+{t:03d}h: {skipped} outputs unchanged, skipped")
+
+    def export_grids(t, tforecast, ds, input_key):
+        """Quantized grids of hour ``t``; cheap (no matplotlib), so written inline."""
+        written, size = 0, 0
+        for param in params:
+            if param not in yaml_params:
+                continue
+            render = render_configs[(None, param)]
+            path = maps_root / "grid" / f"{param}_{t:03d}.bin"
+            key = render_key(input_key, render, baserun=baserun, forecast_hour=t, time_value=tforecast, output="grid")
+            if not args.force and manifest.is_current(path, key):
+                continue
+            meta = {
+                "cycle": args.cycle,
+                "forecast_hour": t,
+                "valid_time": tforecast.isoformat(),
+                "source": datasource,
+            }
+            with metrics.span("export_grid", param=param, hour=t) as span:
+                span["bytes"] = export_grid(ds, args.dataset, param, path, render.settings, meta=meta)
+            size += span["bytes"]
+            manifest.record(path, key)
+            written += 1
+        if written:
+            manifest.save()
+            print(f"[INFO] t+{t:03d}h: wrote {written} grids ({size / 1024:.0f} KiB)")
+
+    def add_frame(task, frame):
+        if bundles is not None and frame is not None:
+            fileformat = render_configs[(task.region, task.param)].settings.get("fileformat")
+            bundles.add(task.region, task.param, task.forecast_hour, frame, fileformat)
+
+    def write_bundles():
+        if bundles is None:
+            return
+        if args.dataset == "gfswave":
+            from plotter.core.grib_loader import gfswave_forecast_hours
+
+            # The hours the downloader fetches: hourly to t+120h, then 3-hourly.
+            hours = gfswave_forecast_hours(max_t)
+        else:
+            hours = range(max_t)
+        bundles.write(hours, meta={"dataset": args.dataset, "cycle": args.cycle})
+
+    def record(result):
+        _report(result)
+        if result.ok:
+            manifest.record(output_file(result.task), result.task.key)
+            add_frame(result.task, result.frame)
+
+    def render_inline(tasks, ds):
+        # Maps are encoded and written while the next one renders; only those
+        # whose write completed are recorded in the manifest.
+        encoder = default_encoder()
+        rendered, errors = [], {}
+        try:
+            for task in tasks:
+                rendered.append((task, _render_inline(task, ds, render_configs, encoder)))
+        finally:
+            errors = encoder.flush()
+            for task, written in rendered:
+                if output_file(task) not in errors:
+                    manifest.record(output_file(task), task.key)
+                    add_frame(task, written.result() if written is not None else None)
+            manifest.save()
+        for fname, error in errors.items():
+            print(f"[ERROR] Failed to write {fname}: {error}")
+        if errors:
+            raise next(iter(errors.values()))
+
+    def release_hour(source):
+        Path(source).unlink(missing_ok=True)
+        manifest.save()
 
     if args.dataset == "gfswave":
-        from plotter.core.grib_loader import load_gfswave_forecast
-
-        for t in range(max_t):
-            try:
-                ds = load_gfswave_forecast(args.cycle, t)
-            except Exception as exc:
-                print(f"[WARN] No data at t+{t:03d}h, stopping: {exc}")
-                break
-
-            tforecast = pd.Timestamp(ds["time"].values[0])
-
-            for region in regions:
-                for param in params:
-                    if param not in yaml_params:
-                        continue
-
-                    print(f"[INFO] Plotting {param} for region {region} at t+{t:03d}h")
-
-                    cfg = PlotConfig(
-                        dataset=args.dataset,
-                        region=region,
-                        time_index=None,
-                        time_value=pd.Timestamp(tforecast),
-                        forecast_hour=t,
-                        **yaml_defaults,
-                        **yaml_params[param],
+        from plotter.core import grib_loader
+        from plotter.core.cycle_store import CycleStore
+        from plotter.core.grib_loader import iter_gfswave_cycle
+
+        if args.cache_budget:
+            grib_loader.CACHE_BUDGET = parse_size(args.cache_budget)
+
+        fetch_params = [p for p in params if p in yaml_params] if args.fetch == "range" else None
+        crop_bbox = None if args.no_crop else regions_bbox(regions, yaml_cfg, margin=args.crop_margin)
+        if crop_bbox is not None:
+            print(f"[INFO] Cropping GFS Wave grid to {crop_bbox}")
+
+        def render_hours(hours):
+            """Render ``(hour, dataset)`` pairs; returns the pool results (none inline)."""
+            if args.workers > 1:
+                # Each hour is decoded once here and handed to the workers as a
+                # NetCDF file, which every worker opens once and reuses.
+                workdir = Path(tempfile.mkdtemp(prefix="nusawave_hours_"))
+
+                def pool_tasks():
+                    for t, ds in hours:
+                        source = workdir / f"f{t:03d}.nc"
+                        tforecast = pd.Timestamp(ds["time"].values[0])
+                        if args.export_grids:
+                            export_grids(t, tforecast, ds, input_digest(ds))
+                        tasks = list(tasks_for_hour(t, tforecast, str(source), input_digest(ds)))
+                        if tasks:
+                            ds.to_netcdf(source)
+                            yield from tasks
+
+                try:
+                    # Decode at most two hours past the oldest one still rendering.
+                    return run_render_tasks(
+                        pool_tasks(), args.workers, on_result=record, on_source_done=release_hour,
+                        max_sources=2,
                     )
-
-                    cfg.outfile = str(maps_root / region / f"{param}_{t:03d}")
-                    cfg.baserun = baserun
-                    cfg.datasource = params_load.get("source", args.dataset)
-
-                    plotter = Plotter(cfg)
-                    plotter.plot_map(ds, param)
+                finally:
+                    shutil.rmtree(workdir, ignore_errors=True)
+                    manifest.save()
+
+            for t, ds in hours:
+                tforecast = pd.Timestamp(ds["time"].values[0])
+                if args.export_grids:
+                    export_grids(t, tforecast, ds, input_digest(ds))
+                render_inline(tasks_for_hour(t, tforecast, "", input_digest(ds)), ds)
+            return []
+
+        download = dict(
+            params=fetch_params,
+            workers=args.download_workers,
+            host_limit=args.host_connections,
+            bbox=crop_bbox,
+            store=None if args.no_store else CycleStore.for_cycle(args.cycle, crop_bbox),
+        )
+        if args.watch:
+            from plotter.core.watcher import watch_gfswave_cycle
+
+            results = []
+            batches = watch_gfswave_cycle(
+                args.cycle,
+                max_t,
+                poll=args.poll_interval,
+                max_poll=args.max_poll_interval,
+                give_up=args.watch_timeout,
+                **download,
+            )
+            for batch in batches:
+                results += render_hours(batch)
+                write_bundles()
+                try:
+                    _write_frontend_config(args.dataset, args.cycle, max_t, Path(args.assets_dir))
+                except Exception as exc:
+                    # The next batch rewrites it; a stale config beats a dead watcher.
+                    print(f"[WARN] Could not update the frontend config: {exc}")
+        else:
+            results = render_hours(iter_gfswave_cycle(args.cycle, max_t, **download))
+            write_bundles()
+        _report_downloads()
+        if args.workers > 1:
+            _summarize(results)
         return
 
     import xarray as xr
@@ -120,31 +504,50 @@ def main():
     max_t = min(max_t, ds.dims["time"])
     time_dim = params_load.get("time", "time")
 
-    for region in regions:
-        for t in range(max_t):
-            tforecast = pd.to_datetime(ds.isel({time_dim: t})["time"].values)
-            for param in params:
-                if param not in yaml_params:
-                    continue
-
-                print(f"[INFO] Plotting {param} for region {region} at t+{t:03d}h")
+    def hour_tasks(t):
+        # OPeNDAP cycle URLs are immutable once published, so the URL and
+        # valid time identify the input without fetching the data.
+        tforecast = pd.to_datetime(ds.isel({time_dim: t})["time"].values)
+        return tasks_for_hour(t, tforecast, url, f"{url}@{tforecast.isoformat()}", time_index=t)
+
+    if args.workers > 1:
+        tasks = (task for t in range(max_t) for task in hour_tasks(t))
+        try:
+            results = run_render_tasks(tasks, args.workers, on_result=record)
+        finally:
+            manifest.save()
+        write_bundles()
+        _summarize(results)
+        return
 
-                cfg = PlotConfig(
-                    dataset=args.dataset,
-                    region=region,
-                    time_index=t,
-                    time_value=tforecast,
-                    forecast_hour=t,
-                    **yaml_defaults,
-                    **yaml_params[param],
-                )
+    for t in range(max_t):
+        render_inline(hour_tasks(t), ds)
+    write_bundles()
 
-                cfg.outfile = str(maps_root / region / f"{param}_{t:03d}")
-                cfg.baserun = baserun
-                cfg.datasource = params_load.get("source", args.dataset)
 
-                plotter = Plotter(cfg)
-                plotter.plot_map(ds, param)
+def main():
+    args = parse_args()
+    metrics_file = args.metrics
+    if args.prometheus and not metrics_file:
+        fd, metrics_file = tempfile.mkstemp(prefix="nusawave_metrics_", suffix=".jsonl")
+        os.close(fd)
+    # Before any pool exists, so every worker inherits the metrics file.
+    run_id = metrics.configure(metrics_file) if metrics_file else None
+    try:
+        with metrics.span("run", dataset=args.dataset, region=args.region) as span:
+            try:
+                run(args)
+            finally:
+                span["cycle"] = args.cycle  # resolved by run() for --cycle latest
+    finally:
+        if args.prometheus:
+            spans = metrics.read_spans(metrics_file, run_id)
+            metrics.write_prometheus(args.prometheus, spans, {"dataset": args.dataset, "cycle": args.cycle})
+            print(f"[INFO] Metrics summary saved at {args.prometheus}")
+            if not args.metrics:
+                Path(metrics_file).unlink(missing_ok=True)
+        if args.metrics:
+            print(f"[INFO] Timing spans appended to {args.metrics} (run {run_id})")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,12 @@
+import pytest
+
+from plotter.core import grib_loader
+from plotter.testing.fake_nomads import FakeNomadsServer
+
+
+@pytest.fixture
+def nomads(tmp_path, monkeypatch):
+    with FakeNomadsServer(tmp_path / "www") as server:
+        monkeypatch.setattr(grib_loader, "NOMADS_GFSWAVE_BASE", server.base_url)
+        monkeypatch.setattr(grib_loader, "CACHE_DIR", tmp_path / "cache")
+        yield server
@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from plotter.core.utils import load_model_params
+from plotter.testing.synthetic import synthetic_dataset
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+
+import bench_stages  # noqa: E402
+
+
+def test_synthetic_dataset_matches_variable_map():
+    ds = synthetic_dataset([95, 105, 0, 6], step=0.5, hours=2)
+    names = {n for v in load_model_params("gfswave").values() if isinstance(v, dict) for n in v.values()}
+    assert set(ds.data_vars) == names
+    assert ds["htsgwsfc"].shape == (2, 13, 21) and ds["htsgwsfc"].dtype == np.float32
+    assert ds.lat.values[0] > ds.lat.values[-1]
+
+
+def test_stage_benchmark_and_compare():
+    result = bench_stages.benchmark(["malacca_strait"], ["swh"], repeat=1, warmup=0, step=1.0, log=lambda _: None)
+    stages = result["results"]["malacca_strait/swh"]
+    assert set(stages) == set(bench_stages.STAGES)
+    assert stages["contourf"]["median"] > 0 and stages["savefig"]["median"] > 0
+    assert result["meta"]["grid"]["step"] == 1.0
+
+    assert bench_stages.compare(result, result) == []
+    faster = {"results": {"malacca_strait/swh": {s: {"median": t["median"] / 2} for s, t in stages.items()}}}
+    slower = [stage for _, stage, _, _ in bench_stages.compare(result, faster, floor=0.0)]
+    assert "savefig" in slower
+
+
+def test_fake_nomads_latency_and_bandwidth(tmp_path):
+    import time
+
+    from plotter.core import grib_loader
+    from plotter.core.http_client import HttpClient
+    from plotter.testing.fake_nomads import FakeNomadsServer
+
+    with FakeNomadsServer(tmp_path, latency=0.2, bandwidth=200_000) as server:
+        path = server.publish("2026010100", 0)
+        url = server.base_url + grib_loader.gfswave_grib_url("2026010100", 0)[len(grib_loader.NOMADS_GFSWAVE_BASE):]
+        start = time.perf_counter()
+        body = HttpClient().get(url, {"Range": "bytes=0-99999"}).body
+        elapsed = time.perf_counter() - start
+    assert body == path.read_bytes()[:100000]
+    assert 0.6 < elapsed < 3.0
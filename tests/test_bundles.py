@@ -0,0 +1,59 @@
+from plotter.core.bundles import BundleCollector, bundle_path, read_bundle, write_bundle
+
+
+def test_bundle_round_trip(tmp_path):
+    frames = {3: b"RIFF-three", 0: b"RIFF-zero-frame", 1: b""}
+    path = tmp_path / "malacca_strait" / "swh.bundle"
+    size = write_bundle(path, frames, meta={"cycle": "2026010100"})
+
+    header, read = read_bundle(path)
+    assert read == frames
+    assert [f["hour"] for f in header["frames"]] == [0, 1, 3]
+    assert header["cycle"] == "2026010100" and header["format"] == "webp"
+    assert size == path.stat().st_size and (size - sum(map(len, frames.values()))) % 4 == 0
+
+
+def test_collector_fills_skipped_hours_from_disk(tmp_path):
+    region_dir = tmp_path / "malacca_strait"
+    region_dir.mkdir()
+    (region_dir / "swh_000.webp").write_bytes(b"old-000")
+    (region_dir / "swh_001.webp").write_bytes(b"stale-001")
+    (region_dir / "swh_009.webp").write_bytes(b"past-max-hours")
+
+    bundles = BundleCollector(tmp_path)
+    bundles.add("malacca_strait", "swh", 1, b"new-001")
+    bundles.add("malacca_strait", "swh", 2, b"new-002")
+    assert bundles.write(range(4), meta={"cycle": "2026010100"}) == 1
+
+    header, frames = read_bundle(bundle_path(tmp_path, "malacca_strait", "swh"))
+    assert frames == {0: b"old-000", 1: b"new-001", 2: b"new-002"}
+    assert header["region"] == "malacca_strait" and header["param"] == "swh"
+    # Nothing new since: no rewrite.
+    assert bundles.write(range(4)) == 0
+
+
+def test_unchanged_maps_still_get_a_bundle(tmp_path):
+    (tmp_path / "malacca_strait").mkdir()
+    (tmp_path / "malacca_strait" / "wind_000.webp").write_bytes(b"kept")
+    bundles = BundleCollector(tmp_path)
+    bundles.unchanged("malacca_strait", "wind")
+    assert bundles.write(range(2)) == 1
+    assert read_bundle(bundle_path(tmp_path, "malacca_strait", "wind"))[1] == {0: b"kept"}
+    bundles.unchanged("malacca_strait", "wind")
+    assert bundles.write(range(2)) == 0
+
+
+def test_frames_past_the_budget_are_read_back_from_their_files(tmp_path):
+    region_dir = tmp_path / "malacca_strait"
+    region_dir.mkdir()
+    bundles = BundleCollector(tmp_path, budget=10)
+    for hour in range(3):
+        data = f"frame-{hour:03d}".encode()
+        (region_dir / f"swh_{hour:03d}.webp").write_bytes(data)
+        bundles.add("malacca_strait", "swh", hour, data)
+    assert [d is not None for d in bundles._frames[("malacca_strait", "swh")].values()] == [True, False, False]
+
+    assert bundles.write(range(3)) == 1
+    _, frames = read_bundle(bundle_path(tmp_path, "malacca_strait", "swh"))
+    assert frames == {h: f"frame-{h:03d}".encode() for h in range(3)}
+    assert bundles._held == 0
@@ -0,0 +1,82 @@
+import cartopy.crs as ccrs
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import xarray as xr
+
+from plotter.core import contour_cache
+from plotter.core.contour_cache import filled_contours, shared_contourf
+from plotter.core.mesh_cache import projected_mesh
+
+LEVELS = [0.0, 0.5, 1.0, 1.5, 2.0]
+
+
+def _field():
+    lon = np.arange(100.0, 110.25, 0.25)
+    lat = np.arange(-10.0, 0.25, 0.25)
+    z = np.sin(np.radians(lon))[None, :] + np.cos(np.radians(lat * 9))[:, None]
+    z[5, 5] = np.nan
+    return xr.DataArray(z, coords={"lat": lat, "lon": lon}, dims=("lat", "lon"))
+
+
+def test_shared_contourf_matches_contourf():
+    field = _field()
+    fig = plt.figure()
+    ax = fig.add_subplot(projection=ccrs.Mercator())
+    mesh = projected_mesh(field.lon.values, field.lat.values, ax.projection)
+    expected = ax.contourf(mesh.x, mesh.y, field.values, levels=LEVELS, extend="max", transform=ax.projection)
+    shared = shared_contourf(ax, field, "viridis", None, LEVELS, "max")
+    plt.close(fig)
+
+    assert len(shared.get_paths()) == len(expected.get_paths())
+    for got, want in zip(shared.get_paths(), expected.get_paths()):
+        np.testing.assert_array_equal(got.vertices, want.vertices)
+        np.testing.assert_array_equal(got.codes, want.codes)
+    np.testing.assert_array_equal(shared.layers, expected.layers)
+
+
+def test_filled_contours_are_reused():
+    field = _field()
+    mesh = projected_mesh(field.lon.values, field.lat.values, ccrs.PlateCarree())
+    contour_cache._contours.clear()
+    key = (mesh.key, "swh", 6)
+    first = filled_contours(mesh.x, mesh.y, field.values, LEVELS, None, key=key)
+    assert filled_contours(mesh.x, mesh.y, field.values, LEVELS, None, key=key) is first
+    assert filled_contours(mesh.x, mesh.y, field.values, LEVELS, "both", key=key) is not first
+    assert filled_contours(mesh.x, mesh.y, field.values, LEVELS, None, key=(mesh.key, "swh", 7)) is not first
+    assert filled_contours(mesh.x, mesh.y, field.values, LEVELS, None) is not first
+    assert len(contour_cache._contours) == 3
+
+
+def test_handler_domain_is_computed_on_demand():
+    from plotter.core.plot_config import PlotConfig
+    from plotter.handlers.wind import WindHandler
+    from plotter.testing.synthetic import synthetic_dataset
+
+    ds = synthetic_dataset([95, 105, 0, 8], step=0.5, hours=2)
+    handler = WindHandler(PlotConfig(dataset="gfswave", time_index=1, bbox=[98, 100, 2, 4]))
+    u, v = handler.load(ds)
+    assert callable(handler._domain) and handler.domain_key is None
+    speed = handler.domain
+    assert speed.shape == (ds.sizes["lat"], ds.sizes["lon"])
+    np.testing.assert_allclose(speed.sel(lat=u.lat, lon=u.lon), np.hypot(u, v), rtol=1e-6)
+
+
+def test_shared_contours_render_the_same_map():
+    from plotter.core.plotter import Plotter
+    from plotter.core.render_config import compile_render_configs, plot_config_for
+    from plotter.testing.synthetic import synthetic_dataset
+
+    ds = synthetic_dataset([95, 105, 0, 6], step=0.25)
+    render = compile_render_configs(None, ["malacca_strait"], ["swh"])[("malacca_strait", "swh")]
+    images = []
+    for shared in (False, True):
+        config = plot_config_for(
+            render, dataset="gfswave", time_index=0, time_value=None, forecast_hour=0,
+            outfile=None, baserun="2026-01-01T00", datasource="NOAA GFS Wave",
+        )
+        config.sharedcontours = shared
+        images.append(np.asarray(Plotter(config).plot_map(ds, "swh")))
+    np.testing.assert_array_equal(images[0], images[1])
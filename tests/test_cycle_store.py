@@ -0,0 +1,99 @@
+import netCDF4
+import numpy as np
+import pytest
+
+from plotter.core import grib_loader
+from plotter.core.cycle_store import MEMORY_BUDGET_ENV, CycleStore, hour_nbytes, time_blocks
+from plotter.core.stations import Site, extract_sites
+from plotter.core.manifest import INPUT_DIGEST_ATTR
+
+CYCLE = "2026010100"
+BBOX = [100, 110, -5, 5]
+
+
+def test_cycle_is_stored_once_and_opened_lazily(nomads):
+    for hour in range(3):
+        nomads.publish(CYCLE, hour)
+    ds = grib_loader.load_gfswave_cycle(CYCLE, 3, params=["swh"], bbox=BBOX)
+    assert ds.forecast_hour.values.tolist() == [0, 1, 2]
+    assert ds["htsgwsfc"].dtype == np.float32
+    assert ds["htsgwsfc"].variable._in_memory is False
+
+    store = CycleStore.for_cycle(CYCLE, BBOX)
+    assert store.hours() == [0, 1, 2]
+    decoded = grib_loader.load_gfswave_forecast(CYCLE, 1, params=["swh"], bbox=BBOX)
+
+    served = len(nomads.requests)
+    hours = list(grib_loader.iter_gfswave_cycle(CYCLE, 3, params=["swh"], bbox=BBOX, store=store))
+    assert len(nomads.requests) == served
+    t, again = hours[1]
+    assert t == 1
+    np.testing.assert_allclose(again["htsgwsfc"].values, decoded["htsgwsfc"].values, rtol=1e-6)
+    assert again.attrs[INPUT_DIGEST_ATTR] == decoded.attrs[INPUT_DIGEST_ATTR]
+
+
+def test_store_grows_when_a_later_run_needs_more_params(nomads):
+    for hour in range(2):
+        nomads.publish(CYCLE, hour)
+    store = CycleStore.for_cycle(CYCLE, BBOX)
+    list(grib_loader.iter_gfswave_cycle(CYCLE, 2, params=["swh"], bbox=BBOX, store=store))
+    wind = grib_loader.gfswave_variables(["wind"])
+    assert store.has(1, {"htsgwsfc"}) and not store.has(1, wind)
+    assert set(store.hour(1).data_vars) == {"htsgwsfc", "dirpwsfc"}
+
+    hours = list(grib_loader.iter_gfswave_cycle(CYCLE, 2, params=["swh", "wind"], bbox=BBOX, store=store))
+    assert [t for t, _ in hours] == [0, 1]
+    assert store.has(1, wind | {"htsgwsfc"})
+    stored = store.hour(1)
+    np.testing.assert_allclose(stored["ugrdsfc"].values, hours[1][1]["ugrdsfc"].values, rtol=1e-6)
+    np.testing.assert_allclose(stored["htsgwsfc"].values, hours[1][1]["htsgwsfc"].values, rtol=1e-6)
+    assert store.hours() == [0, 1]
+
+    served = len(nomads.requests)
+    list(grib_loader.iter_gfswave_cycle(CYCLE, 2, params=["wind"], bbox=BBOX, store=store))
+    assert len(nomads.requests) == served
+
+
+def test_series_layout_and_hour_order(nomads, tmp_path):
+    for hour in range(2):
+        nomads.publish(CYCLE, hour)
+    store = CycleStore(tmp_path / "series.nc", layout="series")
+    for hour in (1, 0):
+        store.append(hour, grib_loader.load_gfswave_forecast(CYCLE, hour, params=["swh"], bbox=BBOX))
+    store.append(0, grib_loader.load_gfswave_forecast(CYCLE, 0, params=["swh"], bbox=BBOX))
+
+    with netCDF4.Dataset(store.path) as nc:
+        assert nc["htsgwsfc"].chunking() == [64, 16, 16]
+    ds = store.open()
+    assert ds.forecast_hour.values.tolist() == [0, 1]
+    assert (np.diff(ds.time.values) > np.timedelta64(0)).all()
+
+    with pytest.raises(ValueError):
+        CycleStore(tmp_path / "x.nc", layout="columns")
+
+
+def test_output_schedule_reaches_384_hours():
+    hours = grib_loader.gfswave_forecast_hours(385)
+    assert len(hours) == 209
+    assert hours[119:123] == [119, 120, 123, 126] and hours[-1] == 384
+    assert grib_loader.gfswave_forecast_hours(3) == [0, 1, 2]
+    assert grib_loader.gfswave_forecast_hours(125)[-2:] == [120, 123]
+
+
+def test_reads_stay_within_the_memory_budget(nomads, monkeypatch):
+    for hour in range(4):
+        nomads.publish(CYCLE, hour)
+    ds = grib_loader.load_gfswave_cycle(CYCLE, 4, params=["swh"], bbox=BBOX)
+    one_hour = hour_nbytes(ds)
+    assert [(b.start, b.stop) for b in time_blocks(ds, budget=int(one_hour * 2.5))] == [(0, 2), (2, 4)]
+
+    sites = [Site("a", 1.3, 103.2), Site("b", -2.0, 107.9)]
+    whole = extract_sites(ds, sites, params=["swh"])
+    monkeypatch.setenv(MEMORY_BUDGET_ENV, str(one_hour))
+    blocked = extract_sites(ds, sites, params=["swh"])
+    np.testing.assert_array_equal(blocked.swh.values, whole.swh.values)
+
+    store = CycleStore.for_cycle(CYCLE, BBOX)
+    with pytest.raises(RuntimeError):
+        store.open(load=True)
+    assert store.open([0], load=True)["htsgwsfc"].variable._in_memory
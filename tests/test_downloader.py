@@ -0,0 +1,56 @@
+import threading
+import time
+from urllib.error import HTTPError
+
+from plotter.core import downloader
+
+
+def _not_found(hour):
+    return HTTPError(f"http://example/f{hour:03d}", 404, "Not Found", None, None)
+
+
+def test_fetch_hours_in_order_and_stops_at_first_missing():
+    def fetch(hour):
+        if hour == 3:
+            raise _not_found(hour)
+        time.sleep(0.01 * (5 - hour))
+        return hour * 10
+
+    results = list(downloader.fetch_hours(fetch, range(6), url_for=lambda h: "http://a/x", workers=4))
+    assert results == [(0, 0), (1, 10), (2, 20)]
+
+
+def test_fetch_hours_retries_transient_errors():
+    calls = {}
+
+    def fetch(hour):
+        calls[hour] = calls.get(hour, 0) + 1
+        if calls[hour] < 3:
+            raise HTTPError("http://a/x", 503, "Busy", None, None)
+        return hour
+
+    results = list(
+        downloader.fetch_hours(fetch, range(2), url_for=lambda h: "http://a/x", retries=3, backoff=0)
+    )
+    assert results == [(0, 0), (1, 1)]
+    assert calls == {0: 3, 1: 3}
+
+
+def test_fetch_hours_respects_host_limit():
+    lock = threading.Lock()
+    active = {"now": 0, "peak": 0}
+
+    def fetch(hour):
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.02)
+        with lock:
+            active["now"] -= 1
+        return hour
+
+    results = list(
+        downloader.fetch_hours(fetch, range(8), url_for=lambda h: "http://a/x", workers=6, host_limit=2)
+    )
+    assert [h for h, _ in results] == list(range(8))
+    assert active["peak"] == 2
@@ -0,0 +1,71 @@
+import threading
+
+import numpy as np
+from PIL import Image
+
+from plotter.core import encoder
+from plotter.core.encoder import ImageEncoder, encode_options
+from plotter.core.plotter import Plotter
+from plotter.core.render_config import compile_render_configs, plot_config_for
+from plotter.testing.synthetic import synthetic_dataset
+
+
+def _frame(value):
+    image = np.full((60, 80, 4), value, dtype=np.uint8)
+    image[..., 3] = 255
+    return image
+
+
+def test_encoder_writes_atomically_and_reports_failures(tmp_path):
+    pool = ImageEncoder(workers=2, max_pending=2)
+    for i in range(4):
+        pool.submit(_frame(40 * i), tmp_path / f"swh_{i:03d}.webp", "webp", options=encode_options("webp"))
+    (tmp_path / "blocked").write_text("not a directory")
+    pool.submit(_frame(0), tmp_path / "blocked" / "swh_000.webp", "webp")
+
+    errors = pool.flush()
+    assert list(errors) == [str(tmp_path / "blocked" / "swh_000.webp")]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["blocked"] + [f"swh_{i:03d}.webp" for i in range(4)]
+    with Image.open(tmp_path / "swh_003.webp") as im:
+        assert im.size == (80, 60)
+    assert pool.flush() == {}
+    pool.close()
+
+
+def test_submit_blocks_when_encoders_fall_behind(tmp_path, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(encoder, "write_image", lambda *args: release.wait(5))
+    pool = ImageEncoder(workers=1, max_pending=2)
+    pool.submit(_frame(0), tmp_path / "a.webp", "webp")
+    pool.submit(_frame(0), tmp_path / "b.webp", "webp")
+
+    third = threading.Thread(target=pool.submit, args=(_frame(0), tmp_path / "c.webp", "webp"))
+    third.start()
+    third.join(0.2)
+    assert third.is_alive()
+    release.set()
+    third.join(5)
+    assert not third.is_alive()
+    assert pool.flush() == {}
+    pool.close()
+
+
+def test_background_write_matches_inline(tmp_path):
+    ds = synthetic_dataset([95, 105, 0, 8], step=0.5)
+    render = compile_render_configs(None, ["malacca_strait"], ["swh"])[("malacca_strait", "swh")]
+
+    def plot(outfile, pool=None):
+        config = plot_config_for(
+            render, dataset="gfswave", time_index=0, time_value=None, forecast_hour=0,
+            outfile=str(outfile), baserun="2026-01-01T00", datasource="NOAA GFS Wave",
+        )
+        config.layercache_dir = str(tmp_path / "layers")
+        Plotter(config, encoder=pool).plot_map(ds, "swh")
+
+    plot(tmp_path / "inline" / "swh_000")
+    pool = ImageEncoder()
+    plot(tmp_path / "queued" / "swh_000", pool)
+    assert pool.flush() == {}
+    inline = (tmp_path / "inline" / "swh_000.webp").read_bytes()
+    assert inline == (tmp_path / "queued" / "swh_000.webp").read_bytes()
+    assert not list(tmp_path.rglob("*.part"))
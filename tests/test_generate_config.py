@@ -0,0 +1,33 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import generate_config  # noqa: E402
+
+
+def test_write_config_from_maps_root(tmp_path, capsys):
+    region = tmp_path / "maps" / "gfswave" / "malacca_strait"
+    region.mkdir(parents=True)
+    for param in ("wind", "swh", "swell"):
+        for hour in (0, 1):
+            (region / f"{param}_{hour:03d}.webp").write_bytes(b"RIFF")
+    (region / "swh_002.webp").write_bytes(b"RIFF")
+
+    out = tmp_path / "config" / "config.json"
+    generate_config.write_config("gfswave", "2026010100", 3, output=out, maps_root=tmp_path / "maps")
+
+    config = json.loads(out.read_text())
+    meta = config["regions"]["malacca_strait"]["forecast_types"]["Wind and Waves"]
+    assert meta["timestamps"] == ["F000", "F001"]
+    assert meta["parameters"]["swh"] == ["F000", "F001", "F002"]
+    assert config["cycle"] == "2026010100"
+    assert f"[INFO] Wrote {out}" in capsys.readouterr().out
+    assert [p.name for p in out.parent.iterdir()] == ["config.json"]
+
+
+def test_canonical_hours_follow_the_output_schedule():
+    hours = generate_config.canonical_hours(130)
+    assert hours[119:] == ["119", "120", "123", "126", "129"]
+    assert generate_config.canonical_hours(5, dataset="hycom") == ["000", "001", "002", "003", "004"]
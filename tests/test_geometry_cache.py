@@ -0,0 +1,43 @@
+import shapefile
+from shapely.geometry import box, mapping
+
+from plotter.core import geometry_cache
+
+
+def test_feature_resolution_by_region_size():
+    assert geometry_cache.feature_resolution([95, 105, 0, 6]) == "10m"
+    assert geometry_cache.feature_resolution([90, 141, -13, 6]) == "50m"
+    assert geometry_cache.feature_resolution([0, 360, -90, 90]) == "110m"
+
+
+def test_region_geometries_clipped_projected_and_cached(tmp_path, monkeypatch):
+    shp = tmp_path / "ne" / "feature"
+    shp.parent.mkdir()
+    with shapefile.Writer(str(shp)) as w:
+        w.field("name", "C")
+        w.shape(mapping(box(80, -30, 160, 30)))
+        w.record("big")
+        w.shape(mapping(box(-10, -5, 0, 5)))
+        w.record("outside")
+
+    reads = []
+
+    def fake_natural_earth(resolution, category, name):
+        reads.append((resolution, category, name))
+        return str(shp) + ".shp"
+
+    monkeypatch.setattr(geometry_cache.shapereader, "natural_earth", fake_natural_earth)
+    monkeypatch.setattr(geometry_cache, "_memory", {})
+    bbox = [100, 110, -5, 5]
+    geoms = geometry_cache.region_geometries("test", bbox, "mercator", cache_dir=tmp_path / "cache")
+
+    assert len(geoms["land"]) == 1
+    minx, miny, maxx, maxy = geoms["land"][0].bounds
+    # Mercator metres, clipped to bbox + 1 degree margin.
+    assert 11.0e6 < minx < 11.05e6 and 12.3e6 < maxx < 12.4e6
+    assert len(reads) == 3
+
+    monkeypatch.setattr(geometry_cache, "_memory", {})
+    again = geometry_cache.region_geometries("test", bbox, "mercator", cache_dir=tmp_path / "cache")
+    assert len(reads) == 3
+    assert again["land"][0].equals(geoms["land"][0])
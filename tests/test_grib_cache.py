@@ -0,0 +1,75 @@
+import os
+import time
+
+import pytest
+
+from plotter.core import grib_cache, grib_loader
+
+CYCLE = "2026010100"
+
+
+def test_parse_size():
+    assert grib_cache.parse_size("500M") == 500 * 1024 ** 2
+    assert grib_cache.parse_size("1.5g") == int(1.5 * 1024 ** 3)
+    assert grib_cache.parse_size(2048) == 2048
+    with pytest.raises(ValueError):
+        grib_cache.parse_size("lots")
+
+
+def test_truncated_files_are_never_served(nomads):
+    nomads.publish(CYCLE, 0)
+    grib_loader.load_gfswave_forecast(CYCLE, 0)
+    cached = grib_loader.CACHE_DIR / CYCLE / "f000.grib2"
+    assert grib_cache.verify_grib(cached) == 19
+
+    # A file cut short by an earlier, killed run is dropped and fetched again.
+    data = cached.read_bytes()
+    cached.write_bytes(data[: len(data) // 2])
+    served = len(nomads.requests)
+    grib_loader.load_gfswave_forecast(CYCLE, 0)
+    assert len(nomads.requests) > served
+    assert cached.read_bytes() == data
+
+    # A garbled transfer fails the .idx check and leaves nothing in the cache.
+    served_file = nomads.publish(CYCLE, 1)
+    swell = grib_loader.parse_idx((served_file.parent / (served_file.name + ".idx")).read_text())[8]
+    garbled = bytearray(served_file.read_bytes())
+    garbled[swell["offset"]:swell["offset"] + 4] = b"XXXX"
+    served_file.write_bytes(bytes(garbled))
+    for params in (None, ["swell"]):
+        with pytest.raises(grib_cache.CorruptGribError):
+            grib_loader.download_gfswave_forecast(CYCLE, 1, params=params)
+    assert sorted(p.name for p in (grib_loader.CACHE_DIR / CYCLE).glob("f001*")) == []
+
+
+def test_prune_evicts_least_recently_used_cycles(tmp_path):
+    now = time.time()
+    for age, cycle in enumerate(["2026010118", "2026010112", "2026010106", "2026010100"]):
+        grib_cache.touch_cycle(tmp_path / cycle)
+        (tmp_path / cycle / "f000.grib2").write_bytes(b"x" * 1000)
+        os.utime(tmp_path / cycle / grib_cache.LAST_USED, (now - age * 3600, now - age * 3600))
+    stale = tmp_path / "2026010118" / "f001.grib2.abc.part"
+    stale.write_bytes(b"x")
+    os.utime(stale, (now - 3600, now - 3600))
+    stale_dir = tmp_path / "2026010118" / "tiles.abc.part"
+    (stale_dir / "1").mkdir(parents=True)
+    (stale_dir / "1" / "0.png").write_bytes(b"x")
+    os.utime(stale_dir, (now - 3600, now - 3600))
+
+    evicted = grib_cache.prune(tmp_path, 2000, keep={"2026010100"})
+    assert evicted == ["2026010106", "2026010112"]
+    assert [c for c, _, _ in grib_cache.cache_usage(tmp_path)] == ["2026010100", "2026010118"]
+    assert not stale.exists() and not stale_dir.exists()
+    # Recently used cycles are left for the run that is using them.
+    assert grib_cache.prune(tmp_path, 0) == ["2026010100"]
+
+
+def test_concurrent_atomic_writers_do_not_share_a_part_file(tmp_path):
+    dest = tmp_path / "out" / "tiles.json"
+    with grib_cache.atomic_file(dest) as first, grib_cache.atomic_file(dest) as second:
+        assert first != second
+        first.write_text("first")
+        second.write_text("second")
+    assert dest.read_text() == "first"
+    assert oct(dest.stat().st_mode & 0o777) == oct(0o666 & ~grib_cache._UMASK)
+    assert [p.name for p in dest.parent.iterdir()] == ["tiles.json"]
@@ -0,0 +1,159 @@
+import pytest
+
+from plotter.core import grib_loader
+from plotter.core.manifest import INPUT_DIGEST_ATTR
+
+CYCLE = "2026010100"
+
+IDX = """\
+1:0:d=2026010100:WIND:surface:anl:
+2:100:d=2026010100:WDIR:surface:anl:
+3:200:d=2026010100:UGRD:surface:anl:
+4:300:d=2026010100:VGRD:surface:anl:
+5:400:d=2026010100:HTSGW:surface:anl:
+6:500:d=2026010100:SWELL:1 in sequence:anl:
+7:600:d=2026010100:SWDIR:1 in sequence:anl:
+"""
+
+
+def test_parse_idx_offsets():
+    entries = grib_loader.parse_idx(IDX)
+    assert [e["var"] for e in entries][:3] == ["WIND", "WDIR", "UGRD"]
+    assert entries[2]["offset"] == 200
+    assert entries[2]["end"] == 299
+    assert entries[-1]["end"] is None
+
+
+def test_idx_byte_ranges_merges_neighbours():
+    entries = grib_loader.parse_idx(IDX)
+    fields = grib_loader.gfswave_idx_fields(["wind"])
+    assert grib_loader.idx_byte_ranges(entries, fields, max_gap=0) == [(200, 399)]
+
+    fields = {("UGRD", "surface"), ("SWDIR", "1 in sequence")}
+    assert grib_loader.idx_byte_ranges(entries, fields, max_gap=0) == [(200, 299), (600, None)]
+    assert grib_loader.idx_byte_ranges(entries, fields, max_gap=1000) == [(200, None)]
+
+
+def test_idx_byte_ranges_missing_field():
+    entries = grib_loader.parse_idx(IDX)
+    with pytest.raises(ValueError):
+        grib_loader.idx_byte_ranges(entries, {("DIRPW", "surface")})
+
+
+def test_load_forecast_byte_range_subset(nomads, monkeypatch):
+    monkeypatch.setattr(grib_loader, "RANGE_MERGE_GAP", 0)
+    full = nomads.publish(CYCLE, 3)
+    ds = grib_loader.load_gfswave_forecast(CYCLE, 3, params=["wind", "swh", "swell"])
+
+    assert set(ds.data_vars) == {"ugrdsfc", "vgrdsfc", "htsgwsfc", "dirpwsfc", "swell_1", "swdir_1"}
+    assert ds["swell_1"].dims == ("time", "lat", "lon")
+    assert any(r is not None for _, r in nomads.requests)
+    assert nomads.bytes_sent < full.stat().st_size
+
+
+def test_load_forecast_full_file(nomads):
+    nomads.publish(CYCLE, 0)
+    ds = grib_loader.load_gfswave_forecast(CYCLE, 0)
+    assert "swell_1" in ds
+    assert all(r is None for _, r in nomads.requests)
+
+
+def test_iter_cycle_stops_at_unpublished_hour(nomads):
+    for hour in range(3):
+        nomads.publish(CYCLE, hour)
+    hours = [t for t, _ in grib_loader.iter_gfswave_cycle(CYCLE, 6, params=["swh"], workers=3)]
+    assert hours == [0, 1, 2]
+
+
+def test_iter_hours_leaves_retries_to_the_http_client(nomads, monkeypatch):
+    calls = []
+
+    def flaky(cycle, hour, params=None, bbox=None):
+        calls.append(hour)
+        raise ConnectionError("[ERROR] GET failed")
+
+    monkeypatch.setattr(grib_loader, "download_gfswave_forecast", flaky)
+    assert list(grib_loader.iter_gfswave_hours(CYCLE, [0], params=["swh"])) == []
+    assert calls == [0]
+
+
+def test_union_bbox_with_margin():
+    from plotter.core.utils import regions_bbox
+
+    yaml_cfg = {"regions": {"a": {"bbox": [95, 105, 0, 6]}, "b": {"bbox": [120, 141, -13, 6]}}}
+    assert regions_bbox(["a", "b"], yaml_cfg, margin=2) == [93, 143, -15, 8]
+    assert regions_bbox(["missing"], yaml_cfg) is None
+
+
+def test_crop_on_ingest_caches_compact_copy(nomads):
+    nomads.publish(CYCLE, 0)
+    bbox = [100, 110, -5, 5]
+    ds = grib_loader.load_gfswave_forecast(CYCLE, 0, params=["wind", "swh", "swell"], bbox=bbox)
+    assert float(ds.lon.min()) == 100 and float(ds.lon.max()) == 110
+    assert float(ds.lat.min()) == -5 and float(ds.lat.max()) == 5
+
+    cached = sorted(p.name for p in (grib_loader.CACHE_DIR / CYCLE).iterdir() if not p.name.startswith("."))
+    assert cached == ["f000.swell-swh-wind.crop_100_110_-5_5.nc"]
+
+    served = len(nomads.requests)
+    again = grib_loader.load_gfswave_forecast(CYCLE, 0, params=["wind", "swh", "swell"], bbox=bbox)
+    assert len(nomads.requests) == served
+    assert again["htsgwsfc"].shape == ds["htsgwsfc"].shape
+    # The GRIB2 content hash survives the round trip through the NetCDF cache.
+    assert again.attrs[INPUT_DIGEST_ATTR] == ds.attrs[INPUT_DIGEST_ATTR]
+
+
+def test_selective_decode_matches_cfgrib(tmp_path):
+    import cfgrib
+    import eccodes
+    import numpy as np
+    import xarray as xr
+
+    from plotter.testing.fake_nomads import write_gfswave_grib
+
+    path = write_gfswave_grib(tmp_path / "f006.grib2", CYCLE, 6)
+    ds = grib_loader.decode_gfswave_file(path)
+    parts = cfgrib.open_datasets(str(path), backend_kwargs={"indexpath": ""})
+    expected = grib_loader.normalize_gfswave_dataset(xr.merge(parts, compat="override"))
+    assert set(ds.data_vars) == set(expected.data_vars)
+    assert (ds.time.values == expected.time.values).all()
+    np.testing.assert_array_equal(ds.lat.values, expected.lat.values)
+    for name in expected.data_vars:
+        assert ds[name].dtype == np.float32
+        np.testing.assert_array_equal(ds[name].values, expected[name].values)
+
+    swell = grib_loader.decode_gfswave_file(path, grib_loader.gfswave_variables(["swell"]))
+    assert set(swell.data_vars) == {"swell_1", "swdir_1"}
+
+    # Land points are masked through the GRIB bitmap, as NCEP does.
+    with open(path, "rb") as f:
+        while True:
+            h = eccodes.codes_grib_new_from_file(f)
+            if eccodes.codes_get(h, "shortName") == "swh":
+                break
+            eccodes.codes_release(h)
+    values = eccodes.codes_get_values(h)
+    values[5] = 9999.0
+    eccodes.codes_set(h, "missingValue", 9999.0)
+    eccodes.codes_set(h, "bitmapPresent", 1)
+    eccodes.codes_set_values(h, values)
+    masked = tmp_path / "masked.grib2"
+    masked.write_bytes(eccodes.codes_get_message(h))
+    eccodes.codes_release(h)
+
+    swh = grib_loader.decode_gfswave_file(masked, {"htsgwsfc"})["htsgwsfc"].values.ravel()
+    assert np.isnan(swh[5]) and np.isfinite(np.delete(swh, 5)).all()
+    with pytest.raises(ValueError):
+        grib_loader.decode_gfswave_file(masked, {"htsgwsfc", "ugrdsfc"})
+
+
+def test_cfgrib_index_stays_in_the_cycle_directory(tmp_path, monkeypatch):
+    from plotter.testing.fake_nomads import write_gfswave_grib
+
+    monkeypatch.setattr(grib_loader, "CACHE_DIR", tmp_path / "cache")
+    cycle_dir = tmp_path / "cache" / CYCLE
+    cycle_dir.mkdir(parents=True)
+    path = write_gfswave_grib(cycle_dir / "f000.grib2", CYCLE, 0)
+    grib_loader._open_grib_file(path, ["htsgwsfc"])
+    assert [p.name for p in cycle_dir.glob("f000.grib2.*.idx")]
+    assert sorted(p.name for p in (tmp_path / "cache").iterdir()) == [CYCLE]
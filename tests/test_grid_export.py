@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+from plotter.core.grid_export import dequantize, export_grid, quantize, quantize_direction, read_grid
+
+
+def _dataset():
+    lat = np.array([10.0, 9.75, 9.5])
+    lon = np.array([100.0, 100.25, 100.5, 100.75])
+    u = np.ones((1, 3, 4))
+    v = np.zeros((1, 3, 4))
+    v[0, 0, 0] = -1.0
+    u[0, 0, 0] = 0.0
+    hs = np.linspace(0, 5, 12).reshape(1, 3, 4)
+    hs[0, 2, 3] = np.nan
+    coords = {"time": [np.datetime64("2026-01-01")], "lat": lat, "lon": lon}
+    dims = ("time", "lat", "lon")
+    return xr.Dataset(
+        {
+            "ugrdsfc": (dims, u),
+            "vgrdsfc": (dims, v),
+            "htsgwsfc": (dims, hs),
+            "dirpwsfc": (dims, np.full((1, 3, 4), 359.9)),
+        },
+        coords=coords,
+    )
+
+
+def test_quantize_round_trip():
+    values = np.array([0.0, 1.5, np.nan, 7.0])
+    codes, scale, offset, nodata = quantize(values, bits=16)
+    assert codes.dtype == np.uint16 and codes[2] == nodata
+    decoded = dequantize(codes, scale, offset, nodata)
+    np.testing.assert_allclose(decoded[[0, 1, 3]], values[[0, 1, 3]], atol=scale / 2)
+    assert np.isnan(decoded[2])
+    with pytest.raises(ValueError):
+        quantize(values, bits=12)
+
+
+def test_direction_wraps():
+    codes = quantize_direction([0.0, 359.9, 180.0, np.nan])
+    assert codes.tolist()[:2] == [0, 0] and codes[3] == 255
+    assert int(codes[2]) * 360 / 255 == pytest.approx(180.0, abs=360 / 255 / 2 + 1e-9)
+
+
+def test_export_and_read(tmp_path):
+    ds = _dataset()
+    settings = {"levels": [0, 1, 2], "cmap": ["#000000", "#ffffff"], "unit": "meter", "grid": {"bits": 8}}
+    export_grid(ds, "gfswave", "swh", tmp_path / "swh_000.bin", settings, meta={"forecast_hour": 0})
+    header, values, direction = read_grid(tmp_path / "swh_000.bin")
+    assert header["shape"] == [3, 4] and header["lat0"] == 10.0 and header["dlat"] == -0.25
+    assert header["levels"] == [0.0, 1.0, 2.0] and header["forecast_hour"] == 0
+    np.testing.assert_allclose(values, ds.htsgwsfc[0].values, atol=header["values"]["scale"] / 2)
+    assert np.isnan(values[2, 3])
+    np.testing.assert_allclose(direction, 0.0)
+
+    export_grid(ds, "gfswave", "wind", tmp_path / "wind_000.bin")
+    _, speed, direction = read_grid(tmp_path / "wind_000.bin")
+    np.testing.assert_allclose(speed, 1.0)
+    # Eastward wind comes from the west; a southward one from the north.
+    assert direction[1, 1] == pytest.approx(270.0, abs=1)
+    assert direction[0, 0] == pytest.approx(0.0, abs=1)
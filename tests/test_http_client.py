@@ -0,0 +1,71 @@
+from urllib.error import HTTPError
+
+import pytest
+
+from plotter.core import grib_loader
+from plotter.core.http_client import HttpClient
+
+CYCLE = "2026010100"
+
+
+def test_connections_are_reused(nomads):
+    for hour in range(3):
+        nomads.publish(CYCLE, hour)
+    client = HttpClient()
+    for hour in range(3):
+        client.get(grib_loader.gfswave_idx_url(CYCLE, hour))
+    client.head(grib_loader.gfswave_grib_url(CYCLE, 0))
+    assert nomads.connections == 1
+    summary = client.summary()
+    assert summary["requests"] == 4 and summary["connections"] == 1 and summary["retries"] == 0
+    assert all(s.reused for s in list(client.stats)[1:])
+
+
+def test_interrupted_transfers_resume(nomads, tmp_path):
+    path = nomads.publish(CYCLE, 0)
+    data = path.read_bytes()
+    url = grib_loader.gfswave_grib_url(CYCLE, 0)
+    client = HttpClient(backoff=0.01)
+
+    nomads.cut_next_transfer(5000)
+    resp = client.download(url, tmp_path / "f000.grib2")
+    assert resp.status == 200
+    assert (tmp_path / "f000.grib2").read_bytes() == data
+    assert nomads.requests[-1] == (nomads.requests[-1][0], "bytes=5000-")
+    stats = client.stats[-1]
+    assert stats.attempts == 2 and stats.bytes == len(data) and stats.throughput > 0
+
+    nomads.cut_next_transfer(100)
+    resp = client.get(url, {"Range": "bytes=1000-4999"})
+    assert resp.status == 206 and resp.body == data[1000:5000]
+    assert nomads.requests[-1][1] == "bytes=1100-4999"
+
+
+def test_resume_answered_with_the_whole_file(nomads, tmp_path, monkeypatch):
+    monkeypatch.setattr(grib_loader, "RANGE_MERGE_GAP", 0)
+    client = HttpClient(backoff=0.01)
+    monkeypatch.setattr(grib_loader, "default_client", lambda: client)
+    path = nomads.publish(CYCLE, 0)
+    data = path.read_bytes()
+    url = grib_loader.gfswave_grib_url(CYCLE, 0)
+    entries = grib_loader._fetch_idx(url)
+    ranges = grib_loader.idx_byte_ranges(entries, grib_loader.gfswave_idx_fields(["swh"]), 0)
+
+    nomads.cut_next_transfer(100)
+    nomads.ignore_range(1)
+    dest = tmp_path / "f000.swh.grib2"
+    grib_loader._fetch_ranges(url, ranges, dest)
+    expected = b"".join(data[s:] if e is None else data[s:e + 1] for s, e in ranges)
+    assert dest.read_bytes() == expected
+    # idx, the first range (cut), then its resume answered in full: nothing more to fetch.
+    assert [r for _, r in nomads.requests][1:] == [
+        f"bytes={ranges[0][0]}-{ranges[0][1]}", f"bytes={ranges[0][0] + 100}-{ranges[0][1]}",
+    ]
+
+
+def test_missing_files_are_not_retried(nomads):
+    client = HttpClient(backoff=0.01)
+    with pytest.raises(HTTPError) as exc:
+        client.get(grib_loader.gfswave_idx_url(CYCLE, 0))
+    assert exc.value.code == 404
+    assert client.stats[-1].attempts == 1
@@ -0,0 +1,70 @@
+import numpy as np
+import xarray as xr
+
+from plotter.core import manifest as manifest_module
+from plotter.core.manifest import INPUT_DIGEST_ATTR, RenderManifest, input_digest, render_key
+from plotter.core.render_config import compile_render_configs
+
+YAML_CFG = {
+    "defaults": {"dpi": 100},
+    "regions": {"bali": {"bbox": [114, 116, -9, -8]}},
+    "variables": {"swh": {"cmap": "viridis", "levels": [0, 1, 2]}},
+}
+
+
+def _hour(value):
+    return xr.Dataset({"htsgwsfc": (("lat", "lon"), np.full((2, 3), value))}, coords={"lat": [0, 1], "lon": [0, 1, 2]})
+
+
+def test_input_digest_prefers_recorded_hash():
+    ds = _hour(1.0)
+    assert input_digest(ds) == input_digest(_hour(1.0))
+    assert input_digest(ds) != input_digest(_hour(2.0))
+    ds.attrs[INPUT_DIGEST_ATTR] = "abc"
+    assert input_digest(ds) == "abc"
+
+
+def test_render_key_tracks_inputs_and_config():
+    render = compile_render_configs(YAML_CFG)[("bali", "swh")]
+    key = render_key("abc", render, forecast_hour=3)
+    assert key == render_key("abc", render, forecast_hour=3)
+    assert key != render_key("abd", render, forecast_hour=3)
+    assert key != render_key("abc", render, forecast_hour=4)
+    changed = {**YAML_CFG, "defaults": {"dpi": 120}}
+    assert key != render_key("abc", compile_render_configs(changed)[("bali", "swh")], forecast_hour=3)
+
+
+
+def test_code_version_covers_the_cli(tmp_path, monkeypatch):
+    (tmp_path / "plotter" / "testing").mkdir(parents=True)
+    (tmp_path / "src").mkdir()
+    (tmp_path / "plotter" / "plotter.py").write_text("A = 1\n")
+    (tmp_path / "plotter" / "testing" / "fake.py").write_text("B = 1\n")
+    (tmp_path / "src" / "plot.py").write_text("C = 1\n")
+    monkeypatch.setattr(manifest_module, "PROJECT_ROOT", tmp_path)
+
+    def version():
+        monkeypatch.setattr(manifest_module, "_code_version", None)
+        return manifest_module.code_version()
+
+    base = version()
+    (tmp_path / "plotter" / "testing" / "fake.py").write_text("B = 2\n")
+    assert version() == base
+    (tmp_path / "src" / "plot.py").write_text("C = 2\n")
+    assert version() != base
+
+def test_manifest_round_trip(tmp_path):
+    out = tmp_path / "bali" / "swh_003.webp"
+    manifest = RenderManifest(tmp_path)
+    assert not manifest.is_current(out, "k1")
+
+    out.parent.mkdir()
+    out.write_bytes(b"img")
+    manifest.record(out, "k1")
+    manifest.save()
+
+    reloaded = RenderManifest(tmp_path)
+    assert reloaded.is_current(out, "k1")
+    assert not reloaded.is_current(out, "k2")
+    out.unlink()
+    assert not reloaded.is_current(out, "k1")
@@ -0,0 +1,27 @@
+import cartopy.crs as ccrs
+import numpy as np
+import pytest
+
+from plotter.core.mesh_cache import projected_mesh
+
+
+@pytest.mark.parametrize("proj", [ccrs.Mercator(), ccrs.NorthPolarStereo(), ccrs.PlateCarree()])
+def test_mesh_matches_cartopy_transforms(proj):
+    lon = np.arange(100.0, 111.0, 0.5)
+    lat = np.arange(40.0, 60.0, 0.5)
+    mesh = projected_mesh(lon, lat, proj)
+    assert projected_mesh(lon.copy(), lat.copy(), proj) is mesh
+
+    lon2d, lat2d = np.meshgrid(lon, lat)
+    xyz = proj.transform_points(ccrs.PlateCarree(), lon2d, lat2d)
+    np.testing.assert_allclose(mesh.x, xyz[..., 0])
+    np.testing.assert_allclose(mesh.y, xyz[..., 1])
+
+    rng = np.random.default_rng(0)
+    u, v = rng.normal(size=lon2d.shape), rng.normal(size=lon2d.shape)
+    skip = 3
+    expected = proj.transform_vectors(
+        ccrs.PlateCarree(), lon2d[::skip, ::skip], lat2d[::skip, ::skip], u[::skip, ::skip], v[::skip, ::skip]
+    )
+    got = mesh.rotate(u[::skip, ::skip], v[::skip, ::skip], skip)
+    np.testing.assert_allclose(got, expected, atol=1e-4)
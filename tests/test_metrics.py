@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from plotter.core import metrics
+
+
+@pytest.fixture
+def metrics_file(tmp_path, monkeypatch):
+    # Registered with monkeypatch so the variables configure() sets are undone.
+    monkeypatch.setenv(metrics.METRICS_ENV, "")
+    monkeypatch.setenv(metrics.RUN_ENV, "")
+    path = tmp_path / "spans.jsonl"
+    return path, metrics.configure(path)
+
+
+def test_spans_carry_context_and_failures(metrics_file):
+    path, run = metrics_file
+    with metrics.context(cycle="2026010100", region="java_nusa_tenggara"):
+        with metrics.context(param="swh", hour=3), metrics.span("savefig") as record:
+            record["bytes"] = 1234
+        with pytest.raises(RuntimeError):
+            with metrics.span("plot", param="wind"):
+                raise RuntimeError("boom")
+    with metrics.span("run"):
+        pass
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [s["span"] for s in spans] == ["savefig", "plot", "run"]
+    savefig, plot, outer = spans
+    assert savefig["run"] == run and savefig["ok"] and savefig["bytes"] == 1234
+    assert (savefig["cycle"], savefig["region"], savefig["param"], savefig["hour"]) == (
+        "2026010100", "java_nusa_tenggara", "swh", 3,
+    )
+    assert plot["param"] == "wind" and plot["ok"] is False and "hour" not in plot
+    assert "region" not in outer
+    assert metrics.read_spans(path, run="other") == []
+
+
+def test_prometheus_summary(metrics_file, tmp_path):
+    path, run = metrics_file
+    for hour, size in ((0, 100), (1, 300)):
+        with metrics.context(region="java_nusa_tenggara", param="swh", hour=hour):
+            with metrics.span("savefig") as record:
+                record["bytes"] = size
+    try:
+        with metrics.span("download", hour=2):
+            raise ConnectionError
+    except ConnectionError:
+        pass
+
+    out = metrics.write_prometheus(tmp_path / "nusawave.prom", metrics.read_spans(path, run), {"cycle": "2026010100"})
+    samples = {}
+    for line in out.read_text().splitlines():
+        if not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    swh = '{cycle="2026010100",span="savefig",region="java_nusa_tenggara",param="swh"}'
+    download = '{cycle="2026010100",span="download",region="",param=""}'
+    assert samples["nusawave_span_seconds_count" + swh] == 2
+    assert samples["nusawave_span_bytes" + swh] == 400
+    assert samples["nusawave_span_failures" + download] == 1
+    assert "nusawave_span_failures" + swh not in samples
+    assert samples['nusawave_last_run_timestamp_seconds{cycle="2026010100"}'] > 0
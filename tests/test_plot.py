@@ -0,0 +1,53 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import plot  # noqa: E402
+
+CYCLE = "2026010100"
+
+
+def _watch_args(assets):
+    return plot.parse_args([
+        "--dataset", "gfswave", "--cycle", CYCLE, "--max-hours", "2", "--region", "malacca_strait",
+        "--assets-dir", str(assets), "--watch", "--poll-interval", "0.05",
+        "--max-poll-interval", "0.1", "--watch-timeout", "5",
+    ])
+
+
+def test_watch_rewrites_config_after_every_batch(nomads, tmp_path, monkeypatch):
+    nomads.publish(CYCLE, 0)
+    publisher = nomads.publish_over_time(CYCLE, [1], interval=0.3)
+    config = tmp_path / "assets" / "config" / "config.json"
+    seen = []
+    write = plot._write_frontend_config
+
+    def spy(*args):
+        write(*args)
+        meta = json.loads(config.read_text())["regions"]["malacca_strait"]["forecast_types"]["Wind and Waves"]
+        seen.append(meta["timestamps"])
+
+    monkeypatch.setattr(plot, "_write_frontend_config", spy)
+    plot.run(_watch_args(tmp_path / "assets"))
+    publisher.join()
+    assert seen == [["F000"], ["F000", "F001"]]
+
+
+def test_watch_survives_a_failing_config_writer(nomads, tmp_path, monkeypatch, capsys):
+    nomads.publish(CYCLE, 0)
+    publisher = nomads.publish_over_time(CYCLE, [1], interval=0.3)
+    calls = []
+
+    def broken(*args):
+        calls.append(args)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(plot, "_write_frontend_config", broken)
+    plot.run(_watch_args(tmp_path / "assets"))
+    publisher.join()
+    assert len(calls) == 2
+    assert "[WARN] Could not update the frontend config: disk full" in capsys.readouterr().out
+    maps = tmp_path / "assets" / "maps" / "gfswave" / "malacca_strait"
+    assert sorted(p.name for p in maps.glob("*_001.webp")) == ["swell_001.webp", "swh_001.webp", "wind_001.webp"]
@@ -0,0 +1,43 @@
+import matplotlib.colors as mcolors
+import pytest
+
+from plotter.core.render_config import compile_render_configs, plot_config_for
+
+YAML_CFG = {
+    "defaults": {"dpi": 100, "quiver": {"width": 0.002, "skipfactor": 30}},
+    "regions": {
+        "bali": {"bbox": [114, 116, -9, -8], "quiver": {"skip": 2, "scale": 40}},
+        "indonesia": {"bbox": [90, 150, -20, 25]},
+    },
+    "variables": {
+        "swh": {"cmap": ["#000", "#444", "#888", "#fff"], "levels": [0, 1, 2, 3], "extend": "max"},
+    },
+}
+
+
+def test_region_overrides_do_not_leak():
+    configs = compile_render_configs(YAML_CFG)
+    assert configs[("bali", "swh")].settings["quiver"]["skip"] == 2
+    assert "skip" not in configs[("indonesia", "swh")].settings["quiver"]
+    assert "skip" not in YAML_CFG["defaults"]["quiver"]
+
+
+def test_compiled_config_is_frozen_and_prebuilt():
+    render = compile_render_configs(YAML_CFG)[("indonesia", "swh")]
+    assert isinstance(render.colormap, mcolors.ListedColormap)
+    assert isinstance(render.norm, mcolors.BoundaryNorm)
+    assert not render.settings["levels"].flags.writeable
+    with pytest.raises(TypeError):
+        render.settings["quiver"]["skip"] = 1
+
+    cfg = plot_config_for(render, dataset="gfswave", forecast_hour=3)
+    assert cfg.compiled and cfg.norm is render.norm
+    assert cfg.dpi == 100 and cfg.forecast_hour == 3
+    assert cfg.figsize == render.figsize
+
+
+def test_fingerprint_tracks_settings():
+    first = compile_render_configs(YAML_CFG)[("bali", "swh")].fingerprint
+    changed = {**YAML_CFG, "defaults": {**YAML_CFG["defaults"], "dpi": 120}}
+    assert compile_render_configs(changed)[("bali", "swh")].fingerprint != first
+    assert compile_render_configs(YAML_CFG)[("bali", "swh")].fingerprint == first
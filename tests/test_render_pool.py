@@ -0,0 +1,81 @@
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from plotter.core.render_pool import RenderTask, render_task, run_render_tasks
+from plotter.testing.synthetic import synthetic_dataset
+
+BASERUN = datetime(2026, 1, 1)
+
+
+def _hour_files(tmp_path, hours):
+    ds = synthetic_dataset([95, 105, 0, 6], step=0.25, hours=hours, baserun=BASERUN)
+    paths = []
+    for t in range(hours):
+        path = tmp_path / "hours" / f"f{t:03d}.nc"
+        path.parent.mkdir(exist_ok=True)
+        ds.isel(time=[t]).to_netcdf(path)
+        paths.append(str(path))
+    return ds, paths
+
+
+def _task(source, t, outfile, param="swh", time_value=None):
+    return RenderTask(
+        source=source, dataset="gfswave", region="malacca_strait", param=param, forecast_hour=t,
+        outfile=str(outfile), baserun=BASERUN, datasource="NOAA GFS Wave", time_value=time_value,
+    )
+
+
+def test_pool_matches_inline_render_and_reports_failures(tmp_path):
+    ds, sources = _hour_files(tmp_path, 2)
+    tasks = [
+        _task(source, t, tmp_path / "pool" / f"swh_{t:03d}", time_value=pd.Timestamp(ds.time.values[t]))
+        for t, source in enumerate(sources)
+    ]
+    tasks.insert(1, _task(sources[0], 0, tmp_path / "pool" / "nope_000", param="nope"))
+
+    results = run_render_tasks(iter(tasks), workers=2)
+    assert sorted(r.task.outfile for r in results) == sorted(t.outfile for t in tasks)
+    failed = [r for r in results if not r.ok]
+    assert [r.task.param for r in failed] == ["nope"] and "KeyError" in failed[0].error
+
+    for task in tasks[::2]:
+        outfile = tmp_path / "inline" / f"swh_{task.forecast_hour:03d}"
+        inline = render_task(_task(task.source, task.forecast_hour, outfile, time_value=task.time_value))
+        assert inline.ok, inline.error
+    for t in range(2):
+        pooled = (tmp_path / "pool" / f"swh_{t:03d}.webp").read_bytes()
+        assert pooled == (tmp_path / "inline" / f"swh_{t:03d}.webp").read_bytes()
+
+
+def test_sources_are_bounded_and_released(tmp_path):
+    _, sources = _hour_files(tmp_path, 4)
+    results_by_source = {}
+    peak = {"open": 0}
+
+    def tasks():
+        for t, source in enumerate(sources):
+            # Sources with tasks submitted but not all results back yet.
+            busy = sum(1 for s in sources[:t] if results_by_source.get(s, 0) < 2)
+            peak["open"] = max(peak["open"], busy)
+            for i in range(2):
+                # Unknown param: fails fast in the worker, which is all this test needs.
+                yield _task(source, t, tmp_path / f"x{t}{i}", param="nope")
+
+    released = []
+
+    def on_result(result):
+        results_by_source[result.task.source] = results_by_source.get(result.task.source, 0) + 1
+
+    def on_source_done(source):
+        assert results_by_source[source] == 2
+        released.append(source)
+        # What plot.py's release_hour does with the per-hour NetCDF files.
+        Path(source).unlink()
+
+    results = run_render_tasks(tasks(), 2, on_result=on_result, on_source_done=on_source_done, max_sources=1)
+    assert len(results) == 8 and not any(r.ok for r in results)
+    assert peak["open"] <= 1
+    assert sorted(released) == sorted(sources)
+    assert not list((tmp_path / "hours").iterdir())
@@ -0,0 +1,96 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from plotter.core.plot_config import PlotConfig
+from plotter.core.plotter import Plotter
+from plotter.core.routes import Route, densify, interpolate_routes, load_routes, route_table, write_csv, write_json
+from plotter.core.stations import _haversine
+from plotter.testing.synthetic import synthetic_dataset
+
+DEPART = pd.Timestamp("2026-01-01T00")
+
+
+def _linear(hours):
+    ds = synthetic_dataset([95, 125, -10, 10], step=0.25, hours=hours)
+    elapsed = (ds.time - ds.time[0]) / np.timedelta64(1, "h")
+    ds["htsgwsfc"] = (2 * ds.lat + 3 * ds.lon + 0.5 * elapsed).astype("float32").transpose("time", "lat", "lon")
+    return ds
+
+
+def test_densify_follows_great_circles_at_speed():
+    route = Route("a", ((1.0, 100.0), (5.0, 110.0), (-3.0, 118.0)), depart=DEPART, speed_kn=10)
+    lat, lon, distance, eta = densify(route, step_km=25)
+    assert (lat[0], lon[0]) == pytest.approx((1.0, 100.0))
+    assert (lat[-1], lon[-1]) == pytest.approx((-3.0, 118.0))
+    legs = _haversine([1.0, 5.0], [100.0, 110.0], [5.0, -3.0], [110.0, 118.0])
+    assert distance[-1] == pytest.approx(legs.sum(), rel=1e-6)
+    steps = _haversine(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    assert steps.max() <= 25 + 1e-6
+    np.testing.assert_allclose(np.cumsum(steps), distance[1:], rtol=1e-6)
+    hours = (eta - DEPART.to_datetime64()) / np.timedelta64(1, "h")
+    np.testing.assert_allclose(hours, distance / (10 * 1.852), rtol=1e-9, atol=1e-6)
+
+
+def test_many_routes_interpolate_in_space_and_time():
+    ds = _linear(hours=24)
+    routes = [
+        Route("slow", ((1.0, 100.0), (5.0, 110.0)), speed_kn=8),
+        Route("fast", ((-5.0, 105.0), (4.0, 121.0)), speed_kn=20),
+        Route("late", ((0.0, 100.0), (0.0, 101.0)), depart=DEPART + pd.Timedelta(hours=30)),
+    ]
+    tracks = interpolate_routes(ds, routes, params=["swh"], step_km=15)
+    for route_id in ("slow", "fast"):
+        table = route_table(tracks, route_id)
+        hours = (table.eta - ds.time[0]) / np.timedelta64(1, "h")
+        expected = np.where(hours <= 23, 2 * table.lat + 3 * table.lon + 0.5 * hours, np.nan)
+        np.testing.assert_allclose(table.swh, expected, rtol=1e-5)
+        assert np.all(np.diff(table.seq) == 1)
+    assert route_table(tracks, "late").swh.isnull().all()
+
+
+def test_routes_with_etas(tmp_path):
+    (tmp_path / "lanes.csv").write_text(
+        "route,lat,lon,eta,speed_kn\n"
+        "a,1.0,100.0,2026-01-01T00,\n"
+        "a,1.0,102.0,2026-01-01T06,\n"
+        "b,2.0,104.0,,14\n"
+        "b,3.0,106.0,,\n"
+    )
+    a, b = load_routes(tmp_path / "lanes.csv")
+    assert a.etas[-1] == pd.Timestamp("2026-01-01T06") and b.speed_kn == 14.0 and b.etas is None
+    _, _, distance, eta = densify(a)
+    assert eta[-1] == np.datetime64("2026-01-01T06")
+    half = np.argmin(abs(distance - distance[-1] / 2))
+    assert abs((eta[half] - np.datetime64("2026-01-01T03")) / np.timedelta64(1, "m")) < 10
+
+    (tmp_path / "bad.csv").write_text("route,lat,lon,eta\na,1,100,2026-01-01T06\na,1,101,2026-01-01T00\n")
+    with pytest.raises(ValueError):
+        load_routes(tmp_path / "bad.csv")
+
+
+def test_route_files_and_plot_route(tmp_path):
+    geo = {"type": "FeatureCollection", "features": [{
+        "type": "Feature",
+        "geometry": {"type": "LineString", "coordinates": [[98.7, 3.8], [101.4, 1.7], [104.0, 1.2]]},
+        "properties": {"id": "blw-sin", "name": "Belawan - Singapore", "speed_kn": 12},
+    }]}
+    (tmp_path / "lanes.geojson").write_text(json.dumps(geo))
+    routes = load_routes(tmp_path / "lanes.geojson")
+    assert routes[0].waypoints[0] == (3.8, 98.7)
+
+    ds = synthetic_dataset([95, 105, 0, 8], step=0.5, hours=12)
+    tracks = interpolate_routes(ds, routes)
+    doc = json.loads(write_json(tracks, tmp_path / "routes.json").read_text())
+    assert doc["routes"][0]["name"] == "Belawan - Singapore"
+    assert len(doc["routes"][0]["eta"]) == tracks.sizes["point"]
+    rows = write_csv(tracks, tmp_path / "routes.csv").read_text().splitlines()
+    assert len(rows) == 1 + tracks.sizes["point"]
+
+    config = PlotConfig(dataset="gfswave", outfile=str(tmp_path / "rt" / "blw-sin"))
+    out = Plotter(config).plot_route(ds, [(3.8, 98.7), (1.2, 104.0)], speed_kn=15, name="blw-sin")
+    assert set(out.route.values) == {"blw-sin"}
+    assert (tmp_path / "rt" / "blw-sin.png").stat().st_size > 0
+    assert not hasattr(config, "fileformat")
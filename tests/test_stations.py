@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pytest
+
+from plotter.core.plot_config import PlotConfig
+from plotter.core.plotter import Plotter
+from plotter.core.stations import Site, SiteIndex, extract_sites, load_sites, write_csv, write_json
+from plotter.testing.synthetic import synthetic_dataset
+
+
+def _linear(ds):
+    field = (2 * ds.lat + 3 * ds.lon + 0 * ds.time.dt.hour).astype("float32")
+    ds["htsgwsfc"] = field.transpose("time", "lat", "lon")
+    return ds
+
+
+def test_bilinear_is_exact_on_a_linear_field():
+    ds = _linear(synthetic_dataset([95, 105, 0, 8], step=0.5, hours=3))
+    sites = [Site("a", 1.3, 96.2), Site("b", 7.9, 104.6), Site("c", 4.0, 100.0)]
+    out = extract_sites(ds, sites, params=["swh"])
+    expected = [2 * s.lat + 3 * s.lon for s in sites]
+    np.testing.assert_allclose(out.swh.isel(time=0), expected, rtol=1e-5)
+    assert out.swh.dims == ("site", "time")
+    assert not out.fallback.any()
+
+    nearest = extract_sites(ds, sites, params=["swh"], method="nearest")
+    assert float(nearest.swh.sel(site="c").isel(time=0)) == pytest.approx(2 * 4.0 + 3 * 100.0)
+    assert float(nearest.grid_lat.sel(site="a")) == 1.5
+
+
+def test_dry_cells_fall_back_to_nearest_wet_cell():
+    ds = _linear(synthetic_dataset([95, 105, 0, 8], step=0.5, hours=2))
+    land = (ds.lat < 4) & (ds.lon < 100)
+    for name in ("htsgwsfc", "dirpwsfc"):
+        ds[name] = ds[name].where(~land)
+    sites = [Site("coast", 3.0, 99.0), Site("inland", 1.0, 96.0), Site("outside", 20.0, 150.0)]
+    index = SiteIndex(ds.lat.values, ds.lon.values, sites, wet=np.isfinite(ds.htsgwsfc.isel(time=0).values))
+    out = extract_sites(ds, sites, params=["swh"], index=index)
+
+    assert bool(out.fallback.sel(site="coast"))
+    assert float(out.grid_lat.sel(site="coast")) >= 4.0 or float(out.grid_lon.sel(site="coast")) >= 100.0
+    assert np.isfinite(out.swh.sel(site="coast")).all()
+    assert out.swh.sel(site="inland").isnull().all()
+    assert out.swh.sel(site="outside").isnull().all()
+
+
+def test_directions_average_as_unit_vectors():
+    ds = synthetic_dataset([95, 105, 0, 8], step=0.5, hours=1)
+    ds["dirpwsfc"][:] = np.where(ds.lon.values < 100, 350.0, 10.0)
+    out = extract_sites(ds, [Site("a", 4.0, 99.75)], params=["swh"])
+    direction = float(out.swh_dir.isel(site=0, time=0))
+    assert min(direction, 360 - direction) < 1e-3
+
+
+def test_site_files_round_trip(tmp_path):
+    (tmp_path / "ports.csv").write_text("id,name,lat,lon\nbel,Belawan,3.8,98.7\ndum,Dumai,1.7,101.4\n")
+    geo = {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": [98.7, 3.8]}, "properties": {"id": "bel"}},
+    ]}
+    (tmp_path / "ports.geojson").write_text(json.dumps(geo))
+    sites = load_sites(tmp_path / "ports.csv")
+    assert sites[0] == Site("bel", 3.8, 98.7, "Belawan")
+    assert load_sites(tmp_path / "ports.geojson")[0].lon == 98.7
+    (tmp_path / "dup.csv").write_text("id,lat,lon\na,1,100\na,2,100\n")
+    with pytest.raises(ValueError):
+        load_sites(tmp_path / "dup.csv")
+
+    out = extract_sites(synthetic_dataset([95, 105, 0, 8], step=0.5, hours=4), sites)
+    doc = json.loads(write_json(out, tmp_path / "out.json").read_text())
+    assert [s["id"] for s in doc["sites"]] == ["bel", "dum"]
+    rows = write_csv(out, tmp_path / "out.csv").read_text().splitlines()
+    assert len(rows) == 1 + 2 * 4
+
+
+def test_plot_station_writes_meteogram(tmp_path):
+    ds = synthetic_dataset([95, 105, 0, 8], step=0.5, hours=6)
+    config = PlotConfig(dataset="gfswave", outfile=str(tmp_path / "st" / "belawan"))
+    series = Plotter(config).plot_station(ds, 3.8, 98.7, name="belawan")
+    assert list(series.site.values) == ["belawan"]
+    assert (tmp_path / "st" / "belawan.png").stat().st_size > 0
+    assert not hasattr(config, "fileformat")
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.colors as mcolors
+import numpy as np
+import xarray as xr
+from PIL import Image
+
+from plotter.core import tiles
+from plotter.core.tiles import TILES_META, render_tile_pyramid, tile_bounds, tile_index, tile_range
+
+CMAP = mcolors.ListedColormap(["#0000ff", "#ff0000"])
+LEVELS = [0.0, 1.0, 2.0]
+NORM = mcolors.BoundaryNorm(LEVELS, CMAP.N)
+
+
+def _field(values):
+    lon = np.arange(-20.0, 20.25, 0.25)
+    lat = np.arange(20.0, -20.25, -0.25)
+    data = np.broadcast_to(np.asarray(values, dtype=float), (len(lat), len(lon))).copy()
+    return xr.DataArray(data, coords={"lat": lat, "lon": lon}, dims=("lat", "lon"))
+
+
+def test_tile_grid():
+    assert tile_index(-180, 85, 0) == (0, 0)
+    assert tile_index(0.1, -0.1, 1) == (1, 1)
+    assert tile_index(180, -90, 2) == (3, 3)
+    assert tile_index(200, 0, 2) == tile_index(-160, 0, 2) == (0, 2)
+    assert tile_range([170, 190, -10, 10], 2)[:2] == (0, 3)
+    assert tile_range([-10, 10, -10, 10], 1) == (0, 1, 0, 1)
+    x0, x1, y0, y1 = tile_bounds(1, 1, 0)
+    assert x0 == 0 and y0 == 0 and x1 == y1 > 0
+
+
+def test_pyramid_is_georeferenced(tmp_path):
+    lat = _field(0).lat
+    field = _field(0) + xr.where(lat > 0, 1.5, 0.5)
+    written = render_tile_pyramid(field, tmp_path, [1, 2], CMAP, NORM, LEVELS, fileformat="png")
+    # Zoom 1: the field spans the four tiles around (0, 0); zoom 2 likewise.
+    assert written == 8
+    north = np.array(Image.open(tmp_path / "1" / "1" / "0.png").convert("RGBA"))
+    south = np.array(Image.open(tmp_path / "1" / "1" / "1.png").convert("RGBA"))
+    assert north.shape == (256, 256, 4)
+    assert tuple(north[250, 5]) == (255, 0, 0, 255)
+    assert tuple(south[5, 5]) == (0, 0, 255, 255)
+    # Beyond the field's 20 deg extent nothing is drawn.
+    assert north[0, 255, 3] == 0
+
+    info = json.loads((tmp_path / TILES_META).read_text())
+    assert info["minzoom"] == 1 and info["maxzoom"] == 2 and info["tiles"] == 8
+    assert info["colors"] == ["#0000ff", "#ff0000"]
+
+
+def test_empty_tiles_are_skipped(tmp_path):
+    field = _field(0.5).where(_field(0).lon < 0)
+    stale = tmp_path / "1" / "1" / "0.png"
+    stale.parent.mkdir(parents=True)
+    stale.write_bytes(b"old")
+    written = render_tile_pyramid(field, tmp_path, [1], CMAP, NORM, LEVELS, fileformat="png")
+    assert written == 2
+    assert sorted(p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob("*.png")) == ["1/0/0.png", "1/0/1.png"]
+
+
+def test_failed_render_keeps_the_live_pyramid(tmp_path, monkeypatch):
+    outdir = tmp_path / "swh" / "006"
+    render_tile_pyramid(_field(0.5), outdir, [1], CMAP, NORM, LEVELS, fileformat="png")
+    before = sorted(p.relative_to(outdir) for p in outdir.rglob("*"))
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("[ERROR] render failed")
+
+    monkeypatch.setattr(tiles, "_render_block", broken)
+    with pytest.raises(RuntimeError):
+        render_tile_pyramid(_field(1.5), outdir, [1], CMAP, NORM, LEVELS, fileformat="png")
+    assert sorted(p.relative_to(outdir) for p in outdir.rglob("*")) == before
+    assert [p.name for p in outdir.parent.iterdir()] == ["006"]
+
+
+def test_native_0_360_grid_is_not_clamped(tmp_path):
+    lon = np.arange(0.0, 360.0, 1.0)
+    lat = np.arange(60.0, -61.0, -1.0)
+    field = xr.DataArray(np.full((len(lat), len(lon)), 1.5), coords={"lat": lat, "lon": lon}, dims=("lat", "lon"))
+    written = render_tile_pyramid(field, tmp_path / "p", [1], CMAP, NORM, LEVELS, fileformat="png")
+    assert written == 4
+    assert sorted(p.parent.name for p in (tmp_path / "p" / "1").rglob("*.png")) == ["0", "0", "1", "1"]
@@ -0,0 +1,35 @@
+from plotter.core import grib_loader
+from plotter.core.watcher import AdaptiveBackoff, watch_gfswave_cycle
+
+CYCLE = "2026010100"
+
+
+def test_backoff_grows_and_resets():
+    backoff = AdaptiveBackoff(1.0, 3.0, factor=2.0)
+    assert [backoff.next() for _ in range(4)] == [1.0, 2.0, 3.0, 3.0]
+    backoff.reset()
+    assert backoff.next() == 1.0
+
+
+def test_hour_available(nomads):
+    assert not grib_loader.gfswave_hour_available(CYCLE, 0)
+    nomads.publish(CYCLE, 0)
+    assert grib_loader.gfswave_hour_available(CYCLE, 0)
+
+
+def test_watch_renders_hours_as_they_are_published(nomads):
+    nomads.publish(CYCLE, 0)
+    publisher = nomads.publish_over_time(CYCLE, [1, 2], interval=0.3)
+    batches = [
+        [t for t, _ in batch]
+        for batch in watch_gfswave_cycle(CYCLE, 3, params=["swh"], poll=0.05, max_poll=0.1, give_up=10)
+    ]
+    publisher.join()
+    assert [t for batch in batches for t in batch] == [0, 1, 2]
+    assert len(batches) >= 2
+
+
+def test_watch_gives_up_without_new_hours(nomads):
+    nomads.publish(CYCLE, 0)
+    batches = list(watch_gfswave_cycle(CYCLE, 4, params=["swh"], poll=0.05, max_poll=0.05, give_up=0.3))
+    assert [[t for t, _ in batch] for batch in batches] == [[0]]